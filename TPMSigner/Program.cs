@@ -1,4 +1,5 @@
 ﻿using System;
+using System.IO;
 using System.Security.Cryptography;
 using System.Text;
 
@@ -34,7 +35,12 @@ namespace TPMSigner
                             Console.Error.WriteLine("Error: 'sign' command requires data argument");
                             Environment.Exit(1);
                         }
-                        SignData(args[1]);
+                        // "sign -" takes the raw payload bytes on stdin, which
+                        // avoids base64 and the command-line length limit
+                        SignData(args[1] == "-" ? ReadStdinBytes() : Convert.FromBase64String(args[1]));
+                        break;
+                    case "serve":
+                        Serve();
                         break;
                     default:
                         Console.Error.WriteLine($"Error: Unknown command '{command}'");
@@ -57,28 +63,19 @@ namespace TPMSigner
             Console.WriteLine("  TPMSigner.exe init-key              - Initialize TPM key");
             Console.WriteLine("  TPMSigner.exe status                - Check TPM status");
             Console.WriteLine("  TPMSigner.exe sign <base64-data>    - Sign data");
+            Console.WriteLine("  TPMSigner.exe sign -                - Sign raw data read from stdin");
+            Console.WriteLine("  TPMSigner.exe serve                 - Answer init-key/sign/status requests on stdin");
         }
 
         static void InitKey()
         {
             try
             {
-                var cspParams = new CspParameters
-                {
-                    KeyContainerName = KEY_CONTAINER_NAME,
-                    Flags = CspProviderFlags.UseMachineKeyStore
-                };
+                string publicKeyBase64 = CreateOrExportKey();
 
-                using (var rsa = new RSACryptoServiceProvider(2048, cspParams))
-                {
-                    rsa.PersistKeyInCsp = true;
-                    byte[] publicKeyBytes = rsa.ExportSubjectPublicKeyInfo();
-                    string publicKeyBase64 = Convert.ToBase64String(publicKeyBytes);
-
-                    Console.WriteLine("[OUTPUT_START]");
-                    Console.WriteLine(publicKeyBase64);
-                    Console.WriteLine("[OUTPUT_END]");
-                }
+                Console.WriteLine("[OUTPUT_START]");
+                Console.WriteLine(publicKeyBase64);
+                Console.WriteLine("[OUTPUT_END]");
             }
             catch (Exception ex)
             {
@@ -87,33 +84,27 @@ namespace TPMSigner
             }
         }
 
-        static void CheckStatus()
+        static string CreateOrExportKey()
         {
-            try
+            var cspParams = new CspParameters
             {
-                bool tpmAvailable = true;
-                bool keyExists = false;
+                KeyContainerName = KEY_CONTAINER_NAME,
+                Flags = CspProviderFlags.UseMachineKeyStore
+            };
 
-                var cspParams = new CspParameters
-                {
-                    KeyContainerName = KEY_CONTAINER_NAME,
-                    Flags = CspProviderFlags.UseMachineKeyStore
-                };
-
-                try
-                {
-                    using (var rsa = new RSACryptoServiceProvider(cspParams))
-                    {
-                        keyExists = rsa.CspKeyContainerInfo.Accessible;
-                    }
-                }
-                catch
-                {
-                    keyExists = false;
-                }
+            using (var rsa = new RSACryptoServiceProvider(2048, cspParams))
+            {
+                rsa.PersistKeyInCsp = true;
+                byte[] publicKeyBytes = rsa.ExportSubjectPublicKeyInfo();
+                return Convert.ToBase64String(publicKeyBytes);
+            }
+        }
 
-                string statusJson = $"{{\"tpm_available\": {tpmAvailable.ToString().ToLower()}, " +
-                                  $"\"key_exists\": {keyExists.ToString().ToLower()}}}";
+        static void CheckStatus()
+        {
+            try
+            {
+                string statusJson = GetStatusJson(out bool keyExists);
 
                 Console.WriteLine("[OUTPUT_START]");
                 Console.WriteLine(statusJson);
@@ -128,32 +119,119 @@ namespace TPMSigner
             }
         }
 
-        static void SignData(string base64Data)
+        static string GetStatusJson(out bool keyExists)
         {
-            try
+            bool tpmAvailable = true;
+            keyExists = false;
+
+            var cspParams = new CspParameters
             {
-                var cspParams = new CspParameters
-                {
-                    KeyContainerName = KEY_CONTAINER_NAME,
-                    Flags = CspProviderFlags.UseMachineKeyStore
-                };
+                KeyContainerName = KEY_CONTAINER_NAME,
+                Flags = CspProviderFlags.UseMachineKeyStore
+            };
 
+            try
+            {
                 using (var rsa = new RSACryptoServiceProvider(cspParams))
                 {
-                    byte[] dataToSign = Convert.FromBase64String(base64Data);
-                    byte[] signature = rsa.SignData(dataToSign, SHA256.Create());
-                    string signatureBase64 = Convert.ToBase64String(signature);
-
-                    Console.WriteLine("[OUTPUT_START]");
-                    Console.WriteLine(signatureBase64);
-                    Console.WriteLine("[OUTPUT_END]");
+                    keyExists = rsa.CspKeyContainerInfo.Accessible;
                 }
             }
+            catch
+            {
+                keyExists = false;
+            }
+
+            return $"{{\"tpm_available\": {tpmAvailable.ToString().ToLower()}, " +
+                   $"\"key_exists\": {keyExists.ToString().ToLower()}}}";
+        }
+
+        static string ComputeSignature(string base64Data)
+        {
+            return ComputeSignature(Convert.FromBase64String(base64Data));
+        }
+
+        static string ComputeSignature(byte[] data)
+        {
+            var cspParams = new CspParameters
+            {
+                KeyContainerName = KEY_CONTAINER_NAME,
+                Flags = CspProviderFlags.UseMachineKeyStore
+            };
+
+            using (var rsa = new RSACryptoServiceProvider(cspParams))
+            using (var sha256 = SHA256.Create())
+            {
+                byte[] signature = rsa.SignData(data, sha256);
+                return Convert.ToBase64String(signature);
+            }
+        }
+
+        static byte[] ReadStdinBytes()
+        {
+            using (var stdin = Console.OpenStandardInput())
+            using (var buffer = new MemoryStream())
+            {
+                stdin.CopyTo(buffer);
+                return buffer.ToArray();
+            }
+        }
+
+        static void SignData(byte[] data)
+        {
+            try
+            {
+                string signatureBase64 = ComputeSignature(data);
+
+                Console.WriteLine("[OUTPUT_START]");
+                Console.WriteLine(signatureBase64);
+                Console.WriteLine("[OUTPUT_END]");
+            }
             catch (Exception ex)
             {
                 Console.Error.WriteLine($"Signing failed: {ex.Message}");
                 Environment.Exit(1);
             }
         }
+
+        // Long-lived mode so callers don't pay process startup per signature.
+        // One request per line: "init-key", "sign <base64-data>" or "status".
+        // One reply per line: "OK <result>" or "ERR <message>".
+        static void Serve()
+        {
+            string line;
+            while ((line = Console.In.ReadLine()) != null)
+            {
+                string[] parts = line.Trim().Split(' ', 2);
+                string reply;
+                try
+                {
+                    switch (parts[0].ToLower())
+                    {
+                        case "sign":
+                            reply = parts.Length < 2
+                                ? "ERR 'sign' command requires data argument"
+                                : "OK " + ComputeSignature(parts[1]);
+                            break;
+                        case "status":
+                            reply = "OK " + GetStatusJson(out _);
+                            break;
+                        case "init-key":
+                            reply = "OK " + CreateOrExportKey();
+                            break;
+                        default:
+                            reply = $"ERR Unknown command '{parts[0]}'";
+                            break;
+                    }
+                }
+                catch (Exception ex)
+                {
+                    reply = "ERR " + ex.Message.Replace("\r", " ").Replace("\n", " ");
+                }
+
+                Console.Out.WriteLine(reply);
+                Console.Out.Flush();
+            }
+        }
     }
 }
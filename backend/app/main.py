@@ -28,6 +28,7 @@ from app.middleware.error_handlers import (
     database_exception_handler,
     general_exception_handler
 )
+from app.middleware.gzip_request import GzipRequestMiddleware
 
 import logging
 
@@ -77,6 +78,9 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Inflate gzip-compressed request bodies (DPA posture submissions)
+app.add_middleware(GzipRequestMiddleware)
+
 # Register exception handlers
 app.add_exception_handler(RequestValidationError, validation_exception_handler)
 app.add_exception_handler(SQLAlchemyError, database_exception_handler)
@@ -0,0 +1,80 @@
+# app/middleware/gzip_request.py
+
+"""
+Request body decompression for clients that send Content-Encoding: gzip
+"""
+
+import zlib
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+
+
+# Upper bound on a decompressed body, so a small gzip bomb can't exhaust memory
+MAX_DECOMPRESSED_SIZE = 10 * 1024 * 1024
+
+
+class GzipRequestMiddleware:
+    """
+    Pure-ASGI middleware that inflates gzip-encoded request bodies before routing.
+
+    The DPA can compress posture submissions; handlers always see plain JSON.
+    """
+
+    def __init__(self, app, max_size: int = MAX_DECOMPRESSED_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not any(
+            name == b"content-encoding" and value.strip().lower() == b"gzip"
+            for name, value in scope["headers"]
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        chunks = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] != "http.request":
+                return
+            chunks.append(message.get("body", b""))
+            more_body = message.get("more_body", False)
+
+        try:
+            inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+            body = inflater.decompress(b"".join(chunks), self.max_size + 1)
+        except zlib.error:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={"detail": "Invalid gzip request body"}
+            )
+            await response(scope, receive, send)
+            return
+
+        if len(body) > self.max_size or inflater.unconsumed_tail:
+            response = JSONResponse(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                content={"detail": "Decompressed request body too large"}
+            )
+            await response(scope, receive, send)
+            return
+
+        headers = [
+            (name, value) for name, value in scope["headers"]
+            if name not in (b"content-encoding", b"content-length")
+        ]
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+        scope = dict(scope, headers=headers)
+
+        body_sent = False
+
+        async def receive_inflated():
+            nonlocal body_sent
+            if not body_sent:
+                body_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        await self.app(scope, receive_inflated, send)
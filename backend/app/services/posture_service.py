@@ -1,5 +1,6 @@
 # services/posture_service.py
 
+import logging
 from typing import Optional, List, Dict, Any
 from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -8,6 +9,8 @@ from app.models.device import Device
 from app.schemas.posture import PostureHistoryCreate
 from datetime import datetime, timezone
 
+logger = logging.getLogger(__name__)
+
 class PostureService:
     @staticmethod
     async def create_posture_record(
@@ -63,9 +66,6 @@ class PostureService:
         - firewall: {"firewall_enabled": bool, "firewall_profile": str}
         - disk_encryption: {"encryption_enabled": bool, "encryption_method": str}
         """
-        import logging
-        logger = logging.getLogger(__name__)
-        
         violations = []
         score = 100
         
@@ -75,26 +75,33 @@ class PostureService:
         disk_encryption = posture_data.get("disk_encryption", {})
         screen_lock = posture_data.get("screen_lock", {})
         
-        # Debug logging
-        logger.info(f"Evaluating compliance - Antivirus: {antivirus}, Firewall: {firewall}, Disk Encryption: {disk_encryption}, Screen Lock: {screen_lock}")
+        # Debug logging (lazy %-args: the dict reprs are only built when DEBUG is on,
+        # which matters when re-evaluating many records in a backfill)
+        logger.debug(
+            "Evaluating compliance - Antivirus: %s, Firewall: %s, Disk Encryption: %s, Screen Lock: %s",
+            antivirus, firewall, disk_encryption, screen_lock
+        )
         
         # Check antivirus status (must be installed AND running)
         antivirus_enabled = antivirus.get("installed", False) and antivirus.get("running", False)
-        logger.info(f"Antivirus check - installed: {antivirus.get('installed')}, running: {antivirus.get('running')}, enabled: {antivirus_enabled}")
+        logger.debug(
+            "Antivirus check - installed: %s, running: %s, enabled: %s",
+            antivirus.get("installed"), antivirus.get("running"), antivirus_enabled
+        )
         if not antivirus_enabled:
             violations.append("Antivirus not enabled")
             score -= 30
         
         # Check firewall status
         firewall_enabled = firewall.get("firewall_enabled", False)
-        logger.info(f"Firewall check - firewall_enabled: {firewall_enabled}")
+        logger.debug("Firewall check - firewall_enabled: %s", firewall_enabled)
         if not firewall_enabled:
             violations.append("Firewall not enabled")
             score -= 25
         
         # Check disk encryption
         disk_encrypted = disk_encryption.get("encryption_enabled", False)
-        logger.info(f"Disk encryption check - encryption_enabled: {disk_encrypted}")
+        logger.debug("Disk encryption check - encryption_enabled: %s", disk_encrypted)
         if not disk_encrypted:
             violations.append("Disk encryption not enabled")
             score -= 25
@@ -108,13 +115,16 @@ class PostureService:
         
         # Check screen lock (from screen_lock dict)
         screen_lock_enabled = screen_lock.get("screen_lock_enabled", False)
-        logger.info(f"Screen lock check - screen_lock_enabled: {screen_lock_enabled}")
+        logger.debug("Screen lock check - screen_lock_enabled: %s", screen_lock_enabled)
         if not screen_lock_enabled:
             violations.append("Screen lock not enabled")
             score -= 10
         
         is_compliant = score >= 70  # Compliance threshold (70% or higher is compliant)
         
-        logger.info(f"Final compliance evaluation - Compliant: {is_compliant}, Score: {score}%, Violations: {len(violations)}")
+        logger.info(
+            "Final compliance evaluation - Compliant: %s, Score: %s%%, Violations: %s",
+            is_compliant, score, len(violations)
+        )
         
         return is_compliant, max(0, score), violations
@@ -50,25 +50,37 @@ class SignatureService:
             # Reconstruct canonical JSON (same as DPA)
             # Note: TPMSigner signs the base64-decoded JSON bytes
             # So we need to verify against the raw JSON bytes, not base64
-            canonical_json = json.dumps(report, sort_keys=True)
-            message = canonical_json.encode()
-            
-            # Verify RSA signature with PKCS#1 v1.5 padding and SHA256
-            # This matches TPMSigner's SignData() which uses PKCS#1 v1.5
-            public_key.verify(
-                signature,
-                message,
-                padding.PKCS1v15(),
-                hashes.SHA256()
-            )
+            for message in SignatureService._canonical_forms(report):
+                # Verify RSA signature with PKCS#1 v1.5 padding and SHA256
+                # This matches TPMSigner's SignData() which uses PKCS#1 v1.5
+                try:
+                    public_key.verify(
+                        signature,
+                        message,
+                        padding.PKCS1v15(),
+                        hashes.SHA256()
+                    )
+                    return True, ""
+                except InvalidSignature:
+                    continue
             
-            return True, ""
+            raise InvalidSignature()
             
         except InvalidSignature:
             return False, "Invalid signature - report may be tampered"
         except Exception as e:
             return False, f"Signature verification failed: {str(e)}"
     
+    @staticmethod
+    def _canonical_forms(report: dict):
+        """
+        Canonical JSON encodings a DPA may have signed, current form first:
+        compact separators with UTF-8 output, then the legacy
+        json.dumps(sort_keys=True) form used by older DPA builds
+        """
+        yield json.dumps(report, sort_keys=True, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        yield json.dumps(report, sort_keys=True).encode()
+    
     @staticmethod
     def _normalize_public_key(public_key_str: str) -> str:
         """
@@ -0,0 +1,168 @@
+# tests/conftest.py
+
+"""
+Shared fixtures for the pytest entry points in test_live_api.py
+
+Run with: pytest -n auto backend/tests
+
+--http=record saves every response under tests/fixtures/http while
+running against the live stack; --http=replay serves those recordings
+instead, so the suite runs without the backend or Keycloak. Token and
+secret fields are redacted in the saved copies; the directory is git-ignored.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import httpx
+import orjson
+import pytest
+import pytest_asyncio
+
+from tests.test_integration_complete import BASE_URL, KEYCLOAK_URL, KEYCLOAK_REALM
+from tests.test_tpm_attestation import get_keycloak_token, get_user_devices
+
+# Standalone scripts: they depend on run order or report by return value,
+# so they are run directly (python -m tests.<name>) rather than collected
+collect_ignore = [
+    "test_all_endpoints.py",
+    "test_data.py",
+    "test_integration.py",
+    "test_integration_complete.py",
+    "test_signature.py",
+    "test_tpm_attestation.py",
+]
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "http"
+
+# Each xdist worker keeps one pool of connections for its whole session
+LIMITS = httpx.Limits(max_keepalive_connections=10)
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--http",
+        choices=("live", "record", "replay"),
+        default="live",
+        help="live: use the running stack; record: also save responses; replay: serve saved responses",
+    )
+
+# Response fields that must never be written to disk
+SECRET_FIELDS = frozenset({
+    "access_token", "refresh_token", "id_token", "client_secret", "password",
+})
+
+def _redact_value(value):
+    if isinstance(value, dict):
+        return {
+            k: "REDACTED" if k in SECRET_FIELDS else _redact_value(v)
+            for k, v in value.items()
+        }
+    if isinstance(value, list):
+        return [_redact_value(v) for v in value]
+    return value
+
+def _redact(content: bytes) -> bytes:
+    """Blank out token/secret fields in a JSON body; other bodies are kept as-is"""
+    try:
+        data = orjson.loads(content)
+    except orjson.JSONDecodeError:
+        return content
+    return orjson.dumps(_redact_value(data))
+
+def _fixture_path(request: httpx.Request) -> Path:
+    """Recordings are keyed by method, URL and body (not headers, so tokens don't matter)"""
+    key = hashlib.sha256(b"\n".join([
+        request.method.encode(),
+        str(request.url).encode(),
+        request.content,
+    ])).hexdigest()[:16]
+    return FIXTURES_DIR / f"{key}.json"
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """Pass requests through to the network and save each response"""
+
+    def __init__(self):
+        self._transport = httpx.AsyncHTTPTransport(limits=LIMITS)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self._transport.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        headers = {"content-type": response.headers.get("content-type", "application/json")}
+        FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+        _fixture_path(request).write_bytes(orjson.dumps({
+            "request": f"{request.method} {request.url}",
+            "status_code": response.status_code,
+            "headers": headers,
+            "content": _redact(content).decode("utf-8", errors="replace"),
+        }, option=orjson.OPT_INDENT_2))
+        return httpx.Response(response.status_code, headers=headers, content=content, request=request)
+
+    async def aclose(self):
+        await self._transport.aclose()
+
+def _replay(request: httpx.Request) -> httpx.Response:
+    try:
+        recorded = orjson.loads(_fixture_path(request).read_bytes())
+    except FileNotFoundError:
+        raise LookupError(f"No recorded response for {request.method} {request.url}; run with --http=record")
+    return httpx.Response(recorded["status_code"], headers=recorded["headers"], content=recorded["content"].encode())
+
+def _transport(mode: str):
+    if mode == "record":
+        return RecordingTransport()
+    if mode == "replay":
+        return httpx.MockTransport(_replay)
+    return None
+
+def _make_client(pytestconfig, **kwargs) -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        timeout=10.0,
+        limits=LIMITS,
+        transport=_transport(pytestconfig.getoption("http")),
+        **kwargs
+    )
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(pytestconfig):
+    """Unauthenticated HTTP client shared by every test in the session"""
+    async with _make_client(pytestconfig) as client:
+        yield client
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def token(client):
+    """Keycloak access token from ZTNA_TEST_TOKEN, or a password grant"""
+    token = os.environ.get("ZTNA_TEST_TOKEN") or await get_keycloak_token(client)
+    if not token:
+        pytest.skip("No Keycloak token (set ZTNA_TEST_TOKEN)")
+    return token
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def api(pytestconfig, token):
+    """Client rooted at the backend API that sends the bearer token on every request"""
+    async with _make_client(
+        pytestconfig,
+        base_url=BASE_URL,
+        headers={"Authorization": f"Bearer {token}"}
+    ) as api:
+        yield api
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def oidc_config(client):
+    """Keycloak OIDC discovery document, fetched once per session"""
+    response = await client.get(f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/.well-known/openid-configuration")
+    assert response.status_code == 200, f"OIDC discovery failed: {response.status_code}"
+    return orjson.loads(response.content)
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def enrolled_device(client, token):
+    """First enrolled, active device of the test user, looked up once per session"""
+    devices = await get_user_devices(client, token)
+    device = next(
+        (d for d in devices or [] if d.get("is_enrolled") and d.get("status") == "active"),
+        None
+    )
+    if not device:
+        pytest.skip("No enrolled and active device")
+    return device
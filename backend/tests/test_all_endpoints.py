@@ -8,12 +8,22 @@ All operations are tracked in audit logs
 
 import asyncio
 import httpx
+import orjson
+from contextlib import AsyncExitStack
+from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
-from typing import Optional
+from typing import Dict, Optional
 from app.config import settings
 
+try:
+    import uvloop  # libuv-backed event loop, not available on Windows
+except ImportError:
+    uvloop = None
+
 BASE_URL = "http://localhost:8000/api"
 KEYCLOAK_URL = "http://localhost:8080"
+# Root health check lives outside the /api prefix
+HEALTH_URL = httpx.URL(BASE_URL).join("/health")
 
 # Configuration
 REALM = "master"  # Updated to match current Keycloak configuration
@@ -23,23 +33,35 @@ TEST_USERNAME = "admin"
 TEST_PASSWORD = "adminsecure123"  # Default Keycloak admin password
 
 # Store test data
-test_data = {
-    "token": None,
-    "user": None,
-    "enrollment_code": None,
-    "device": None,
-    "policy": None,
+@dataclass(slots=True)
+class TestData:
+    """Resources created during the run and shared between tests"""
+    __test__ = False  # not a pytest test class
+
+    token: Optional[str] = None
+    user: Optional[dict] = None
+    enrollment_code: Optional[dict] = None
+    device: Optional[dict] = None
+    policy: Optional[dict] = None
     # Deletable resources (created specifically for deletion)
-    "deletable_device": None,
-    "deletable_policy": None,
-    "deletable_enrollment_code": None
-}
+    deletable_device: Optional[dict] = None
+    deletable_policy: Optional[dict] = None
+    deletable_enrollment_code: Optional[dict] = None
+
+test_data = TestData()
+
+# Shared HTTP clients, one per origin (opened in main()); requests use paths
+# relative to the origin, so the base URL is parsed once per client
+clients: Dict[str, httpx.AsyncClient] = {}
 
 # Test statistics
 stats = {
     "passed": 0,
     "failed": 0,
-    "total": 0
+    "total": 0,
+    "skipped": 0,
+    # Section prerequisites (user, enrollment_code, device, policy) -> succeeded?
+    "prereqs": {}
 }
 
 def log_result(test_name: str, passed: bool):
@@ -50,10 +72,27 @@ def log_result(test_name: str, passed: bool):
     else:
         stats["failed"] += 1
 
+def prereq_failed(*prereqs: str) -> Optional[str]:
+    """Return the first prerequisite recorded as failed, if any"""
+    return next((p for p in prereqs if stats["prereqs"].get(p) is False), None)
+
+async def run_gated(tests, *prereqs: str, concurrent: bool = False):
+    """Run a group of tests, or skip all of them when a prerequisite failed"""
+    failed = prereq_failed(*prereqs)
+    if failed:
+        stats["skipped"] += len(tests)
+        print(f"\n⏭️  SKIPPED: prereq {failed} failed ({', '.join(t.__name__ for t in tests)})")
+        return
+    if concurrent:
+        await asyncio.gather(*(test() for test in tests))
+    else:
+        for test in tests:
+            await test()
+
 async def get_token():
     """Get authentication token"""
     print("\n🔐 Getting authentication token...")
-    token_url = f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/token"
+    token_url = f"/realms/{REALM}/protocol/openid-connect/token"
     
     data = {
         "grant_type": "password",
@@ -65,20 +104,16 @@ async def get_token():
     if CLIENT_SECRET:
         data["client_secret"] = CLIENT_SECRET
     
-    async with httpx.AsyncClient() as client:
-        response = await client.post(token_url, data=data)
-        if response.status_code == 200:
-            token = response.json().get("access_token")
-            test_data["token"] = token
-            print(f"✅ Token obtained")
-            return token
-        else:
-            print(f"❌ Failed to get token: {response.status_code}")
-            return None
-
-def get_headers():
-    """Get authorization headers"""
-    return {"Authorization": f"Bearer {test_data['token']}"}
+    client = clients[KEYCLOAK_URL]
+    response = await client.post(token_url, data=data)
+    if response.status_code == 200:
+        token = orjson.loads(response.content).get("access_token")
+        test_data.token = token
+        print(f"✅ Token obtained")
+        return token
+    else:
+        print(f"❌ Failed to get token: {response.status_code}")
+        return None
 
 # ==============================================
 # USER ENDPOINT TESTS
@@ -87,52 +122,51 @@ def get_headers():
 async def test_get_current_user():
     """Test GET /api/users/me"""
     print("\n👤 Testing GET /api/users/me")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/users/me", headers=get_headers())
-        if response.status_code == 200:
-            user = response.json()
-            test_data["user"] = user
-            print(f"✅ User: {user['username']} ({user['email']})")
-            log_result("GET /api/users/me", True)
-            return user
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/users/me", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/users/me")
+    if response.status_code == 200:
+        user = orjson.loads(response.content)
+        test_data.user = user
+        print(f"✅ User: {user['username']} ({user['email']})")
+        log_result("GET /api/users/me", True)
+        return user
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/users/me", False)
+        return None
 
 async def test_get_current_user_with_devices():
     """Test GET /api/users/me/devices"""
     print("\n👤 Testing GET /api/users/me/devices")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/users/me/devices", headers=get_headers())
-        if response.status_code == 200:
-            user = response.json()
-            print(f"✅ User has {len(user.get('devices', []))} device(s)")
-            log_result("GET /api/users/me/devices", True)
-            return user
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/users/me/devices", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/users/me/devices")
+    if response.status_code == 200:
+        user = orjson.loads(response.content)
+        print(f"✅ User has {len(user.get('devices', []))} device(s)")
+        log_result("GET /api/users/me/devices", True)
+        return user
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/users/me/devices", False)
+        return None
 
 async def test_update_user():
     """Test PATCH /api/users/me"""
     print("\n👤 Testing PATCH /api/users/me")
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{BASE_URL}/users/me",
-            json={"first_name": "Test", "last_name": "User"},
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            user = response.json()
-            print(f"✅ Updated user: {user['first_name']} {user['last_name']}")
-            log_result("PATCH /api/users/me", True)
-            return user
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("PATCH /api/users/me", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.patch(
+        "/users/me",
+        content=orjson.dumps({"first_name": "Test", "last_name": "User"})
+    )
+    if response.status_code == 200:
+        user = orjson.loads(response.content)
+        print(f"✅ Updated user: {user['first_name']} {user['last_name']}")
+        log_result("PATCH /api/users/me", True)
+        return user
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("PATCH /api/users/me", False)
+        return None
 
 # ==============================================
 # ENROLLMENT ENDPOINT TESTS
@@ -141,88 +175,83 @@ async def test_update_user():
 async def test_create_enrollment_code():
     """Test POST /api/enrollment/codes/"""
     print("\n🎫 Testing POST /api/enrollment/codes/ (permanent)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/enrollment/codes",
-            json={
-                "description": "Permanent test enrollment code",
-                "max_uses": 10,
-                "expires_at": (datetime.now(timezone.utc) + timedelta(days=90)).isoformat()
-            },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            code = response.json()
-            test_data["enrollment_code"] = code
-            print(f"✅ Created code: {code['code']}")
-            log_result("POST /api/enrollment/codes/", True)
-            return code
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/enrollment/codes/", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/enrollment/codes",
+        content=orjson.dumps({
+            "description": "Permanent test enrollment code",
+            "max_uses": 10,
+            "expires_at": (datetime.now(timezone.utc) + timedelta(days=90)).isoformat()
+        })
+    )
+    if response.status_code == 201:
+        code = orjson.loads(response.content)
+        test_data.enrollment_code = code
+        print(f"✅ Created code: {code['code']}")
+        log_result("POST /api/enrollment/codes/", True)
+        return code
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/enrollment/codes/", False)
+        return None
 
 async def test_create_deletable_enrollment_code():
     """Test POST /api/enrollment/codes/ (for deletion)"""
     print("\n🎫 Testing POST /api/enrollment/codes/ (deletable)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/enrollment/codes",
-            json={
-                "description": "⚠️ DELETABLE - Test enrollment code for deletion",
-                "max_uses": 1,
-                "expires_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
-            },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            code = response.json()
-            test_data["deletable_enrollment_code"] = code
-            print(f"✅ Created deletable code: {code['code']}")
-            log_result("POST /api/enrollment/codes/ (deletable)", True)
-            return code
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/enrollment/codes/ (deletable)", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/enrollment/codes",
+        content=orjson.dumps({
+            "description": "⚠️ DELETABLE - Test enrollment code for deletion",
+            "max_uses": 1,
+            "expires_at": (datetime.now(timezone.utc) + timedelta(days=1)).isoformat()
+        })
+    )
+    if response.status_code == 201:
+        code = orjson.loads(response.content)
+        test_data.deletable_enrollment_code = code
+        print(f"✅ Created deletable code: {code['code']}")
+        log_result("POST /api/enrollment/codes/ (deletable)", True)
+        return code
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/enrollment/codes/ (deletable)", False)
+        return None
 
 async def test_list_enrollment_codes():
     """Test GET /api/enrollment/codes"""
     print("\n🎫 Testing GET /api/enrollment/codes")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/enrollment/codes", headers=get_headers())
-        if response.status_code == 200:
-            codes = response.json()
-            print(f"✅ Found {len(codes)} enrollment code(s)")
-            log_result("GET /api/enrollment/codes", True)
-            return codes
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/enrollment/codes", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/enrollment/codes")
+    if response.status_code == 200:
+        codes = orjson.loads(response.content)
+        print(f"✅ Found {len(codes)} enrollment code(s)")
+        log_result("GET /api/enrollment/codes", True)
+        return codes
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/enrollment/codes", False)
+        return None
 
 async def test_deactivate_enrollment_code():
     """Test POST /api/enrollment/codes/{id}/deactivate"""
-    if not test_data.get("deletable_enrollment_code"):
+    if not test_data.deletable_enrollment_code:
         print("\n⏭️  Skipping deactivate test (no deletable code)")
         return None
     
-    code_id = test_data["deletable_enrollment_code"]["id"]
+    code_id = test_data.deletable_enrollment_code["id"]
     print(f"\n🎫 Testing POST /api/enrollment/codes/{code_id}/deactivate")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/enrollment/codes/{code_id}/deactivate",
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            code = response.json()
-            print(f"✅ Deactivated code (active: {code['is_active']})")
-            log_result("POST /api/enrollment/codes/{id}/deactivate", True)
-            return code
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("POST /api/enrollment/codes/{id}/deactivate", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(f"/enrollment/codes/{code_id}/deactivate")
+    if response.status_code == 200:
+        code = orjson.loads(response.content)
+        print(f"✅ Deactivated code (active: {code['is_active']})")
+        log_result("POST /api/enrollment/codes/{id}/deactivate", True)
+        return code
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("POST /api/enrollment/codes/{id}/deactivate", False)
+        return None
 
 # ==============================================
 # DEVICE ENDPOINT TESTS
@@ -230,155 +259,149 @@ async def test_deactivate_enrollment_code():
 
 async def test_enroll_device():
     """Test POST /api/devices/enroll (permanent)"""
-    if not test_data.get("enrollment_code"):
+    if not test_data.enrollment_code:
         await test_create_enrollment_code()
     
     print("\n💻 Testing POST /api/devices/enroll (permanent)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/devices/enroll",
-            json={
-                "enrollment_code": test_data["enrollment_code"]["code"],
-                "device_name": "Permanent Test Device",
-                "device_unique_id": f"permanent-tpm-{int(datetime.now().timestamp())}",
-                "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nPERMANENT_KEY\n-----END PUBLIC KEY-----",
-                "os_type": "Windows",
-                "os_version": "11",
-                "device_model": "Surface Laptop",
-                "manufacturer": "Microsoft"
-            },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            device = response.json()
-            test_data["device"] = device
-            print(f"✅ Enrolled device: {device['device_name']} (ID: {device['id']})")
-            log_result("POST /api/devices/enroll", True)
-            return device
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/devices/enroll", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/devices/enroll",
+        content=orjson.dumps({
+            "enrollment_code": test_data.enrollment_code["code"],
+            "device_name": "Permanent Test Device",
+            "device_unique_id": f"permanent-tpm-{int(datetime.now().timestamp())}",
+            "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nPERMANENT_KEY\n-----END PUBLIC KEY-----",
+            "os_type": "Windows",
+            "os_version": "11",
+            "device_model": "Surface Laptop",
+            "manufacturer": "Microsoft"
+        })
+    )
+    if response.status_code == 201:
+        device = orjson.loads(response.content)
+        test_data.device = device
+        print(f"✅ Enrolled device: {device['device_name']} (ID: {device['id']})")
+        log_result("POST /api/devices/enroll", True)
+        return device
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/devices/enroll", False)
+        return None
 
 async def test_enroll_deletable_device():
     """Test POST /api/devices/enroll (for deletion)"""
-    if not test_data.get("enrollment_code"):
+    if not test_data.enrollment_code:
         await test_create_enrollment_code()
     
     print("\n💻 Testing POST /api/devices/enroll (deletable)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/devices/enroll",
-            json={
-                "enrollment_code": test_data["enrollment_code"]["code"],
-                "device_name": "⚠️ DELETABLE - Test Device for Deletion",
-                "device_unique_id": f"deletable-tpm-{int(datetime.now().timestamp())}",
-                "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nDELETABLE_KEY\n-----END PUBLIC KEY-----",
-                "os_type": "Linux",
-                "os_version": "Ubuntu 22.04",
-                "device_model": "Test VM",
-                "manufacturer": "VirtualBox"
-            },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            device = response.json()
-            test_data["deletable_device"] = device
-            print(f"✅ Enrolled deletable device: {device['device_name']} (ID: {device['id']})")
-            log_result("POST /api/devices/enroll (deletable)", True)
-            return device
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/devices/enroll (deletable)", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/devices/enroll",
+        content=orjson.dumps({
+            "enrollment_code": test_data.enrollment_code["code"],
+            "device_name": "⚠️ DELETABLE - Test Device for Deletion",
+            "device_unique_id": f"deletable-tpm-{int(datetime.now().timestamp())}",
+            "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nDELETABLE_KEY\n-----END PUBLIC KEY-----",
+            "os_type": "Linux",
+            "os_version": "Ubuntu 22.04",
+            "device_model": "Test VM",
+            "manufacturer": "VirtualBox"
+        })
+    )
+    if response.status_code == 201:
+        device = orjson.loads(response.content)
+        test_data.deletable_device = device
+        print(f"✅ Enrolled deletable device: {device['device_name']} (ID: {device['id']})")
+        log_result("POST /api/devices/enroll (deletable)", True)
+        return device
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/devices/enroll (deletable)", False)
+        return None
 
 async def test_list_devices():
     """Test GET /api/devices"""
     print("\n💻 Testing GET /api/devices")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/devices", headers=get_headers())
-        if response.status_code == 200:
-            devices = response.json()
-            print(f"✅ Found {len(devices)} device(s)")
-            for device in devices:
-                marker = "⚠️ " if "DELETABLE" in device['device_name'] else ""
-                print(f"   {marker}- {device['device_name']} (Compliant: {device['is_compliant']})")
-            log_result("GET /api/devices", True)
-            return devices
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/devices", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/devices")
+    if response.status_code == 200:
+        devices = orjson.loads(response.content)
+        print(f"✅ Found {len(devices)} device(s)")
+        for device in devices:
+            marker = "⚠️ " if "DELETABLE" in device['device_name'] else ""
+            print(f"   {marker}- {device['device_name']} (Compliant: {device['is_compliant']})")
+        log_result("GET /api/devices", True)
+        return devices
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/devices", False)
+        return None
 
 async def test_get_device():
     """Test GET /api/devices/{id}"""
-    if not test_data.get("device"):
+    if not test_data.device:
         print("\n⏭️  Skipping get device test")
         return None
     
-    device_id = test_data["device"]["id"]
+    device_id = test_data.device["id"]
     print(f"\n💻 Testing GET /api/devices/{device_id}")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/devices/{device_id}", headers=get_headers())
-        if response.status_code == 200:
-            device = response.json()
-            print(f"✅ Device: {device['device_name']}")
-            log_result("GET /api/devices/{id}", True)
-            return device
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/devices/{id}", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get(f"/devices/{device_id}")
+    if response.status_code == 200:
+        device = orjson.loads(response.content)
+        print(f"✅ Device: {device['device_name']}")
+        log_result("GET /api/devices/{id}", True)
+        return device
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/devices/{id}", False)
+        return None
 
 async def test_update_device():
     """Test PATCH /api/devices/{id}"""
-    if not test_data.get("device"):
+    if not test_data.device:
         print("\n⏭️  Skipping update device test")
         return None
     
-    device_id = test_data["device"]["id"]
+    device_id = test_data.device["id"]
     print(f"\n💻 Testing PATCH /api/devices/{device_id}")
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{BASE_URL}/devices/{device_id}",
-            json={"device_name": "Permanent Test Device (Updated)"},
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            device = response.json()
-            print(f"✅ Updated device: {device['device_name']}")
-            log_result("PATCH /api/devices/{id}", True)
-            return device
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("PATCH /api/devices/{id}", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.patch(
+        f"/devices/{device_id}",
+        content=orjson.dumps({"device_name": "Permanent Test Device (Updated)"})
+    )
+    if response.status_code == 200:
+        device = orjson.loads(response.content)
+        print(f"✅ Updated device: {device['device_name']}")
+        log_result("PATCH /api/devices/{id}", True)
+        return device
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("PATCH /api/devices/{id}", False)
+        return None
 
 async def test_delete_device():
     """Test DELETE /api/devices/{id}"""
-    if not test_data.get("deletable_device"):
+    if not test_data.deletable_device:
         print("\n⏭️  Skipping delete device test")
         return None
     
-    device_id = test_data["deletable_device"]["id"]
-    device_name = test_data["deletable_device"]["device_name"]
+    device_id = test_data.deletable_device["id"]
+    device_name = test_data.deletable_device["device_name"]
     print(f"\n💻 Testing DELETE /api/devices/{device_id}")
     print(f"   Deleting: {device_name}")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(
-            f"{BASE_URL}/devices/{device_id}",
-            headers=get_headers()
-        )
-        if response.status_code == 204:
-            print(f"✅ Device deleted successfully")
-            print(f"   ℹ️  Check audit logs for deletion record")
-            log_result("DELETE /api/devices/{id}", True)
-            return True
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("DELETE /api/devices/{id}", False)
-            return False
+    client = clients[BASE_URL]
+    response = await client.delete(f"/devices/{device_id}")
+    if response.status_code == 204:
+        print(f"✅ Device deleted successfully")
+        print(f"   ℹ️  Check audit logs for deletion record")
+        log_result("DELETE /api/devices/{id}", True)
+        return True
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("DELETE /api/devices/{id}", False)
+        return False
 
 # ==============================================
 # POSTURE ENDPOINT TESTS
@@ -386,84 +409,77 @@ async def test_delete_device():
 
 async def test_submit_posture():
     """Test POST /api/posture/submit"""
-    if not test_data.get("device"):
+    if not test_data.device:
         print("\n⏭️  Skipping posture submit test")
         return None
     
     print("\n🛡️  Testing POST /api/posture/submit")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/posture/submit",
-            json={
-                "device_unique_id": test_data["device"]["device_unique_id"],
-                "posture_data": {
-                    "antivirus_enabled": True,
-                    "firewall_enabled": True,
-                    "disk_encrypted": True,
-                    "pending_updates": 3,
-                    "screen_lock_enabled": True
-                },
-                "signature": "test_signature_123"
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/posture/submit",
+        content=orjson.dumps({
+            "device_unique_id": test_data.device["device_unique_id"],
+            "posture_data": {
+                "antivirus_enabled": True,
+                "firewall_enabled": True,
+                "disk_encrypted": True,
+                "pending_updates": 3,
+                "screen_lock_enabled": True
             },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            posture = response.json()
-            print(f"✅ Posture: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
-            if posture.get('violations'):
-                print(f"   Violations: {posture['violations']}")
-            log_result("POST /api/posture/submit", True)
-            return posture
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/posture/submit", False)
-            return None
+            "signature": "test_signature_123"
+        })
+    )
+    if response.status_code == 201:
+        posture = orjson.loads(response.content)
+        print(f"✅ Posture: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
+        if posture.get('violations'):
+            print(f"   Violations: {posture['violations']}")
+        log_result("POST /api/posture/submit", True)
+        return posture
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/posture/submit", False)
+        return None
 
 async def test_get_posture_history():
     """Test GET /api/posture/device/{id}/history"""
-    if not test_data.get("device"):
+    if not test_data.device:
         print("\n⏭️  Skipping posture history test")
         return None
     
-    device_id = test_data["device"]["id"]
+    device_id = test_data.device["id"]
     print(f"\n🛡️  Testing GET /api/posture/device/{device_id}/history")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/posture/device/{device_id}/history",
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            history = response.json()
-            print(f"✅ Found {len(history)} posture check(s)")
-            log_result("GET /api/posture/device/{id}/history", True)
-            return history
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/posture/device/{id}/history", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get(f"/posture/device/{device_id}/history")
+    if response.status_code == 200:
+        history = orjson.loads(response.content)
+        print(f"✅ Found {len(history)} posture check(s)")
+        log_result("GET /api/posture/device/{id}/history", True)
+        return history
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/posture/device/{id}/history", False)
+        return None
 
 async def test_get_latest_posture():
     """Test GET /api/posture/device/{id}/latest"""
-    if not test_data.get("device"):
+    if not test_data.device:
         print("\n⏭️  Skipping latest posture test")
         return None
     
-    device_id = test_data["device"]["id"]
+    device_id = test_data.device["id"]
     print(f"\n🛡️  Testing GET /api/posture/device/{device_id}/latest")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{BASE_URL}/posture/device/{device_id}/latest",
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            posture = response.json()
-            print(f"✅ Latest posture: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
-            log_result("GET /api/posture/device/{id}/latest", True)
-            return posture
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/posture/device/{id}/latest", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get(f"/posture/device/{device_id}/latest")
+    if response.status_code == 200:
+        posture = orjson.loads(response.content)
+        print(f"✅ Latest posture: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
+        log_result("GET /api/posture/device/{id}/latest", True)
+        return posture
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/posture/device/{id}/latest", False)
+        return None
 
 # ==============================================
 # POLICY ENDPOINT TESTS
@@ -472,199 +488,187 @@ async def test_get_latest_posture():
 async def test_create_policy():
     """Test POST /api/policies/ (permanent)"""
     print("\n📋 Testing POST /api/policies/ (permanent)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/policies/",
-            json={
-                "name": "Permanent Security Policy",
-                "description": "Comprehensive security policy for production",
-                "policy_type": "posture",
-                "rules": {
-                    "antivirus_enabled": True,
-                    "firewall_enabled": True,
-                    "disk_encrypted": True,
-                    "min_os_version": "10.0",
-                    "max_pending_updates": 10
-                },
-                "priority": 100,
-                "enforce_mode": "enforce"
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/policies/",
+        content=orjson.dumps({
+            "name": "Permanent Security Policy",
+            "description": "Comprehensive security policy for production",
+            "policy_type": "posture",
+            "rules": {
+                "antivirus_enabled": True,
+                "firewall_enabled": True,
+                "disk_encrypted": True,
+                "min_os_version": "10.0",
+                "max_pending_updates": 10
             },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            policy = response.json()
-            test_data["policy"] = policy
-            print(f"✅ Created policy: {policy['name']} (ID: {policy['id']})")
-            log_result("POST /api/policies/", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/policies/", False)
-            return None
+            "priority": 100,
+            "enforce_mode": "enforce"
+        })
+    )
+    if response.status_code == 201:
+        policy = orjson.loads(response.content)
+        test_data.policy = policy
+        print(f"✅ Created policy: {policy['name']} (ID: {policy['id']})")
+        log_result("POST /api/policies/", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/policies/", False)
+        return None
 
 async def test_create_deletable_policy():
     """Test POST /api/policies/ (for deletion)"""
     print("\n📋 Testing POST /api/policies/ (deletable)")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/policies/",
-            json={
-                "name": f"⚠️ DELETABLE Policy {datetime.now().timestamp()}",
-                "description": "Temporary policy for deletion testing",
-                "policy_type": "posture",
-                "rules": {
-                    "antivirus_enabled": True,
-                    "firewall_enabled": False
-                },
-                "priority": 50,
-                "enforce_mode": "monitor"
+    client = clients[BASE_URL]
+    response = await client.post(
+        "/policies/",
+        content=orjson.dumps({
+            "name": f"⚠️ DELETABLE Policy {datetime.now().timestamp()}",
+            "description": "Temporary policy for deletion testing",
+            "policy_type": "posture",
+            "rules": {
+                "antivirus_enabled": True,
+                "firewall_enabled": False
             },
-            headers=get_headers()
-        )
-        if response.status_code == 201:
-            policy = response.json()
-            test_data["deletable_policy"] = policy
-            print(f"✅ Created deletable policy: {policy['name']} (ID: {policy['id']})")
-            log_result("POST /api/policies/ (deletable)", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code} - {response.text}")
-            log_result("POST /api/policies/ (deletable)", False)
-            return None
+            "priority": 50,
+            "enforce_mode": "monitor"
+        })
+    )
+    if response.status_code == 201:
+        policy = orjson.loads(response.content)
+        test_data.deletable_policy = policy
+        print(f"✅ Created deletable policy: {policy['name']} (ID: {policy['id']})")
+        log_result("POST /api/policies/ (deletable)", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code} - {response.text}")
+        log_result("POST /api/policies/ (deletable)", False)
+        return None
 
 async def test_list_policies():
     """Test GET /api/policies"""
     print("\n📋 Testing GET /api/policies")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/policies", headers=get_headers())
-        if response.status_code == 200:
-            policies = response.json()
-            print(f"✅ Found {len(policies)} policy/policies")
-            for policy in policies:
-                marker = "⚠️ " if "DELETABLE" in policy['name'] else ""
-                print(f"   {marker}- {policy['name']} (Active: {policy['is_active']})")
-            log_result("GET /api/policies", True)
-            return policies
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/policies", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/policies")
+    if response.status_code == 200:
+        policies = orjson.loads(response.content)
+        print(f"✅ Found {len(policies)} policy/policies")
+        for policy in policies:
+            marker = "⚠️ " if "DELETABLE" in policy['name'] else ""
+            print(f"   {marker}- {policy['name']} (Active: {policy['is_active']})")
+        log_result("GET /api/policies", True)
+        return policies
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/policies", False)
+        return None
 
 async def test_get_policy():
     """Test GET /api/policies/{id}"""
-    if not test_data.get("policy"):
+    if not test_data.policy:
         print("\n⏭️  Skipping get policy test")
         return None
     
-    policy_id = test_data["policy"]["id"]
+    policy_id = test_data.policy["id"]
     print(f"\n📋 Testing GET /api/policies/{policy_id}")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/policies/{policy_id}", headers=get_headers())
-        if response.status_code == 200:
-            policy = response.json()
-            print(f"✅ Policy: {policy['name']}")
-            log_result("GET /api/policies/{id}", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/policies/{id}", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get(f"/policies/{policy_id}")
+    if response.status_code == 200:
+        policy = orjson.loads(response.content)
+        print(f"✅ Policy: {policy['name']}")
+        log_result("GET /api/policies/{id}", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/policies/{id}", False)
+        return None
 
 async def test_update_policy():
     """Test PATCH /api/policies/{id}"""
-    if not test_data.get("policy"):
+    if not test_data.policy:
         print("\n⏭️  Skipping update policy test")
         return None
     
-    policy_id = test_data["policy"]["id"]
+    policy_id = test_data.policy["id"]
     print(f"\n📋 Testing PATCH /api/policies/{policy_id}")
-    async with httpx.AsyncClient() as client:
-        response = await client.patch(
-            f"{BASE_URL}/policies/{policy_id}",
-            json={"priority": 150, "description": "Updated policy description"},
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            policy = response.json()
-            print(f"✅ Updated policy: Priority={policy['priority']}")
-            log_result("PATCH /api/policies/{id}", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("PATCH /api/policies/{id}", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.patch(
+        f"/policies/{policy_id}",
+        content=orjson.dumps({"priority": 150, "description": "Updated policy description"})
+    )
+    if response.status_code == 200:
+        policy = orjson.loads(response.content)
+        print(f"✅ Updated policy: Priority={policy['priority']}")
+        log_result("PATCH /api/policies/{id}", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("PATCH /api/policies/{id}", False)
+        return None
 
 async def test_deactivate_policy():
     """Test POST /api/policies/{id}/deactivate"""
-    if not test_data.get("deletable_policy"):
+    if not test_data.deletable_policy:
         print("\n⏭️  Skipping deactivate policy test")
         return None
     
-    policy_id = test_data["deletable_policy"]["id"]
+    policy_id = test_data.deletable_policy["id"]
     print(f"\n📋 Testing POST /api/policies/{policy_id}/deactivate")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/policies/{policy_id}/deactivate",
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            policy = response.json()
-            print(f"✅ Deactivated policy (Active: {policy['is_active']})")
-            log_result("POST /api/policies/{id}/deactivate", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("POST /api/policies/{id}/deactivate", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(f"/policies/{policy_id}/deactivate")
+    if response.status_code == 200:
+        policy = orjson.loads(response.content)
+        print(f"✅ Deactivated policy (Active: {policy['is_active']})")
+        log_result("POST /api/policies/{id}/deactivate", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("POST /api/policies/{id}/deactivate", False)
+        return None
 
 async def test_activate_policy():
     """Test POST /api/policies/{id}/activate"""
-    if not test_data.get("deletable_policy"):
+    if not test_data.deletable_policy:
         print("\n⏭️  Skipping activate policy test")
         return None
     
-    policy_id = test_data["deletable_policy"]["id"]
+    policy_id = test_data.deletable_policy["id"]
     print(f"\n📋 Testing POST /api/policies/{policy_id}/activate")
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{BASE_URL}/policies/{policy_id}/activate",
-            headers=get_headers()
-        )
-        if response.status_code == 200:
-            policy = response.json()
-            print(f"✅ Activated policy (Active: {policy['is_active']})")
-            log_result("POST /api/policies/{id}/activate", True)
-            return policy
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("POST /api/policies/{id}/activate", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.post(f"/policies/{policy_id}/activate")
+    if response.status_code == 200:
+        policy = orjson.loads(response.content)
+        print(f"✅ Activated policy (Active: {policy['is_active']})")
+        log_result("POST /api/policies/{id}/activate", True)
+        return policy
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("POST /api/policies/{id}/activate", False)
+        return None
 
 async def test_delete_policy():
     """Test DELETE /api/policies/{id}"""
-    if not test_data.get("deletable_policy"):
+    if not test_data.deletable_policy:
         print("\n⏭️  Skipping delete policy test")
         return None
     
-    policy_id = test_data["deletable_policy"]["id"]
-    policy_name = test_data["deletable_policy"]["name"]
+    policy_id = test_data.deletable_policy["id"]
+    policy_name = test_data.deletable_policy["name"]
     print(f"\n📋 Testing DELETE /api/policies/{policy_id}")
     print(f"   Deleting: {policy_name}")
     
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(
-            f"{BASE_URL}/policies/{policy_id}",
-            headers=get_headers()
-        )
-        if response.status_code == 204:
-            print(f"✅ Policy deleted successfully")
-            print(f"   ℹ️  Check audit logs for deletion record")
-            log_result("DELETE /api/policies/{id}", True)
-            return True
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("DELETE /api/policies/{id}", False)
-            return False
+    client = clients[BASE_URL]
+    response = await client.delete(f"/policies/{policy_id}")
+    if response.status_code == 204:
+        print(f"✅ Policy deleted successfully")
+        print(f"   ℹ️  Check audit logs for deletion record")
+        log_result("DELETE /api/policies/{id}", True)
+        return True
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("DELETE /api/policies/{id}", False)
+        return False
 
 # ==============================================
 # AUDIT ENDPOINT TESTS
@@ -673,62 +677,62 @@ async def test_delete_policy():
 async def test_get_audit_logs():
     """Test GET /api/audit/logs"""
     print("\n📝 Testing GET /api/audit/logs")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/audit/logs?limit=20", headers=get_headers())
-        if response.status_code == 200:
-            logs = response.json()
-            print(f"✅ Found {len(logs)} audit log(s)")
+    client = clients[BASE_URL]
+    response = await client.get("/audit/logs?limit=20")
+    if response.status_code == 200:
+        logs = orjson.loads(response.content)
+        print(f"✅ Found {len(logs)} audit log(s)")
             
-            # Show recent logs
-            print("\n   Recent audit events:")
-            for log in logs[:5]:
-                emoji = "✅" if log['status'] == 'success' else "❌"
-                print(f"   {emoji} {log['event_type']}: {log['action']} - {log.get('description', 'N/A')}")
+        # Show recent logs
+        print("\n   Recent audit events:")
+        for log in logs[:5]:
+            emoji = "✅" if log['status'] == 'success' else "❌"
+            print(f"   {emoji} {log['event_type']}: {log['action']} - {log.get('description', 'N/A')}")
             
-            # Check for delete operations
-            delete_logs = [log for log in logs if log['action'] == 'delete']
-            if delete_logs:
-                print(f"\n   🗑️  Found {len(delete_logs)} deletion record(s) in audit log:")
-                for log in delete_logs:
-                    print(f"      - {log['resource_type']} ID {log['resource_id']}: {log.get('description', 'N/A')}")
+        # Check for delete operations
+        delete_logs = [log for log in logs if log['action'] == 'delete']
+        if delete_logs:
+            print(f"\n   🗑️  Found {len(delete_logs)} deletion record(s) in audit log:")
+            for log in delete_logs:
+                print(f"      - {log['resource_type']} ID {log['resource_id']}: {log.get('description', 'N/A')}")
             
-            log_result("GET /api/audit/logs", True)
-            return logs
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/audit/logs", False)
-            return None
+        log_result("GET /api/audit/logs", True)
+        return logs
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/audit/logs", False)
+        return None
 
 async def test_get_my_audit_logs():
     """Test GET /api/audit/logs/me"""
     print("\n📝 Testing GET /api/audit/logs/me")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/audit/logs/me?limit=20", headers=get_headers())
-        if response.status_code == 200:
-            logs = response.json()
-            print(f"✅ Found {len(logs)} audit log(s) for current user")
-            log_result("GET /api/audit/logs/me", True)
-            return logs
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/audit/logs/me", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/audit/logs/me?limit=20")
+    if response.status_code == 200:
+        logs = orjson.loads(response.content)
+        print(f"✅ Found {len(logs)} audit log(s) for current user")
+        log_result("GET /api/audit/logs/me", True)
+        return logs
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/audit/logs/me", False)
+        return None
 
 async def test_get_event_types():
     """Test GET /api/audit/events/types"""
     print("\n📝 Testing GET /api/audit/events/types")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/audit/events/types", headers=get_headers())
-        if response.status_code == 200:
-            types = response.json()
-            print(f"✅ Found {len(types)} event types")
-            print(f"   Types: {', '.join(types)}")
-            log_result("GET /api/audit/events/types", True)
-            return types
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/audit/events/types", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/audit/events/types")
+    if response.status_code == 200:
+        types = orjson.loads(response.content)
+        print(f"✅ Found {len(types)} event types")
+        print(f"   Types: {', '.join(types)}")
+        log_result("GET /api/audit/events/types", True)
+        return types
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/audit/events/types", False)
+        return None
 
 # ==============================================
 # ACCESS ENDPOINT TESTS
@@ -737,32 +741,32 @@ async def test_get_event_types():
 async def test_get_access_logs():
     """Test GET /api/access/logs"""
     print("\n🔐 Testing GET /api/access/logs")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/access/logs?limit=10", headers=get_headers())
-        if response.status_code == 200:
-            logs = response.json()
-            print(f"✅ Found {len(logs)} access log(s)")
-            log_result("GET /api/access/logs", True)
-            return logs
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/access/logs", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/access/logs?limit=10")
+    if response.status_code == 200:
+        logs = orjson.loads(response.content)
+        print(f"✅ Found {len(logs)} access log(s)")
+        log_result("GET /api/access/logs", True)
+        return logs
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/access/logs", False)
+        return None
 
 async def test_get_my_devices_access_logs():
     """Test GET /api/access/me/devices"""
     print("\n🔐 Testing GET /api/access/me/devices")
-    async with httpx.AsyncClient() as client:
-        response = await client.get(f"{BASE_URL}/access/me/devices", headers=get_headers())
-        if response.status_code == 200:
-            logs = response.json()
-            print(f"✅ Found {len(logs)} access log(s) for my devices")
-            log_result("GET /api/access/me/devices", True)
-            return logs
-        else:
-            print(f"❌ Failed: {response.status_code}")
-            log_result("GET /api/access/me/devices", False)
-            return None
+    client = clients[BASE_URL]
+    response = await client.get("/access/me/devices")
+    if response.status_code == 200:
+        logs = orjson.loads(response.content)
+        print(f"✅ Found {len(logs)} access log(s) for my devices")
+        log_result("GET /api/access/me/devices", True)
+        return logs
+    else:
+        print(f"❌ Failed: {response.status_code}")
+        log_result("GET /api/access/me/devices", False)
+        return None
 
 # ==============================================
 # MAIN TEST RUNNER
@@ -779,75 +783,89 @@ async def run_all_tests():
     if not token:
         print("\n❌ Cannot proceed without authentication token")
         return
+    # Every backend request below is authenticated with this token and
+    # sends its body pre-serialized with orjson
+    clients[BASE_URL].headers.update({
+        "Authorization": f"Bearer {token}",
+        "Content-Type": "application/json",
+    })
     
     # USER TESTS
     print("\n" + "=" * 80)
     print("👤 USER ENDPOINTS")
     print("=" * 80)
-    await test_get_current_user()
-    await test_get_current_user_with_devices()
-    await test_update_user()
+    # If the backend is down or rejects the token, every later request fails the same way
+    stats["prereqs"]["user"] = await test_get_current_user() is not None
+    await run_gated([test_get_current_user_with_devices, test_update_user], "user")
     
     # ENROLLMENT TESTS
     print("\n" + "=" * 80)
     print("🎫 ENROLLMENT ENDPOINTS")
     print("=" * 80)
-    await test_create_enrollment_code()
-    await test_create_deletable_enrollment_code()
-    await test_list_enrollment_codes()
+    await run_gated([
+        test_create_enrollment_code,
+        test_create_deletable_enrollment_code,
+        test_list_enrollment_codes,
+    ], "user")
+    stats["prereqs"]["enrollment_code"] = test_data.enrollment_code is not None
     
     # DEVICE TESTS
     print("\n" + "=" * 80)
     print("💻 DEVICE ENDPOINTS")
     print("=" * 80)
-    await test_enroll_device()
-    await test_enroll_deletable_device()
-    await test_list_devices()
-    await test_get_device()
-    await test_update_device()
+    await run_gated([test_enroll_device, test_enroll_deletable_device], "user", "enrollment_code")
+    stats["prereqs"]["device"] = test_data.device is not None
+    await run_gated([test_list_devices], "user")
+    await run_gated([test_get_device, test_update_device], "user", "device")
     
     # POSTURE TESTS
     print("\n" + "=" * 80)
     print("🛡️  POSTURE ENDPOINTS")
     print("=" * 80)
-    await test_submit_posture()
-    await test_get_posture_history()
-    await test_get_latest_posture()
+    await run_gated([
+        test_submit_posture,
+        test_get_posture_history,
+        test_get_latest_posture,
+    ], "user", "device")
     
     # POLICY TESTS
     print("\n" + "=" * 80)
     print("📋 POLICY ENDPOINTS")
     print("=" * 80)
-    await test_create_policy()
-    await test_create_deletable_policy()
-    await test_list_policies()
-    await test_get_policy()
-    await test_update_policy()
-    await test_deactivate_policy()
-    await test_activate_policy()
+    await run_gated([test_create_policy, test_create_deletable_policy, test_list_policies], "user")
+    stats["prereqs"]["policy"] = test_data.policy is not None
+    await run_gated([test_get_policy, test_update_policy], "user", "policy")
+    await run_gated([test_deactivate_policy, test_activate_policy], "user")
     
     # DELETE OPERATIONS (separate section for visibility)
     print("\n" + "=" * 80)
     print("🗑️  DELETE OPERATIONS (Check Audit Logs!)")
     print("=" * 80)
-    await test_delete_device()
-    await test_delete_policy()
-    await test_deactivate_enrollment_code()  # Soft delete
+    # Each delete targets its own dedicated resource, so run them concurrently
+    await run_gated([
+        test_delete_device,
+        test_delete_policy,
+        test_deactivate_enrollment_code,  # Soft delete
+    ], "user", concurrent=True)
     
     # AUDIT TESTS (show delete records)
     print("\n" + "=" * 80)
     print("📝 AUDIT ENDPOINTS (Verify Delete Operations)")
     print("=" * 80)
-    await test_get_audit_logs()
-    await test_get_my_audit_logs()
-    await test_get_event_types()
+    await run_gated([
+        test_get_audit_logs,
+        test_get_my_audit_logs,
+        test_get_event_types,
+    ], "user", concurrent=True)
     
     # ACCESS TESTS
     print("\n" + "=" * 80)
     print("🔐 ACCESS ENDPOINTS")
     print("=" * 80)
-    await test_get_access_logs()
-    await test_get_my_devices_access_logs()
+    await run_gated([
+        test_get_access_logs,
+        test_get_my_devices_access_logs,
+    ], "user", concurrent=True)
     
     # FINAL SUMMARY
     print("\n" + "=" * 80)
@@ -855,22 +873,47 @@ async def run_all_tests():
     print("=" * 80)
     print(f"✅ Passed: {stats['passed']}/{stats['total']}")
     print(f"❌ Failed: {stats['failed']}/{stats['total']}")
+    print(f"⏭️  Skipped: {stats['skipped']}")
     success_rate = (stats['passed'] / stats['total'] * 100) if stats['total'] > 0 else 0
     print(f"📈 Success Rate: {success_rate:.1f}%")
     
     print("\n" + "=" * 80)
     print("📋 DELETABLE RESOURCES CREATED:")
     print("=" * 80)
-    if test_data.get("deletable_device"):
-        print(f"⚠️  Deletable Device: {test_data['deletable_device']['device_name']} (DELETED)")
-    if test_data.get("deletable_policy"):
-        print(f"⚠️  Deletable Policy: {test_data['deletable_policy']['name']} (DELETED)")
-    if test_data.get("deletable_enrollment_code"):
-        print(f"⚠️  Deletable Code: {test_data['deletable_enrollment_code']['code']} (DEACTIVATED)")
+    if test_data.deletable_device:
+        print(f"⚠️  Deletable Device: {test_data.deletable_device['device_name']} (DELETED)")
+    if test_data.deletable_policy:
+        print(f"⚠️  Deletable Policy: {test_data.deletable_policy['name']} (DELETED)")
+    if test_data.deletable_enrollment_code:
+        print(f"⚠️  Deletable Code: {test_data.deletable_enrollment_code['code']} (DEACTIVATED)")
     
     print("\n" + "=" * 80)
     print("ℹ️  Check database audit_logs table to verify delete operations were logged!")
     print("=" * 80)
 
+async def warm_up_connections():
+    """Resolve DNS and open a pooled connection to each origin before the first timed test"""
+    await asyncio.gather(
+        clients[BASE_URL].head(HEALTH_URL),
+        clients[KEYCLOAK_URL].head(f"/realms/{REALM}/"),
+        return_exceptions=True,
+    )
+
+async def main():
+    """Open one pooled HTTP/2 client per origin and run all tests over them"""
+    async with AsyncExitStack() as stack:
+        for origin in (BASE_URL, KEYCLOAK_URL):
+            clients[origin] = await stack.enter_async_context(
+                httpx.AsyncClient(
+                    base_url=origin,
+                    http2=True,
+                    limits=httpx.Limits(max_keepalive_connections=10),
+                )
+            )
+        await warm_up_connections()
+        await run_all_tests()
+
 if __name__ == "__main__":
-    asyncio.run(run_all_tests())
+    if uvloop:
+        uvloop.install()
+    asyncio.run(main())
@@ -2,9 +2,15 @@
 
 import asyncio
 import httpx
+import orjson
 from datetime import datetime, timedelta, timezone
 from app.config import settings
 
+try:
+    import uvloop  # libuv-backed event loop, not available on Windows
+except ImportError:
+    uvloop = None
+
 BASE_URL = "http://localhost:8000/api"
 KEYCLOAK_URL = "http://localhost:8080"
 
@@ -15,6 +21,11 @@ REALM = "master"  # Updated to match current Keycloak configuration
 CLIENT_ID = "admin-frontend"  # Use frontend client for testing
 CLIENT_SECRET = None  # Public client, no secret needed
 
+# Enrollment code expiry, computed once per run
+_EXPIRES_AT = (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
+
+JSON_HEADERS = {"Content-Type": "application/json"}
+
 async def get_keycloak_token():
     """Get JWT token from Keycloak"""
     print("🔐 Getting authentication token from Keycloak...")
@@ -34,7 +45,7 @@ async def get_keycloak_token():
             response = await client.post(token_url, data=data)
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = orjson.loads(response.content)
                 access_token = token_data.get("access_token")
                 print(f"✅ Successfully obtained token")
                 return access_token
@@ -46,184 +57,110 @@ async def get_keycloak_token():
             print(f"❌ Error getting token: {str(e)}")
             return None
 
-async def create_test_user_in_db(token):
+async def _run(client, name, method, path, payload=None, expected=200):
+    """Send one request; return the decoded body on the expected status, else report and return None"""
+    try:
+        if payload is None:
+            response = await client.request(method, path)
+        else:
+            # Pre-serialize with orjson instead of httpx's json= encoder
+            response = await client.request(method, path, content=orjson.dumps(payload), headers=JSON_HEADERS)
+    except Exception as e:
+        print(f"❌ Error: {str(e)}")
+        return None
+    
+    if response.status_code == expected:
+        return orjson.loads(response.content)
+    print(f"❌ Failed to {name}: {response.status_code}")
+    print(f"Response: {response.text}")
+    return None
+
+async def create_test_user_in_db(client):
     """Sync Keycloak user to database"""
     print("\n👤 Creating user in database...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            # First, try to get current user (this will create user in DB if not exists)
-            response = await client.get(
-                f"{BASE_URL}/users/me",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                user = response.json()
-                print(f"✅ User exists/created: {user.get('username')}")
-                return user
-            else:
-                print(f"❌ Failed to get/create user: {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    # Getting the current user creates it in the DB if it does not exist yet
+    user = await _run(client, "get/create user", "GET", "/users/me")
+    if user:
+        print(f"✅ User exists/created: {user.get('username')}")
+    return user
 
-async def create_enrollment_code(token):
+async def create_enrollment_code(client):
     """Create enrollment code"""
     print("\n1️⃣ Creating enrollment code...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{BASE_URL}/enrollment/codes",
-                json={
-                    "description": "Test enrollment code",
-                    "max_uses": 5,
-                    "expires_at": (datetime.now(timezone.utc) + timedelta(days=30)).isoformat()
-                },
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 201:
-                enrollment_code = response.json()
-                print(f"✅ Created enrollment code: {enrollment_code['code']}")
-                return enrollment_code
-            else:
-                print(f"❌ Failed to create enrollment code: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    enrollment_code = await _run(client, "create enrollment code", "POST", "/enrollment/codes", {
+        "description": "Test enrollment code",
+        "max_uses": 5,
+        "expires_at": _EXPIRES_AT
+    }, expected=201)
+    if enrollment_code:
+        print(f"✅ Created enrollment code: {enrollment_code['code']}")
+    return enrollment_code
 
-async def enroll_device(token, enrollment_code):
+async def enroll_device(client, enrollment_code):
     """Enroll a test device"""
     print("\n2️⃣ Enrolling test device...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{BASE_URL}/devices/enroll",
-                json={
-                    "enrollment_code": enrollment_code,
-                    "device_name": "Test Laptop",
-                    "device_unique_id": f"test-tpm-{datetime.now().timestamp()}",
-                    "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nTEST_KEY\n-----END PUBLIC KEY-----",
-                    "os_type": "Windows",
-                    "os_version": "11",
-                    "device_model": "ThinkPad X1",
-                    "manufacturer": "Lenovo"
-                },
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 201:
-                device = response.json()
-                print(f"✅ Enrolled device: {device['device_name']} (ID: {device['id']})")
-                return device
-            else:
-                print(f"❌ Failed to enroll device: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    device = await _run(client, "enroll device", "POST", "/devices/enroll", {
+        "enrollment_code": enrollment_code,
+        "device_name": "Test Laptop",
+        "device_unique_id": f"test-tpm-{datetime.now().timestamp()}",
+        "tpm_public_key": "-----BEGIN PUBLIC KEY-----\nTEST_KEY\n-----END PUBLIC KEY-----",
+        "os_type": "Windows",
+        "os_version": "11",
+        "device_model": "ThinkPad X1",
+        "manufacturer": "Lenovo"
+    }, expected=201)
+    if device:
+        print(f"✅ Enrolled device: {device['device_name']} (ID: {device['id']})")
+    return device
 
-async def submit_posture(token, device_unique_id):
+async def submit_posture(client, device_unique_id):
     """Submit posture data"""
     print("\n3️⃣ Submitting posture data...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{BASE_URL}/posture/submit",
-                json={
-                    "device_unique_id": device_unique_id,
-                    "posture_data": {
-                        "antivirus_enabled": True,
-                        "firewall_enabled": True,
-                        "disk_encrypted": True,
-                        "pending_updates": 5,
-                        "screen_lock_enabled": True
-                    },
-                    "signature": "test_signature"
-                },
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 201:
-                posture = response.json()
-                print(f"✅ Posture submitted: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
-                return posture
-            else:
-                print(f"❌ Failed to submit posture: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    posture = await _run(client, "submit posture", "POST", "/posture/submit", {
+        "device_unique_id": device_unique_id,
+        "posture_data": {
+            "antivirus_enabled": True,
+            "firewall_enabled": True,
+            "disk_encrypted": True,
+            "pending_updates": 5,
+            "screen_lock_enabled": True
+        },
+        "signature": "test_signature"
+    }, expected=201)
+    if posture:
+        print(f"✅ Posture submitted: Compliant={posture['is_compliant']}, Score={posture['compliance_score']}")
+    return posture
 
-async def create_policy(token):
+async def create_policy(client):
     """Create a test policy"""
     print("\n4️⃣ Creating test policy...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.post(
-                f"{BASE_URL}/policies/",
-                json={
-                    "name": "Default Posture Policy",
-                    "description": "Requires antivirus, firewall, and disk encryption",
-                    "policy_type": "posture",
-                    "rules": {
-                        "antivirus_enabled": True,
-                        "firewall_enabled": True,
-                        "disk_encrypted": True,
-                        "min_os_version": "10.0",
-                        "max_pending_updates": 10
-                    },
-                    "priority": 100,
-                    "enforce_mode": "enforce"
-                },
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 201:
-                policy = response.json()
-                print(f"✅ Created policy: {policy['name']} (ID: {policy['id']})")
-                return policy
-            else:
-                print(f"❌ Failed to create policy: {response.status_code}")
-                print(f"Response: {response.text}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    policy = await _run(client, "create policy", "POST", "/policies/", {
+        "name": "Default Posture Policy",
+        "description": "Requires antivirus, firewall, and disk encryption",
+        "policy_type": "posture",
+        "rules": {
+            "antivirus_enabled": True,
+            "firewall_enabled": True,
+            "disk_encrypted": True,
+            "min_os_version": "10.0",
+            "max_pending_updates": 10
+        },
+        "priority": 100,
+        "enforce_mode": "enforce"
+    }, expected=201)
+    if policy:
+        print(f"✅ Created policy: {policy['name']} (ID: {policy['id']})")
+    return policy
 
-async def list_audit_logs(token):
+async def list_audit_logs(client):
     """Get audit logs"""
     print("\n5️⃣ Fetching audit logs...")
-    
-    async with httpx.AsyncClient() as client:
-        try:
-            response = await client.get(
-                f"{BASE_URL}/audit/logs/me",
-                headers={"Authorization": f"Bearer {token}"}
-            )
-            
-            if response.status_code == 200:
-                logs = response.json()
-                print(f"✅ Found {len(logs)} audit log entries")
-                for log in logs[:3]:  # Show first 3
-                    print(f"   - {log['event_type']}: {log['action']} ({log['status']})")
-                return logs
-            else:
-                print(f"❌ Failed to get audit logs: {response.status_code}")
-                return None
-        except Exception as e:
-            print(f"❌ Error: {str(e)}")
-            return None
+    logs = await _run(client, "get audit logs", "GET", "/audit/logs/me")
+    if logs is not None:
+        print(f"✅ Found {len(logs)} audit log entries")
+        for log in logs[:3]:  # Show first 3
+            print(f"   - {log['event_type']}: {log['action']} ({log['status']})")
+    return logs
 
 async def run_all_tests():
     """Run all tests in sequence"""
@@ -236,31 +173,38 @@ async def run_all_tests():
         print("\n❌ Cannot proceed without authentication token")
         return
     
-    # 2. Create/verify user
-    user = await create_test_user_in_db(token)
-    if not user:
-        print("\n❌ Cannot proceed without user")
-        return
-    
-    # 3. Create enrollment code
-    enrollment = await create_enrollment_code(token)
-    if not enrollment:
-        print("\n⚠️  Skipping device enrollment (no code)")
-    else:
-        # 4. Enroll device
-        device = await enroll_device(token, enrollment['code'])
-        if device:
-            # 5. Submit posture
-            await submit_posture(token, device['device_unique_id'])
-    
-    # 6. Create policy
-    await create_policy(token)
-    
-    # 7. List audit logs
-    await list_audit_logs(token)
+    # One authenticated client shared by every backend request
+    async with httpx.AsyncClient(
+        base_url=BASE_URL,
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        # 2. Create/verify user
+        user = await create_test_user_in_db(client)
+        if not user:
+            print("\n❌ Cannot proceed without user")
+            return
+        
+        # 3. Create enrollment code
+        enrollment = await create_enrollment_code(client)
+        if not enrollment:
+            print("\n⚠️  Skipping device enrollment (no code)")
+        else:
+            # 4. Enroll device
+            device = await enroll_device(client, enrollment['code'])
+            if device:
+                # 5. Submit posture
+                await submit_posture(client, device['device_unique_id'])
+        
+        # 6. Create policy
+        await create_policy(client)
+        
+        # 7. List audit logs
+        await list_audit_logs(client)
     
     print("\n" + "="*60)
     print("✅ Tests completed!\n")
 
 if __name__ == "__main__":
+    if uvloop:
+        uvloop.install()
     asyncio.run(run_all_tests())
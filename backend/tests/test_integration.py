@@ -5,6 +5,7 @@ Tests backend, frontend, Keycloak, and DPA integration
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 import sys
 from typing import Dict, Any
@@ -15,19 +16,27 @@ FRONTEND_URL = "http://localhost:3000"
 KEYCLOAK_URL = "http://localhost:8080"
 KEYCLOAK_REALM = "master"
 
+# Acceptable status codes for probes that only check an endpoint exists
+POSTURE_SUBMIT_EXISTS = frozenset({404, 422})
+
+# One pooled session for every probe, so connections are reused across calls
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+SESSION.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=16))
+
 def test_backend_health():
     """Test backend health endpoints"""
     print("\n=== Testing Backend Health ===")
     try:
         # Basic health
-        response = requests.get(f"{BACKEND_URL}/health", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/health", timeout=5)
         assert response.status_code == 200
         data = response.json()
         assert data["status"] == "healthy"
         print("✓ Basic health check passed")
         
         # Detailed health
-        response = requests.get(f"{BACKEND_URL}/health/detailed", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/health/detailed", timeout=5)
         assert response.status_code == 200
         data = response.json()
         print(f"✓ Detailed health check passed")
@@ -44,7 +53,7 @@ def test_keycloak_connectivity():
     try:
         # Test well-known endpoint
         url = f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/.well-known/openid-configuration"
-        response = requests.get(url, timeout=5)
+        response = SESSION.get(url, timeout=5)
         assert response.status_code == 200
         data = response.json()
         assert "issuer" in data
@@ -59,7 +68,7 @@ def test_frontend_connectivity():
     """Test frontend connectivity"""
     print("\n=== Testing Frontend Connectivity ===")
     try:
-        response = requests.get(FRONTEND_URL, timeout=5)
+        response = SESSION.get(FRONTEND_URL, timeout=5)
         assert response.status_code == 200
         print("✓ Frontend is accessible")
         return True
@@ -72,7 +81,7 @@ def test_backend_keycloak_integration():
     print("\n=== Testing Backend-Keycloak Integration ===")
     try:
         # Test health endpoint which checks Keycloak
-        response = requests.get(f"{BACKEND_URL}/health/detailed", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/health/detailed", timeout=5)
         assert response.status_code == 200
         data = response.json()
         keycloak_status = data["components"]["keycloak"]["status"]
@@ -93,17 +102,17 @@ def test_backend_api_endpoints():
     print("\n=== Testing Backend API Endpoints ===")
     try:
         # Test health endpoint
-        response = requests.get(f"{BACKEND_URL}/health", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/health", timeout=5)
         assert response.status_code == 200
         print("✓ Health endpoint accessible")
         
         # Test API docs
-        response = requests.get(f"{BACKEND_URL}/docs", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/docs", timeout=5)
         assert response.status_code == 200
         print("✓ API documentation accessible")
         
         # Test OpenAPI schema
-        response = requests.get(f"{BACKEND_URL}/openapi.json", timeout=5)
+        response = SESSION.get(f"{BACKEND_URL}/openapi.json", timeout=5)
         assert response.status_code == 200
         schema = response.json()
         assert "paths" in schema
@@ -120,7 +129,7 @@ def test_dpa_backend_integration():
     print("\n=== Testing DPA-Backend Integration Endpoints ===")
     try:
         # Test enrollment endpoint exists
-        response = requests.post(
+        response = SESSION.post(
             f"{BACKEND_URL}/api/devices/enroll",
             json={
                 "enrollment_code": "test-code",
@@ -136,7 +145,7 @@ def test_dpa_backend_integration():
         print("✓ Device enrollment endpoint exists")
         
         # Test posture submission endpoint exists
-        response = requests.post(
+        response = SESSION.post(
             f"{BACKEND_URL}/api/posture/submit",
             json={
                 "device_id": "test-device-id",
@@ -146,11 +155,11 @@ def test_dpa_backend_integration():
             timeout=5
         )
         # Should return 404 (device not found) not 404 (endpoint not found) or 422 (validation error)
-        assert response.status_code in [404, 422]
+        assert response.status_code in POSTURE_SUBMIT_EXISTS
         print("✓ Posture submission endpoint exists")
         
         # Test device status endpoint exists
-        response = requests.get(
+        response = SESSION.get(
             f"{BACKEND_URL}/api/devices/status/test-device-id",
             timeout=5
         )
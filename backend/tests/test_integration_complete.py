@@ -4,16 +4,34 @@ Comprehensive Integration Test Script for ZTNA Platform
 Tests all major components and integrations
 """
 
-import requests
+import asyncio
+import httpx
+import orjson
 import json
 import sys
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 
 BASE_URL = "http://localhost/api"
 KEYCLOAK_URL = "http://localhost:8080"
 KEYCLOAK_REALM = "master"
 KEYCLOAK_CLIENT_ID = "admin-frontend"
 
+# Acceptable status codes (404 on the public status endpoint is fine, 401 is not)
+DEVICE_STATUS_OK = frozenset({200, 404})
+POLICY_CREATED = frozenset({200, 201})
+
+# Request bodies are pre-serialized with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# (display name, path) of the endpoints every authenticated admin can read
+AUTHENTICATED_ENDPOINTS = [
+    ("Users", "/users"),
+    ("Devices", "/devices"),
+    ("Policies", "/policies"),
+    ("Access logs", "/access/logs"),
+    ("Audit logs", "/audit/logs"),
+]
+
 class Colors:
     GREEN = '\033[92m'
     RED = '\033[91m'
@@ -21,154 +39,108 @@ class Colors:
     BLUE = '\033[94m'
     END = '\033[0m'
 
+# Message prefixes, built once instead of on every print
+_OK = f"{Colors.GREEN}✓ "
+_ERR = f"{Colors.RED}✗ "
+_INFO = f"{Colors.BLUE}ℹ "
+_WARN = f"{Colors.YELLOW}⚠ "
+_END = Colors.END
+
 def print_success(msg: str):
-    print(f"{Colors.GREEN}✓ {msg}{Colors.END}")
+    print(_OK + str(msg) + _END)
 
 def print_error(msg: str):
-    print(f"{Colors.RED}✗ {msg}{Colors.END}")
+    print(_ERR + str(msg) + _END)
 
 def print_info(msg: str):
-    print(f"{Colors.BLUE}ℹ {msg}{Colors.END}")
+    print(_INFO + str(msg) + _END)
 
 def print_warning(msg: str):
-    print(f"{Colors.YELLOW}⚠ {msg}{Colors.END}")
+    print(_WARN + str(msg) + _END)
 
-def test_health_check():
-    """Test backend health endpoint"""
-    print_info("Testing backend health check...")
+def failed_names(names, mask: int):
+    """Names whose bit is not set in a pass mask (bit i = names[i] passed)"""
+    return [name for i, name in enumerate(names) if not mask & (1 << i)]
+
+async def probe(client: httpx.AsyncClient, method: str, url: str, ok_statuses=frozenset({200}), **kwargs) -> Tuple[bool, Any]:
+    """Send one request and return (ok, status code), or (False, exception) if it could not be sent"""
     try:
-        response = requests.get(f"{BASE_URL.replace('/api', '')}/health", timeout=5)
-        if response.status_code == 200:
-            print_success("Backend health check passed")
-            return True
-        else:
-            print_error(f"Backend health check failed: {response.status_code}")
-            return False
+        response = await client.request(method, url, **kwargs)
     except Exception as e:
-        print_error(f"Backend health check failed: {e}")
-        return False
+        return False, e
+    return response.status_code in ok_statuses, response.status_code
+
+async def test_health_check(client: httpx.AsyncClient):
+    """Test backend health endpoint"""
+    print_info("Testing backend health check...")
+    ok, status = await probe(client, "GET", f"{BASE_URL.replace('/api', '')}/health")
+    if ok:
+        print_success("Backend health check passed")
+    else:
+        print_error(f"Backend health check failed: {status}")
+    return ok
 
-def test_keycloak_health():
+async def test_keycloak_health(client: httpx.AsyncClient):
     """Test Keycloak accessibility"""
     print_info("Testing Keycloak health...")
-    try:
-        response = requests.get(
-            f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/.well-known/openid-configuration",
-            timeout=5
-        )
-        if response.status_code == 200:
-            print_success("Keycloak is accessible")
-            return True
-        else:
-            print_error(f"Keycloak health check failed: {response.status_code}")
-            return False
-    except Exception as e:
-        print_error(f"Keycloak health check failed: {e}")
-        return False
+    ok, status = await probe(
+        client, "GET", f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}/.well-known/openid-configuration"
+    )
+    if ok:
+        print_success("Keycloak is accessible")
+    else:
+        print_error(f"Keycloak health check failed: {status}")
+    return ok
 
-def test_unauthenticated_endpoints():
+async def test_unauthenticated_endpoints(client: httpx.AsyncClient):
     """Test endpoints that don't require authentication"""
     print_info("Testing unauthenticated endpoints...")
-    results = []
-    
-    # Test health endpoint
-    try:
-        response = requests.get(f"{BASE_URL.replace('/api', '')}/health", timeout=5)
-        results.append(response.status_code == 200)
-    except Exception as e:
-        print_error(f"Health endpoint failed: {e}")
-        results.append(False)
-    
-    # Test device status endpoint (public)
-    try:
+    results = await asyncio.gather(
+        # Test health endpoint
+        probe(client, "GET", f"{BASE_URL.replace('/api', '')}/health"),
+        # Test device status endpoint (public)
         # This will fail if no devices exist, but should return 404 not 401
-        response = requests.get(f"{BASE_URL}/devices/status/test-device-id", timeout=5)
-        results.append(response.status_code in [200, 404])  # 404 is OK, 401 means auth required
-    except Exception as e:
-        print_error(f"Device status endpoint failed: {e}")
-        results.append(False)
+        probe(client, "GET", f"{BASE_URL}/devices/status/test-device-id", ok_statuses=DEVICE_STATUS_OK),
+    )
+    names = ("Health", "Device status")
+    mask = 0
+    for i, (name, (ok, status)) in enumerate(zip(names, results)):
+        mask |= ok << i
+        if isinstance(status, Exception):
+            print_error(f"{name} endpoint failed: {status}")
     
-    if all(results):
+    if mask == (1 << len(names)) - 1:
         print_success("Unauthenticated endpoints working correctly")
         return True
     else:
-        print_warning("Some unauthenticated endpoints may have issues")
+        print_warning(f"Some unauthenticated endpoints may have issues: {', '.join(failed_names(names, mask))}")
         return False
 
-def test_authenticated_endpoints(token: str):
+async def test_authenticated_endpoints(client: httpx.AsyncClient, token: str):
     """Test endpoints that require authentication"""
     print_info("Testing authenticated endpoints...")
     headers = {"Authorization": f"Bearer {token}"}
-    results = []
-    
-    # Test users endpoint
-    try:
-        response = requests.get(f"{BASE_URL}/users", headers=headers, timeout=5)
-        results.append(response.status_code == 200)
-        if response.status_code == 200:
-            print_success("Users endpoint accessible")
-        else:
-            print_error(f"Users endpoint failed: {response.status_code}")
-    except Exception as e:
-        print_error(f"Users endpoint failed: {e}")
-        results.append(False)
-    
-    # Test devices endpoint
-    try:
-        response = requests.get(f"{BASE_URL}/devices", headers=headers, timeout=5)
-        results.append(response.status_code == 200)
-        if response.status_code == 200:
-            print_success("Devices endpoint accessible")
-        else:
-            print_error(f"Devices endpoint failed: {response.status_code}")
-    except Exception as e:
-        print_error(f"Devices endpoint failed: {e}")
-        results.append(False)
-    
-    # Test policies endpoint
-    try:
-        response = requests.get(f"{BASE_URL}/policies", headers=headers, timeout=5)
-        results.append(response.status_code == 200)
-        if response.status_code == 200:
-            print_success("Policies endpoint accessible")
+    results = await asyncio.gather(*(
+        probe(client, "GET", f"{BASE_URL}{path}", headers=headers)
+        for _, path in AUTHENTICATED_ENDPOINTS
+    ))
+    names = [name for name, _ in AUTHENTICATED_ENDPOINTS]
+    mask = 0
+    for i, (name, (ok, status)) in enumerate(zip(names, results)):
+        mask |= ok << i
+        if ok:
+            print_success(f"{name} endpoint accessible")
         else:
-            print_error(f"Policies endpoint failed: {response.status_code}")
-    except Exception as e:
-        print_error(f"Policies endpoint failed: {e}")
-        results.append(False)
+            print_error(f"{name} endpoint failed: {status}")
     
-    # Test access logs endpoint
-    try:
-        response = requests.get(f"{BASE_URL}/access/logs", headers=headers, timeout=5)
-        results.append(response.status_code == 200)
-        if response.status_code == 200:
-            print_success("Access logs endpoint accessible")
-        else:
-            print_error(f"Access logs endpoint failed: {response.status_code}")
-    except Exception as e:
-        print_error(f"Access logs endpoint failed: {e}")
-        results.append(False)
-    
-    # Test audit logs endpoint
-    try:
-        response = requests.get(f"{BASE_URL}/audit/logs", headers=headers, timeout=5)
-        results.append(response.status_code == 200)
-        if response.status_code == 200:
-            print_success("Audit logs endpoint accessible")
-        else:
-            print_error(f"Audit logs endpoint failed: {response.status_code}")
-    except Exception as e:
-        print_error(f"Audit logs endpoint failed: {e}")
-        results.append(False)
-    
-    if all(results):
+    if mask == (1 << len(names)) - 1:
         print_success("All authenticated endpoints working correctly")
         return True
     else:
-        print_warning("Some authenticated endpoints may have issues")
+        print_warning(f"Some authenticated endpoints may have issues: {', '.join(failed_names(names, mask))}")
         return False
 
-def test_policy_evaluation(token: str):
+async def test_policy_evaluation(client: httpx.AsyncClient, token: str):
     """Test policy evaluation functionality"""
     print_info("Testing policy evaluation...")
     headers = {"Authorization": f"Bearer {token}"}
@@ -188,21 +160,19 @@ def test_policy_evaluation(token: str):
             "priority": 100,
             "enforce_mode": "enforce"
         }
-        response = requests.post(
+        response = await client.post(
             f"{BASE_URL}/policies",
-            headers=headers,
-            json=policy_data,
-            timeout=5
+            headers={**headers, **JSON_HEADERS},
+            content=orjson.dumps(policy_data)
         )
-        if response.status_code in [200, 201]:
+        if response.status_code in POLICY_CREATED:
             print_success("Policy creation endpoint working")
-            policy_id = response.json().get("id")
+            policy_id = orjson.loads(response.content).get("id")
             
             # Test policy retrieval
-            response = requests.get(
+            response = await client.get(
                 f"{BASE_URL}/policies/{policy_id}",
-                headers=headers,
-                timeout=5
+                headers=headers
             )
             if response.status_code == 200:
                 print_success("Policy retrieval working")
@@ -217,7 +187,7 @@ def test_policy_evaluation(token: str):
         print_error(f"Policy evaluation test failed: {e}")
         return False
 
-def test_token_service(token: str):
+async def test_token_service(client: httpx.AsyncClient, token: str):
     """Test token service endpoints"""
     print_info("Testing token service...")
     headers = {"Authorization": f"Bearer {token}"}
@@ -225,13 +195,13 @@ def test_token_service(token: str):
     # Test token verify endpoint
     try:
         verify_data = {"token": token}
-        response = requests.post(
+        response = await client.post(
             f"{BASE_URL}/tokens/verify",
-            json=verify_data,
-            timeout=5
+            headers=JSON_HEADERS,
+            content=orjson.dumps(verify_data)
         )
         if response.status_code == 200:
-            result = response.json()
+            result = orjson.loads(response.content)
             if result.get("valid"):
                 print_success("Token verification endpoint working")
                 return True
@@ -245,41 +215,46 @@ def test_token_service(token: str):
         print_error(f"Token service test failed: {e}")
         return False
 
-def main():
-    """Run all integration tests"""
+async def amain():
+    """Run all integration tests over one shared client"""
     print(f"\n{Colors.BLUE}{'='*60}{Colors.END}")
     print(f"{Colors.BLUE}ZTNA Platform Integration Test Suite{Colors.END}")
     print(f"{Colors.BLUE}{'='*60}{Colors.END}\n")
     
     results = []
-    
-    # Test 1: Health checks
-    results.append(("Health Check", test_health_check()))
-    results.append(("Keycloak Health", test_keycloak_health()))
-    
-    # Test 2: Unauthenticated endpoints
-    results.append(("Unauthenticated Endpoints", test_unauthenticated_endpoints()))
-    
-    # Test 3: Get authentication token (manual step)
-    print_info("\nTo test authenticated endpoints, you need to:")
-    print_info("1. Log in via frontend at http://localhost:3000")
-    print_info("2. Get the access token from browser DevTools → Application → Local Storage")
-    print_info("3. Run this script with: python test_integration_complete.py <token>")
-    
-    if len(sys.argv) > 1:
-        token = sys.argv[1]
-        print_info(f"\nUsing provided token (length: {len(token)})")
-        
-        # Test 4: Authenticated endpoints
-        results.append(("Authenticated Endpoints", test_authenticated_endpoints(token)))
+    async with httpx.AsyncClient(timeout=5) as client:
+        # Test 1: Health checks
+        # Test 2: Unauthenticated endpoints
+        async with asyncio.TaskGroup() as tg:
+            tasks = [
+                ("Health Check", tg.create_task(test_health_check(client))),
+                ("Keycloak Health", tg.create_task(test_keycloak_health(client))),
+                ("Unauthenticated Endpoints", tg.create_task(test_unauthenticated_endpoints(client))),
+            ]
+        results.extend((name, task.result()) for name, task in tasks)
         
-        # Test 5: Policy evaluation
-        results.append(("Policy Evaluation", test_policy_evaluation(token)))
+        # Test 3: Get authentication token (manual step)
+        print_info("\nTo test authenticated endpoints, you need to:")
+        print_info("1. Log in via frontend at http://localhost:3000")
+        print_info("2. Get the access token from browser DevTools → Application → Local Storage")
+        print_info("3. Run this script with: python test_integration_complete.py <token>")
         
-        # Test 6: Token service
-        results.append(("Token Service", test_token_service(token)))
-    else:
-        print_warning("\nSkipping authenticated tests (no token provided)")
+        if len(sys.argv) > 1:
+            token = sys.argv[1]
+            print_info(f"\nUsing provided token (length: {len(token)})")
+            
+            # Test 4: Authenticated endpoints
+            # Test 5: Policy evaluation
+            # Test 6: Token service
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    ("Authenticated Endpoints", tg.create_task(test_authenticated_endpoints(client, token))),
+                    ("Policy Evaluation", tg.create_task(test_policy_evaluation(client, token))),
+                    ("Token Service", tg.create_task(test_token_service(client, token))),
+                ]
+            results.extend((name, task.result()) for name, task in tasks)
+        else:
+            print_warning("\nSkipping authenticated tests (no token provided)")
     
     # Summary
     print(f"\n{Colors.BLUE}{'='*60}{Colors.END}")
@@ -303,5 +278,5 @@ def main():
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(amain()))
 
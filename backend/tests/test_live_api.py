@@ -0,0 +1,55 @@
+# tests/test_live_api.py
+
+"""
+pytest entry points for the live-stack integration scripts
+
+Reuses the probes of test_integration_complete.py and the helpers of
+test_tpm_attestation.py so the checks can be spread over pytest-xdist
+workers. Requires the backend and Keycloak to be running.
+"""
+
+import pytest
+
+from tests import test_tpm_attestation as tpm
+from tests.test_integration_complete import (
+    BASE_URL,
+    KEYCLOAK_URL,
+    KEYCLOAK_REALM,
+    DEVICE_STATUS_OK,
+    AUTHENTICATED_ENDPOINTS,
+    probe,
+)
+
+# Share the session-scoped clients' event loop
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
+@pytest.mark.parametrize("url, ok_statuses", [
+    (f"{BASE_URL.replace('/api', '')}/health", frozenset({200})),
+    (f"{BASE_URL}/devices/status/test-device-id", DEVICE_STATUS_OK),
+])
+async def test_public_endpoint(client, url, ok_statuses):
+    ok, status = await probe(client, "GET", url, ok_statuses=ok_statuses)
+    assert ok, f"GET {url}: {status}"
+
+async def test_keycloak_discovery(oidc_config):
+    assert oidc_config["issuer"] == f"{KEYCLOAK_URL}/realms/{KEYCLOAK_REALM}"
+    assert oidc_config["token_endpoint"]
+
+@pytest.mark.parametrize("path", [path for _, path in AUTHENTICATED_ENDPOINTS])
+async def test_authenticated_endpoint(api, path):
+    ok, status = await probe(api, "GET", path)
+    assert ok, f"GET {path}: {status}"
+
+async def test_tpm_attestation_rejects_bad_signatures(client, token, enrolled_device):
+    """Challenge/issue flow; kept in one test because each step needs the previous one"""
+    device = enrolled_device
+    challenge_data = await tpm.test_challenge_endpoint(client, token, device["id"])
+    assert challenge_data, "challenge endpoint failed"
+    challenge = challenge_data["challenge"]
+    
+    # A key that is not the device's TPM key must not get a token
+    mock_signature = tpm.generate_mock_signature(challenge, tpm.load_mock_private_key())
+    assert not await tpm.test_token_issuance_with_valid_signature(
+        client, token, device["id"], challenge, mock_signature
+    )
+    assert await tpm.test_token_issuance_with_invalid_signature(client, token, device["id"], challenge)
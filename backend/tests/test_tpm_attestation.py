@@ -18,7 +18,11 @@ import asyncio
 import httpx
 import sys
 import json
+import orjson
 import base64
+from binascii import b2a_base64
+import time
+from pathlib import Path
 from typing import Optional, Dict, Any
 from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import padding, rsa
@@ -32,6 +36,17 @@ CLIENT_ID = "admin-frontend"
 TEST_USERNAME = "admin"
 TEST_PASSWORD = "adminsecure123"
 
+# Request bodies are pre-serialized with orjson
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Access tokens are reused across runs until shortly before they expire
+TOKEN_CACHE = Path.home() / ".cache" / "ztna-tests" / "keycloak.json"
+TOKEN_CACHE_MARGIN_SECONDS = 60
+
+# Throwaway key for mock signatures, generated on first use and reused after
+# (the fixtures directory is git-ignored, so the key never gets committed)
+MOCK_KEY_PATH = Path(__file__).parent / "fixtures" / "mock_rsa_2048.pem"
+
 # Colors for output
 class Colors:
     GREEN = '\033[92m'
@@ -41,42 +56,115 @@ class Colors:
     END = '\033[0m'
     BOLD = '\033[1m'
 
+# Message prefixes, built once instead of on every print
+_OK = f"{Colors.GREEN}✓ "
+_ERR = f"{Colors.RED}✗ "
+_INFO = f"{Colors.BLUE}ℹ "
+_WARN = f"{Colors.YELLOW}⚠ "
+_END = Colors.END
+
 def print_success(msg):
-    print(f"{Colors.GREEN}✓ {msg}{Colors.END}")
+    print(_OK + str(msg) + _END)
 
 def print_error(msg):
-    print(f"{Colors.RED}✗ {msg}{Colors.END}")
+    print(_ERR + str(msg) + _END)
 
 def print_info(msg):
-    print(f"{Colors.BLUE}ℹ {msg}{Colors.END}")
+    print(_INFO + str(msg) + _END)
 
 def print_warning(msg):
-    print(f"{Colors.YELLOW}⚠ {msg}{Colors.END}")
+    print(_WARN + str(msg) + _END)
+
+def _token_cache_key() -> str:
+    return f"{REALM}/{CLIENT_ID}/{TEST_USERNAME}"
 
-async def get_keycloak_token() -> Optional[str]:
-    """Get Keycloak access token"""
+def load_cached_token() -> Optional[str]:
+    """Return the cached access token if it is still valid for a while"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/token",
-                data={
-                    "grant_type": "password",
-                    "client_id": CLIENT_ID,
-                    "username": TEST_USERNAME,
-                    "password": TEST_PASSWORD,
-                },
-                timeout=10.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("access_token")
-            else:
-                print_error(f"Failed to get token: {response.status_code} - {response.text}")
-                return None
+        cached = orjson.loads(TOKEN_CACHE.read_bytes())[_token_cache_key()]
+    except (OSError, ValueError, KeyError):
+        return None
+    if cached["exp"] - time.time() > TOKEN_CACHE_MARGIN_SECONDS:
+        return cached["access_token"]
+    return None
+
+def store_cached_token(access_token: str):
+    """Persist an access token with the expiry taken from its exp claim"""
+    try:
+        payload = access_token.split(".")[1]
+        claims = orjson.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+        try:
+            cache = orjson.loads(TOKEN_CACHE.read_bytes())
+        except (OSError, ValueError):
+            cache = {}
+        cache[_token_cache_key()] = {"access_token": access_token, "exp": claims["exp"]}
+        TOKEN_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        TOKEN_CACHE.write_bytes(orjson.dumps(cache))
+    except (IndexError, ValueError, KeyError, OSError) as e:
+        print_warning(f"Could not cache token: {e}")
+
+async def get_keycloak_token(client: httpx.AsyncClient) -> Optional[str]:
+    """Get Keycloak access token (from the on-disk cache when still valid)"""
+    cached = load_cached_token()
+    if cached:
+        return cached
+    try:
+        response = await client.post(
+            f"{KEYCLOAK_URL}/realms/{REALM}/protocol/openid-connect/token",
+            data={
+                "grant_type": "password",
+                "client_id": CLIENT_ID,
+                "username": TEST_USERNAME,
+                "password": TEST_PASSWORD,
+            }
+        )
+        if response.status_code == 200:
+            access_token = orjson.loads(response.content).get("access_token")
+            if access_token:
+                store_cached_token(access_token)
+            return access_token
+        else:
+            print_error(f"Failed to get token: {response.status_code} - {response.text}")
+            return None
     except Exception as e:
         print_error(f"Error getting token: {e}")
         return None
 
+def load_mock_private_key():
+    """Load the mock signing key, generating and saving it on first use"""
+    if MOCK_KEY_PATH.exists():
+        return serialization.load_pem_private_key(
+            MOCK_KEY_PATH.read_bytes(),
+            password=None,
+            backend=default_backend()
+        )
+    
+    private_key = rsa.generate_private_key(
+        public_exponent=65537,
+        key_size=2048,
+        backend=default_backend()
+    )
+    MOCK_KEY_PATH.parent.mkdir(parents=True, exist_ok=True)
+    MOCK_KEY_PATH.write_bytes(private_key.private_bytes(
+        encoding=serialization.Encoding.PEM,
+        format=serialization.PrivateFormat.PKCS8,
+        encryption_algorithm=serialization.NoEncryption()
+    ))
+    return private_key
+
+def challenge_message(challenge: str, canonical: bool = False) -> bytes:
+    """
+    Bytes the DPA signs for a challenge: the canonical JSON of
+    {"challenge": challenge}, i.e. json.dumps(..., sort_keys=True).
+
+    Challenges are secrets.token_urlsafe() strings with no characters
+    that need JSON escaping, so the single-key document is formatted
+    directly; canonical=True goes through json.dumps instead.
+    """
+    if canonical:
+        return json.dumps({"challenge": challenge}, sort_keys=True).encode()
+    return b'{"challenge": "' + challenge.encode("ascii") + b'"}'
+
 def generate_mock_signature(challenge: str, private_key) -> str:
     """
     Generate a mock signature for testing
@@ -86,16 +174,8 @@ def generate_mock_signature(challenge: str, private_key) -> str:
     3. Base64 encode
     4. Sign with private key
     """
-    import json
-    
-    # Create challenge data dict
-    challenge_data = {"challenge": challenge}
-    
-    # Convert to canonical JSON (sorted keys)
-    canonical_json = json.dumps(challenge_data, sort_keys=True)
-    
-    # Sign the JSON bytes (matching backend verification)
-    message = canonical_json.encode()
+    # Sign the canonical JSON bytes (matching backend verification)
+    message = challenge_message(challenge)
     signature = private_key.sign(
         message,
         padding.PKCS1v15(),
@@ -103,35 +183,34 @@ def generate_mock_signature(challenge: str, private_key) -> str:
     )
     
     # Return base64-encoded signature
-    return base64.b64encode(signature).decode('utf-8')
+    return b2a_base64(signature, newline=False).decode('ascii')
 
-async def test_challenge_endpoint(token: str, device_id: int) -> Optional[Dict[str, Any]]:
+async def test_challenge_endpoint(client: httpx.AsyncClient, token: str, device_id: int) -> Optional[Dict[str, Any]]:
     """Test the challenge endpoint"""
     print_info("\n1. Testing challenge endpoint...")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{BASE_URL}/tokens/challenge",
-                json={"device_id": device_id},
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                print_success(f"Challenge generated: {data['challenge'][:20]}...")
-                print_info(f"  Expires in: {data['expires_in_seconds']} seconds")
-                return data
-            else:
-                print_error(f"Failed to get challenge: {response.status_code}")
-                print_error(f"  Response: {response.text}")
-                return None
+        response = await client.post(
+            f"{BASE_URL}/tokens/challenge",
+            content=orjson.dumps({"device_id": device_id}),
+            headers={"Authorization": f"Bearer {token}", **JSON_HEADERS}
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            print_success(f"Challenge generated: {data['challenge'][:20]}...")
+            print_info(f"  Expires in: {data['expires_in_seconds']} seconds")
+            return data
+        else:
+            print_error(f"Failed to get challenge: {response.status_code}")
+            print_error(f"  Response: {response.text}")
+            return None
     except Exception as e:
         print_error(f"Error requesting challenge: {e}")
         return None
 
 async def test_token_issuance_with_valid_signature(
+    client: httpx.AsyncClient,
     token: str,
     device_id: int,
     challenge: str,
@@ -141,36 +220,35 @@ async def test_token_issuance_with_valid_signature(
     print_info("\n2. Testing token issuance with valid signature...")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{BASE_URL}/tokens/issue",
-                json={
-                    "device_id": device_id,
-                    "challenge": challenge,
-                    "challenge_signature": signature,
-                    "resource": "*",
-                    "expires_in_minutes": 15
-                },
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                print_success("Token issued successfully!")
-                print_info(f"  Device: {data['device_name']}")
-                print_info(f"  Compliant: {data['is_compliant']}")
-                print_info(f"  Expires in: {data['expires_in_minutes']} minutes")
-                return data.get("token")
-            else:
-                print_error(f"Failed to issue token: {response.status_code}")
-                print_error(f"  Response: {response.text}")
-                return None
+        response = await client.post(
+            f"{BASE_URL}/tokens/issue",
+            content=orjson.dumps({
+                "device_id": device_id,
+                "challenge": challenge,
+                "challenge_signature": signature,
+                "resource": "*",
+                "expires_in_minutes": 15
+            }),
+            headers={"Authorization": f"Bearer {token}", **JSON_HEADERS}
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            print_success("Token issued successfully!")
+            print_info(f"  Device: {data['device_name']}")
+            print_info(f"  Compliant: {data['is_compliant']}")
+            print_info(f"  Expires in: {data['expires_in_minutes']} minutes")
+            return data.get("token")
+        else:
+            print_error(f"Failed to issue token: {response.status_code}")
+            print_error(f"  Response: {response.text}")
+            return None
     except Exception as e:
         print_error(f"Error issuing token: {e}")
         return None
 
 async def test_token_issuance_with_invalid_signature(
+    client: httpx.AsyncClient,
     token: str,
     device_id: int,
     challenge: str
@@ -181,96 +259,88 @@ async def test_token_issuance_with_invalid_signature(
     invalid_signature = "invalid_signature_base64_encoded"
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                f"{BASE_URL}/tokens/issue",
-                json={
-                    "device_id": device_id,
-                    "challenge": challenge,
-                    "challenge_signature": invalid_signature,
-                    "resource": "*"
-                },
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 401:
-                print_success("Invalid signature correctly rejected!")
-                return True
-            else:
-                print_error(f"Expected 401, got {response.status_code}")
-                print_error(f"  Response: {response.text}")
-                return False
+        response = await client.post(
+            f"{BASE_URL}/tokens/issue",
+            content=orjson.dumps({
+                "device_id": device_id,
+                "challenge": challenge,
+                "challenge_signature": invalid_signature,
+                "resource": "*"
+            }),
+            headers={"Authorization": f"Bearer {token}", **JSON_HEADERS}
+        )
+        
+        if response.status_code == 401:
+            print_success("Invalid signature correctly rejected!")
+            return True
+        else:
+            print_error(f"Expected 401, got {response.status_code}")
+            print_error(f"  Response: {response.text}")
+            return False
     except Exception as e:
         print_error(f"Error testing invalid signature: {e}")
         return False
 
-async def test_token_usage(device_token: str) -> bool:
+async def test_token_usage(client: httpx.AsyncClient, device_token: str) -> bool:
     """Test that the issued token works for resource access"""
     print_info("\n4. Testing token usage for resource access...")
     
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{BASE_URL}/resources/list",
-                headers={"Authorization": f"Bearer {device_token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                print_success("Token works for resource access!")
-                print_info(f"  Resources available: {len(data.get('resources', []))}")
-                return True
-            else:
-                print_error(f"Token failed for resource access: {response.status_code}")
-                print_error(f"  Response: {response.text}")
-                return False
+        response = await client.get(
+            f"{BASE_URL}/resources/list",
+            headers={"Authorization": f"Bearer {device_token}"}
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            print_success("Token works for resource access!")
+            print_info(f"  Resources available: {len(data.get('resources', []))}")
+            return True
+        else:
+            print_error(f"Token failed for resource access: {response.status_code}")
+            print_error(f"  Response: {response.text}")
+            return False
     except Exception as e:
         print_error(f"Error testing token usage: {e}")
         return False
 
-async def get_user_devices(token: str) -> Optional[list]:
+async def get_user_devices(client: httpx.AsyncClient, token: str) -> Optional[list]:
     """Get user's devices"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{BASE_URL}/users/me/devices",
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                return data.get("devices", [])
-            else:
-                print_error(f"Failed to get devices: {response.status_code}")
-                return None
+        response = await client.get(
+            f"{BASE_URL}/users/me/devices",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            return data.get("devices", [])
+        else:
+            print_error(f"Failed to get devices: {response.status_code}")
+            return None
     except Exception as e:
         print_error(f"Error getting devices: {e}")
         return None
 
-async def get_device_tpm_key(token: str, device_id: int) -> Optional[str]:
+async def get_device_tpm_key(client: httpx.AsyncClient, token: str, device_id: int) -> Optional[str]:
     """Get device's TPM public key (for mock signing)"""
     try:
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{BASE_URL}/devices/{device_id}",
-                headers={"Authorization": f"Bearer {token}"},
-                timeout=10.0
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                # Note: TPM key might not be in the response for security
-                # In real testing, you'd use the actual device's TPM
-                return data.get("tpm_public_key")
-            else:
-                return None
+        response = await client.get(
+            f"{BASE_URL}/devices/{device_id}",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        
+        if response.status_code == 200:
+            data = orjson.loads(response.content)
+            # Note: TPM key might not be in the response for security
+            # In real testing, you'd use the actual device's TPM
+            return data.get("tpm_public_key")
+        else:
+            return None
     except Exception as e:
         return None
 
-async def main():
+async def run_tests(client: httpx.AsyncClient):
     """Run TPM attestation tests"""
     print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.END}")
     print(f"{Colors.BOLD}{Colors.BLUE}TPM Device Attestation Test Suite{Colors.END}")
@@ -283,7 +353,7 @@ async def main():
         print_info(f"Using provided token (length: {len(token)})")
     else:
         print_info("Getting Keycloak token...")
-        token = await get_keycloak_token()
+        token = await get_keycloak_token(client)
         if not token:
             print_error("Failed to get authentication token")
             print_info("Usage: python test_tpm_attestation.py [--token YOUR_TOKEN]")
@@ -291,7 +361,7 @@ async def main():
     
     # Get user's devices
     print_info("\nGetting user's devices...")
-    devices = await get_user_devices(token)
+    devices = await get_user_devices(client, token)
     if not devices:
         print_error("No devices found or failed to get devices")
         return 1
@@ -312,14 +382,16 @@ async def main():
     device_unique_id = enrolled_device.get("device_unique_id")
     print_success(f"Found enrolled device: {enrolled_device.get('device_name')} (ID: {device_id})")
     
-    # Check if device has TPM key
-    device_info = await get_device_tpm_key(token, device_id)
+    # Check if device has TPM key, and
+    # Test 1: Get challenge (independent requests, so issue them together)
+    device_info, challenge_data = await asyncio.gather(
+        get_device_tpm_key(client, token, device_id),
+        test_challenge_endpoint(client, token, device_id),
+    )
     if not device_info:
         print_warning("Could not verify TPM key. Device may not have TPM key stored.")
         print_info("This test will use a mock signature (for testing only)")
     
-    # Test 1: Get challenge
-    challenge_data = await test_challenge_endpoint(token, device_id)
     if not challenge_data:
         print_error("Cannot proceed without challenge")
         return 1
@@ -331,14 +403,10 @@ async def main():
     print_warning("\n⚠️  Using MOCK signature for testing")
     print_info("In production, the DPA would sign the challenge with the device's TPM")
     
-    # Generate a temporary key pair for mock signing
+    # Use a throwaway key pair for mock signing
     # NOTE: This won't work with the actual device's TPM key
     # For real testing, you need the DPA to sign the challenge
-    private_key = rsa.generate_private_key(
-        public_exponent=65537,
-        key_size=2048,
-        backend=default_backend()
-    )
+    private_key = load_mock_private_key()
     
     mock_signature = generate_mock_signature(challenge, private_key)
     print_info(f"Generated mock signature: {mock_signature[:30]}...")
@@ -347,7 +415,7 @@ async def main():
     # This will fail because the signature doesn't match the device's TPM key
     print_warning("\n⚠️  Testing with mock signature (will fail - this is expected)")
     device_token = await test_token_issuance_with_valid_signature(
-        token, device_id, challenge, mock_signature
+        client, token, device_id, challenge, mock_signature
     )
     
     if device_token:
@@ -357,7 +425,7 @@ async def main():
         print_info("Mock signature correctly rejected (expected behavior)")
     
     # Test 3: Test invalid signature rejection
-    await test_token_issuance_with_invalid_signature(token, device_id, challenge)
+    await test_token_issuance_with_invalid_signature(client, token, device_id, challenge)
     
     # Summary
     print(f"\n{Colors.BOLD}{Colors.BLUE}{'='*70}{Colors.END}")
@@ -376,6 +444,11 @@ async def main():
     
     return 0
 
+async def main():
+    """Run the tests over one client shared by every request"""
+    async with httpx.AsyncClient(timeout=10.0) as client:
+        return await run_tests(client)
+
 if __name__ == "__main__":
     sys.exit(asyncio.run(main()))
 
@@ -5,48 +5,86 @@ sys.path.insert(0, '/app')
 
 from app.db import get_db
 from app.services.posture_service import PostureService
-from sqlalchemy import select
+from sqlalchemy import bindparam, select, update
 from app.models.posture_history import PostureHistory
 
+# Rows fetched per round-trip while streaming
+BATCH_SIZE = 500
+
+posture_table = PostureHistory.__table__
+
+# Core executemany UPDATE: no ORM identity map, change tracking or flush
+UPDATE_EVALUATION = (
+    update(posture_table)
+    .where(posture_table.c.id == bindparam("record_id"))
+    .values(
+        is_compliant=bindparam("new_is_compliant"),
+        compliance_score=bindparam("new_compliance_score"),
+        violations=bindparam("new_violations"),
+    )
+)
+
 async def main():
     async for db in get_db():
         # Get all posture records for device ID 4, ordered by most recent
         query = (
-            select(PostureHistory)
-            .where(PostureHistory.device_id == 4)
-            .order_by(PostureHistory.checked_at.desc())
+            select(
+                posture_table.c.id,
+                posture_table.c.checked_at,
+                posture_table.c.is_compliant,
+                posture_table.c.compliance_score,
+                posture_table.c.violations,
+                posture_table.c.posture_data,
+            )
+            .where(posture_table.c.device_id == 4)
+            .order_by(posture_table.c.checked_at.desc())
             .limit(10)
+            .execution_options(yield_per=BATCH_SIZE)
         )
-        result = await db.execute(query)
-        records = list(result.scalars().all())
+        # Stream plain rows (not ORM objects) through a server-side cursor so
+        # memory stays bounded by BATCH_SIZE
+        result = await db.stream(query)
         
-        print(f"Found {len(records)} posture records to update")
+        print("Re-evaluating posture records")
         print("=" * 60)
         
+        checked_count = 0
         updated_count = 0
-        for record in records:
-            # Re-evaluate with new logic
-            is_compliant, score, violations = PostureService.evaluate_compliance(record.posture_data)
-            
-            # Only update if different
-            if (record.is_compliant != is_compliant or 
-                record.compliance_score != score or 
-                record.violations != violations):
-                
-                print(f"\nRecord ID {record.id} (checked at {record.checked_at}):")
-                print(f"  Old: Compliant={record.is_compliant}, Score={record.compliance_score}%, Violations={len(record.violations)}")
-                print(f"  New: Compliant={is_compliant}, Score={score}%, Violations={len(violations)}")
+        async for records in result.partitions():
+            changed = []
+            for record in records:
+                checked_count += 1
+                # Re-evaluate with new logic
+                is_compliant, score, violations = PostureService.evaluate_compliance(record.posture_data)
                 
-                record.is_compliant = is_compliant
-                record.compliance_score = score
-                record.violations = violations
-                updated_count += 1
+                # Only update if different
+                if (record.is_compliant != is_compliant or 
+                    record.compliance_score != score or 
+                    record.violations != violations):
+                    
+                    print(f"\nRecord ID {record.id} (checked at {record.checked_at}):")
+                    print(f"  Old: Compliant={record.is_compliant}, Score={record.compliance_score}%, Violations={len(record.violations)}")
+                    print(f"  New: Compliant={is_compliant}, Score={score}%, Violations={len(violations)}")
+                    
+                    changed.append({
+                        "record_id": record.id,
+                        "new_is_compliant": is_compliant,
+                        "new_compliance_score": score,
+                        "new_violations": violations,
+                    })
+            
+            if changed:
+                # One executemany UPDATE per batch instead of a flush per dirty record
+                await db.execute(UPDATE_EVALUATION, changed)
+                updated_count += len(changed)
         
+        print(f"\nChecked {checked_count} posture records")
         if updated_count > 0:
+            # Single commit at the end: committing mid-stream would close the cursor
             await db.commit()
-            print(f"\n✓ Updated {updated_count} records")
+            print(f"✓ Updated {updated_count} records")
         else:
-            print("\n✓ All records are already up to date")
+            print("✓ All records are already up to date")
         
         break
 
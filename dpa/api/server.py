@@ -7,25 +7,29 @@ This allows the frontend to integrate with the DPA without direct TPM access.
 The server runs on localhost and only accepts connections from localhost for security.
 """
 
+import asyncio
 import json
 import base64
 import logging
+import time
+import orjson
 from typing import Optional
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field
+from fastapi import Depends, FastAPI, HTTPException, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import ORJSONResponse, Response
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 import uvicorn
 from pathlib import Path
 import sys
 import os
 
-# Add project root to path for imports
+# Add project root to path for imports when run as a file path
 # Path structure: project_root/dpa/api/server.py
 # So we need to go up 2 levels to get to project root
-import os
-project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+if not __package__:
+    project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+    if project_root not in sys.path:
+        sys.path.insert(0, project_root)
 
 from dpa.core.signing import PostureSigner
 from dpa.core.enrollment import DeviceEnrollment
@@ -36,13 +40,106 @@ from dpa.utils.logger import setup_logger
 setup_logger()
 logger = logging.getLogger("dpa.api")
 
+# Interactive docs and the OpenAPI schema are off unless DPA_ENABLE_DOCS is set
+_docs_enabled = os.getenv("DPA_ENABLE_DOCS", "false").lower() == "true"
+
 # Create FastAPI app
 app = FastAPI(
     title="DPA Local API",
     description="Device Posture Agent Local API for Challenge Signing",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    docs_url="/docs" if _docs_enabled else None,
+    redoc_url="/redoc" if _docs_enabled else None,
+    openapi_url="/openapi.json" if _docs_enabled else None
 )
 
+class FastCORSMiddleware:
+    """
+    Pure-ASGI CORS middleware.
+
+    Works directly on scope/send instead of building Request/Response objects,
+    and answers preflights without routing. Header values are encoded once.
+    """
+
+    def __init__(self, app, allow_origins, allow_methods, allow_headers):
+        self.app = app
+        self.allow_origin_all = "*" in allow_origins
+        self.allow_origins = frozenset(o.encode("latin-1") for o in allow_origins)
+        self.allow_all_methods = "*" in allow_methods
+        self.allow_methods = frozenset(m.encode("latin-1") for m in allow_methods)
+        self.allow_all_headers = "*" in allow_headers
+        self.simple_headers = [(b"access-control-expose-headers", b"*")]
+        self.preflight_headers = [
+            (b"access-control-allow-methods", ", ".join(allow_methods).encode("latin-1")),
+            (b"access-control-max-age", b"600"),
+        ]
+        if not self.allow_all_headers:
+            self.preflight_headers.append(
+                (b"access-control-allow-headers", ", ".join(allow_headers).encode("latin-1"))
+            )
+        if self.allow_origin_all:
+            self.origin_header = (b"access-control-allow-origin", b"*")
+        else:
+            # Credentials are only allowed alongside an explicit origin list
+            credentials = (b"access-control-allow-credentials", b"true")
+            self.simple_headers.append(credentials)
+            self.preflight_headers.append(credentials)
+
+    def _origin_headers(self, origin: bytes) -> list:
+        if self.allow_origin_all:
+            return [self.origin_header]
+        if origin in self.allow_origins:
+            return [(b"access-control-allow-origin", origin), (b"vary", b"Origin")]
+        return []
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        origin = None
+        request_method = None
+        request_headers = None
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                origin = value
+            elif name == b"access-control-request-method":
+                request_method = value
+            elif name == b"access-control-request-headers":
+                request_headers = value
+
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        origin_headers = self._origin_headers(origin)
+
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = origin_headers + self.preflight_headers
+            if self.allow_all_headers and request_headers is not None:
+                headers.append((b"access-control-allow-headers", request_headers))
+            # Same as Starlette's CORSMiddleware: disallowed origin or method is a 400
+            method_allowed = self.allow_all_methods or request_method in self.allow_methods
+            status = 200 if origin_headers and method_allowed else 400
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if not origin_headers:
+            await self.app(scope, receive, send)
+            return
+
+        extra_headers = origin_headers + self.simple_headers
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", ())) + extra_headers
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
+
+
 # CORS middleware - allow all origins for local development API
 # This is a local API server, so we allow all origins for development
 # In production, you should restrict this to specific origins
@@ -55,12 +152,10 @@ else:
     allowed_origins_list = ["*"]
 
 app.add_middleware(
-    CORSMiddleware,
+    FastCORSMiddleware,
     allow_origins=allowed_origins_list,
-    allow_credentials=True if "*" not in allowed_origins_list else False,
     allow_methods=["GET", "POST", "OPTIONS"],
     allow_headers=["*"],
-    expose_headers=["*"],
 )
 
 # Global signer instance
@@ -68,13 +163,15 @@ signer: Optional[PostureSigner] = None
 enrollment: Optional[DeviceEnrollment] = None
 
 
-def get_signer() -> PostureSigner:
-    """Get or create PostureSigner instance"""
+def get_signer(warm: bool = False) -> PostureSigner:
+    """Get or create PostureSigner instance; warm=True pre-spawns the TPM process"""
     global signer
     if signer is None:
         # Allow TPM executable path to be specified via environment variable
         tpm_exe_path = os.getenv("TPM_SIGNER_EXE_PATH")
         signer = PostureSigner(tpm_exe_path=tpm_exe_path)
+    if warm:
+        signer.tpm.warm()
     return signer
 
 
@@ -107,34 +204,69 @@ class HealthResponse(BaseModel):
     message: str
 
 
+# Built once so request bodies go straight to the compiled pydantic-core validator
+_CHALLENGE_REQ_ADAPTER = TypeAdapter(ChallengeRequest)
+
+
+async def orjson_body(request: Request) -> dict:
+    """Request body parsed with orjson, for POST endpoints that skip FastAPI body parsing"""
+    try:
+        return orjson.loads(await request.body())
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{
+            "type": "json_invalid",
+            "loc": ("body", e.pos),
+            "msg": "JSON decode error",
+            "input": {},
+            "ctx": {"error": e.msg}
+        }])
+
+
 # ==================== ENDPOINTS ====================
 
+# Monitoring polls /health often; the TPM probe shells out, so reuse recent results
+_HEALTH_TTL = 5.0
+_HEALTH_CACHE = {"ts": 0.0, "payload": None}
+
 @app.get("/health", response_model=HealthResponse)
 async def health_check():
     """
     Health check endpoint
     Returns DPA status including enrollment and TPM availability
     """
+    now = time.monotonic()
+    if _HEALTH_CACHE["payload"] is not None and now - _HEALTH_CACHE["ts"] < _HEALTH_TTL:
+        return Response(content=_HEALTH_CACHE["payload"], media_type="application/json")
+
     try:
+        # Both checks touch the filesystem or spawn a process; run them off the event loop
+        loop = asyncio.get_running_loop()
         enrollment_check = get_enrollment()
-        is_enrolled = enrollment_check.is_enrolled()
+        enrolled_future = loop.run_in_executor(None, enrollment_check.is_enrolled)
         
         # Check TPM availability
         signer_check = get_signer()
         tpm_available = False
         try:
             # Try to check TPM status
-            tpm_available, key_exists, _ = signer_check.tpm.check_status()
+            tpm_available, _, _ = await loop.run_in_executor(
+                None, signer_check.tpm.check_status
+            )
         except Exception as e:
             logger.warning(f"Could not check TPM status: {e}")
             tpm_available = False
+        is_enrolled = await enrolled_future
         
-        return HealthResponse(
-            status="healthy",
-            enrolled=is_enrolled,
-            tpm_available=tpm_available,
-            message="DPA API is running"
-        )
+        # Serialized once per cache fill; HealthResponse only documents the schema
+        payload = orjson.dumps({
+            "status": "healthy",
+            "enrolled": is_enrolled,
+            "tpm_available": tpm_available,
+            "message": "DPA API is running"
+        })
+        _HEALTH_CACHE["ts"] = time.monotonic()
+        _HEALTH_CACHE["payload"] = payload
+        return Response(content=payload, media_type="application/json")
     except Exception as e:
         logger.error(f"Health check failed: {e}")
         raise HTTPException(status_code=500, detail=f"Health check failed: {str(e)}")
@@ -144,8 +276,16 @@ async def health_check():
 # The browser no longer communicates directly with the DPA API.
 # Device verification is now done on the backend based on continuous posture reports.
 # This endpoint is kept for backward compatibility but should not be used.
-@app.post("/sign-challenge", response_model=ChallengeResponse, deprecated=True)
-async def sign_challenge(request: ChallengeRequest):
+@app.post(
+    "/sign-challenge",
+    response_model=ChallengeResponse,
+    deprecated=True,
+    openapi_extra={"requestBody": {
+        "required": True,
+        "content": {"application/json": {"schema": ChallengeRequest.model_json_schema()}}
+    }}
+)
+async def sign_challenge(payload: dict = Depends(orjson_body)):
     """
     [DEPRECATED] Sign a challenge string with the device's TPM
     
@@ -157,6 +297,11 @@ async def sign_challenge(request: ChallengeRequest):
     
     This endpoint is kept for backward compatibility only.
     """
+    try:
+        _CHALLENGE_REQ_ADAPTER.validate_python(payload)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+    
     logger.warning("DEPRECATED: /sign-challenge endpoint called. This should not be used in new ZTNA architecture.")
     raise HTTPException(
         status_code=410,  # Gone
@@ -164,21 +309,51 @@ async def sign_challenge(request: ChallengeRequest):
     )
 
 
+_ROOT_BYTES = orjson.dumps({
+    "service": "DPA Local API",
+    "version": "1.0.0",
+    "endpoints": {
+        "health": "/health"
+    },
+    "description": "Device Posture Agent Local API - Health check only. Challenge signing is deprecated."
+})
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information"""
-    return {
-        "service": "DPA Local API",
-        "version": "1.0.0",
-        "endpoints": {
-            "health": "/health"
-        },
-        "description": "Device Posture Agent Local API - Health check only. Challenge signing is deprecated."
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 # ==================== STARTUP ====================
 
+class MinimalAccessLog:
+    """
+    Pure-ASGI access log: one preformatted line per response, written straight
+    to an append-mode file instead of going through logging handlers.
+    """
+
+    def __init__(self, app, log_path: Path):
+        self.app = app
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        self._fp = open(log_path, "a", buffering=1, encoding="utf-8")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter_ns()
+
+        async def send_with_log(message):
+            if message["type"] == "http.response.start":
+                elapsed_us = (time.perf_counter_ns() - start) // 1000
+                self._fp.write(f'{scope["method"]} {scope["path"]} {message["status"]} {elapsed_us}us\n')
+            await send(message)
+
+        await self.app(scope, receive, send_with_log)
+
+
 def start_server(host: str = "127.0.0.1", port: int = 8081, log_level: str = "info"):
     """
     Start the DPA API server
@@ -197,13 +372,25 @@ def start_server(host: str = "127.0.0.1", port: int = 8081, log_level: str = "in
     else:
         logger.info("Device is enrolled and ready")
     
+    # Start the persistent TPMSigner process before the first /health probe
+    get_signer(warm=True)
+    
+    # Access logging is opt-in (DPA_ACCESS_LOG=1) and bypasses Python logging
+    application = app
+    if os.getenv("DPA_ACCESS_LOG", "0") == "1":
+        log_dir = Path(os.environ.get("PROGRAMDATA", "C:\\ProgramData")) / "ZTNA" / "logs"
+        application = MinimalAccessLog(app, log_dir / "dpa_access.log")
+    
     # Start server
     uvicorn.run(
-        app,
+        application,
         host=host,
         port=port,
         log_level=log_level,
-        access_log=True
+        access_log=False,
+        # C event loop and HTTP parser from uvicorn[standard]; uvloop has no Windows build
+        loop="asyncio" if sys.platform == "win32" else "uvloop",
+        http="httptools"
     )
 
 
@@ -4,11 +4,9 @@ CLI for device enrollment
 import sys
 import os
 import argparse
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-
-from dpa.core.enrollment import DeviceEnrollment
-from dpa.utils.logger import setup_logger
-from dpa.config.settings import config_manager
+# Only needed when run as a file path; `python -m dpa.cli...` already has the root on sys.path
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 def main():
     parser = argparse.ArgumentParser(description="Device Posture Agent - Enrollment Tool")
@@ -28,6 +26,11 @@ def main():
     
     args = parser.parse_args()
     
+    # Imported after argument parsing so --help doesn't load the agent
+    from dpa.core.enrollment import DeviceEnrollment
+    from dpa.utils.logger import setup_logger
+    from dpa.config.settings import config_manager
+    
     # Update backend URL if provided via CLI
     if args.backend_url:
         config_manager.update("backend_url", args.backend_url)
@@ -7,12 +7,9 @@ submitting fresh posture data with the request.
 import sys
 import os
 import argparse
-sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
-
-from dpa.core.access_request import AccessRequestHandler
-from dpa.core.enrollment import DeviceEnrollment
-from dpa.utils.logger import setup_logger
-from dpa.config.settings import config_manager
+# Only needed when run as a file path; `python -m dpa.cli...` already has the root on sys.path
+if not __package__:
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
 
 def main():
     parser = argparse.ArgumentParser(description="DPA Resource Access Request CLI")
@@ -24,6 +21,12 @@ def main():
     
     args = parser.parse_args()
     
+    # Imported after argument parsing so --help doesn't load the agent
+    from dpa.core.access_request import AccessRequestHandler
+    from dpa.core.enrollment import DeviceEnrollment
+    from dpa.utils.logger import setup_logger
+    from dpa.config.settings import config_manager
+    
     setup_logger()
     
     # Check if device is enrolled
@@ -1,5 +1,6 @@
-import json
 import os
+import threading
+import orjson
 from pathlib import Path
 
 class ConfigManager:
@@ -7,16 +8,30 @@ class ConfigManager:
         self.config_dir = Path(os.environ.get("PROGRAMDATA", "C:\\ProgramData")) / "ZTNA"
         self.config_file = self.config_dir / "config.json"
         self.config = self._load_config()
+        # ConfigObject handed out by get(); rebuilt after update()
+        self._obj = None
+        self._lock = threading.Lock()
 
-    def _load_config(self):
-        # Load from file if exists
-        file_config = {}
+    def _read_file_config(self):
+        """Parse config.json; returns None if the file does not exist"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    file_config = json.load(f)
+            with open(self.config_file, 'rb') as f:
+                return orjson.loads(f.read())
+        except FileNotFoundError:
+            return None
         except Exception:
-            pass
+            return {}
+
+    def _write_file_config(self, cfg):
+        with open(self.config_file, 'wb') as f:
+            f.write(orjson.dumps(cfg, option=orjson.OPT_INDENT_2))
+
+    def _load_config(self):
+        # Load from file if exists; a missing file is the only case that needs a write
+        file_config = self._read_file_config()
+        needs_write = file_config is None
+        if needs_write:
+            file_config = {}
 
         # Environment variable takes precedence over file config
         backend_url = os.getenv("DPA_BACKEND_URL") or file_config.get("backend_url", "http://localhost:8000")
@@ -26,46 +41,86 @@ class ConfigManager:
             "tpm_enabled": os.getenv("DPA_TPM_ENABLED", "true").lower() == "true" if "DPA_TPM_ENABLED" in os.environ else file_config.get("tpm_enabled", True),
             "backend_url": backend_url,
             "reporting_interval": int(os.getenv("DPA_REPORTING_INTERVAL", file_config.get("reporting_interval", 300))),
+            # Backend request timeouts: fail fast on connect, allow time for the response
+            "connect_timeout": float(os.getenv("DPA_CONNECT_TIMEOUT", file_config.get("connect_timeout", 5))),
+            "read_timeout": float(os.getenv("DPA_READ_TIMEOUT", file_config.get("read_timeout", 25))),
+            # gzip posture submissions; needs a backend with GzipRequestMiddleware
+            "compress_payloads": os.getenv("DPA_COMPRESS_PAYLOADS", "false").lower() == "true" if "DPA_COMPRESS_PAYLOADS" in os.environ else file_config.get("compress_payloads", False),
             "device_name": os.getenv("COMPUTERNAME", file_config.get("device_name", "unknown"))
         }
 
         # Only write default config if file doesn't exist
-        if not self.config_file.exists():
+        if needs_write:
             try:
                 self.config_dir.mkdir(parents=True, exist_ok=True)
-                with open(self.config_file, 'w') as f:
-                    json.dump(default_config, f, indent=2)
+                self._write_file_config(default_config)
             except Exception:
                 pass
 
         return default_config
 
     def get(self):
-        config_obj = ConfigObject(self.config)
-        # Attach config_dir to the config object so it's accessible
-        config_obj.config_dir = self.config_dir
-        return config_obj
+        obj = self._obj
+        if obj is None:
+            with self._lock:
+                if self._obj is None:
+                    # Attach config_dir to the config object so it's accessible
+                    self._obj = ConfigObject.from_dict(self.config, self.config_dir)
+                obj = self._obj
+        return obj
 
     def update(self, key, value):
-        self.config[key] = value
-        try:
-            with open(self.config_file, 'w') as f:
-                json.dump(self.config, f, indent=2)
-        except Exception:
-            pass
+        with self._lock:
+            self.config[key] = value
+            # A new key needs a ConfigObject subclass with a property for it
+            self._obj = None
+            try:
+                self._write_file_config(self.config)
+            except Exception:
+                pass
 
 class ConfigObject:
-    def __init__(self, data):
+    """
+    Attribute view over a config dict.
+
+    from_dict() returns an instance of a subclass with one property per key, so
+    reads go through a descriptor instead of the __getattr__ fallback. Keys not
+    present in the dict still read as None.
+    """
+    __slots__ = ("_data", "config_dir")
+    _subclasses = {}
+
+    def __init__(self, data, config_dir=None):
         self._data = data
+        self.config_dir = config_dir
 
-    def __getattr__(self, item):
-        return self._data.get(item, None)
+    @classmethod
+    def from_dict(cls, data, config_dir=None):
+        keys = tuple(data)
+        subclass = cls._subclasses.get(keys)
+        if subclass is None:
+            namespace = {"__slots__": ()}
+            for key in keys:
+                if key not in cls.__slots__:
+                    namespace[key] = cls._make_property(key)
+            subclass = type(cls.__name__, (cls,), namespace)
+            cls._subclasses[keys] = subclass
+        return subclass(data, config_dir)
+
+    @staticmethod
+    def _make_property(key):
+        def getter(self):
+            return self._data[key]
 
-    def __setattr__(self, key, value):
-        if key == "_data":
-            super().__setattr__(key, value)
-        else:
+        def setter(self, value):
             self._data[key] = value
 
+        return property(getter, setter)
+
+    def __getattr__(self, item):
+        if item.startswith("_"):
+            raise AttributeError(item)
+        return self._data.get(item, None)
+
 
 config_manager = ConfigManager()
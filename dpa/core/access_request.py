@@ -6,8 +6,15 @@ When a resource access is requested, it collects current posture, signs it,
 and includes it in the access request.
 """
 from typing import Optional, Dict, Any
+import asyncio
+import atexit
 import logging
+import threading
+import httpx
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from .signing import PostureSigner
 from ..modules.posture import collect_posture_report
 from ..config.settings import config_manager
@@ -24,6 +31,99 @@ class AccessRequestHandler:
         self.backend_url = (backend_url or config.backend_url).rstrip("/")
         self.signer = PostureSigner(tpm_exe_path=tpm_exe_path)
         self.config = config
+        
+        # Keep-alive pool so repeated access requests skip the TCP/TLS handshake.
+        # Retry only covers connect failures for POST; urllib3 won't resend the body.
+        self._session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=8,
+            max_retries=Retry(total=2, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        atexit.register(self._session.close)
+        
+        # Async client is created on first use so it binds to the caller's event loop
+        self._aclient: Optional[httpx.AsyncClient] = None
+    
+    def close(self):
+        """Close pooled backend connections"""
+        self._session.close()
+        atexit.unregister(self._session.close)
+    
+    async def aclose(self):
+        """Close the async client, if one was created"""
+        if self._aclient is not None:
+            await self._aclient.aclose()
+            self._aclient = None
+    
+    def _warmup(self):
+        """Open a pooled backend connection ahead of the access request"""
+        try:
+            # Any status will do; the point is the TCP/TLS handshake
+            self._session.head(f"{self.backend_url}/health", timeout=(self.config.connect_timeout, 5))
+        except requests.exceptions.RequestException as e:
+            logger.debug(f"Backend warm-up failed: {e}")
+    
+    def _prepare_request(
+        self,
+        device_id: int,
+        resource: str,
+        access_type: str,
+        auth_token: Optional[str]
+    ):
+        """Collect and sign fresh posture, returning (url, body, headers)"""
+        # Collect fresh posture data
+        logger.info("Collecting fresh posture data for access request")
+        posture_report = collect_posture_report()
+        
+        # Sign the canonical encoding and reuse it as the posture_data value in the body
+        canonical = self.signer.canonicalize(posture_report)
+        signature = self.signer.sign_bytes(canonical)
+        
+        # Prepare access request payload
+        body = b"".join((
+            b'{"device_id":', orjson.dumps(device_id),
+            b',"resource":', orjson.dumps(resource),
+            b',"access_type":', orjson.dumps(access_type),
+            b',"posture_data":', canonical,
+            b',"posture_signature":', orjson.dumps(signature),
+            b"}"
+        ))
+        
+        # Submit access request with posture
+        url = f"{self.backend_url}/api/access/request"
+        logger.info(f"Requesting access to {resource} with fresh posture data")
+        
+        headers = {"Content-Type": "application/json"}
+        if auth_token:
+            headers["Authorization"] = f"Bearer {auth_token}"
+        
+        return url, body, headers
+    
+    def _handle_response(self, response) -> Dict[str, Any]:
+        """Map a requests or httpx response to the access result dict"""
+        if response.status_code == 200:
+            result = orjson.loads(response.content)
+            logger.info(f"Access request successful: {result.get('allowed', False)}")
+            return result
+        elif response.status_code == 403:
+            error_data = orjson.loads(response.content)
+            logger.warning(f"Access denied: {error_data.get('detail', 'Unknown reason')}")
+            return {
+                "allowed": False,
+                "reason": error_data.get("detail", "Access denied"),
+                "error": error_data
+            }
+        else:
+            error_msg = response.text
+            logger.error(f"Access request failed: HTTP {response.status_code} - {error_msg}")
+            return {
+                "allowed": False,
+                "reason": f"Request failed: HTTP {response.status_code}",
+                "error": error_msg
+            }
     
     def request_access(
         self,
@@ -45,52 +145,14 @@ class AccessRequestHandler:
             dict: Access response with 'allowed', 'token', 'reason', etc.
         """
         try:
-            # Collect fresh posture data
-            logger.info("Collecting fresh posture data for access request")
-            posture_report = collect_posture_report()
-            
-            # Sign the posture report
-            signature = self.signer.sign(posture_report)
-            
-            # Prepare access request payload
-            payload = {
-                "device_id": device_id,
-                "resource": resource,
-                "access_type": access_type,
-                "posture_data": posture_report,
-                "posture_signature": signature
-            }
-            
-            # Submit access request with posture
-            url = f"{self.backend_url}/api/access/request"
-            logger.info(f"Requesting access to {resource} with fresh posture data")
-            
-            headers = {}
-            if auth_token:
-                headers["Authorization"] = f"Bearer {auth_token}"
-            
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                logger.info(f"Access request successful: {result.get('allowed', False)}")
-                return result
-            elif response.status_code == 403:
-                error_data = response.json()
-                logger.warning(f"Access denied: {error_data.get('detail', 'Unknown reason')}")
-                return {
-                    "allowed": False,
-                    "reason": error_data.get("detail", "Access denied"),
-                    "error": error_data
-                }
-            else:
-                error_msg = response.text
-                logger.error(f"Access request failed: HTTP {response.status_code} - {error_msg}")
-                return {
-                    "allowed": False,
-                    "reason": f"Request failed: HTTP {response.status_code}",
-                    "error": error_msg
-                }
+            # Posture collection and signing take a while; connect to the backend meanwhile
+            threading.Thread(target=self._warmup, daemon=True).start()
+            url, body, headers = self._prepare_request(device_id, resource, access_type, auth_token)
+            response = self._session.post(
+                url, data=body, headers=headers,
+                timeout=(self.config.connect_timeout, self.config.read_timeout)
+            )
+            return self._handle_response(response)
                 
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Backend connection failed: {e}")
@@ -113,4 +175,52 @@ class AccessRequestHandler:
                 "reason": f"Request failed: {str(e)}",
                 "error": str(e)
             }
-
+    
+    async def request_access_async(
+        self,
+        device_id: int,
+        resource: str,
+        access_type: str = "read",
+        auth_token: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Async variant of request_access over a shared HTTP/2 client
+        
+        Posture collection and TPM signing run in the default executor so the
+        calling event loop stays responsive.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+            url, body, headers = await loop.run_in_executor(
+                None, self._prepare_request, device_id, resource, access_type, auth_token
+            )
+            if self._aclient is None:
+                self._aclient = httpx.AsyncClient(
+                    http2=True,
+                    timeout=httpx.Timeout(self.config.read_timeout, connect=self.config.connect_timeout),
+                    limits=httpx.Limits(max_keepalive_connections=4)
+                )
+            response = await self._aclient.post(url, content=body, headers=headers)
+            return self._handle_response(response)
+                
+        except httpx.ConnectError as e:
+            logger.error(f"Backend connection failed: {e}")
+            return {
+                "allowed": False,
+                "reason": "Cannot connect to backend",
+                "error": str(e)
+            }
+        except httpx.TimeoutException:
+            logger.error("Backend request timeout")
+            return {
+                "allowed": False,
+                "reason": "Request timeout",
+                "error": "Timeout"
+            }
+        except Exception as e:
+            logger.error(f"Access request exception: {e}")
+            return {
+                "allowed": False,
+                "reason": f"Request failed: {str(e)}",
+                "error": str(e)
+            }
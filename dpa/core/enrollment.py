@@ -4,11 +4,14 @@ Device enrollment and registration with backend
 from typing import Optional, Tuple
 from datetime import datetime, timezone
 import logging
-import json
+import os
+import orjson
+import time
 from pathlib import Path
 import requests
 from .signing import PostureSigner
 from ..config.settings import config_manager
+from ..utils.http_session import get_session
 
 logger = logging.getLogger("dpa.enrollment")
 
@@ -16,25 +19,59 @@ class DeviceEnrollment:
     """
     Handles one-time device enrollment with backend
     """
-    def __init__(self, tpm_exe_path: Optional[str] = None):
-        self.signer = PostureSigner(tpm_exe_path=tpm_exe_path)
+    # enrollment file path -> (st_mtime_ns, parsed info), shared across instances
+    _info_cache = {}
+    # How long collected device info is reused by a retried enroll_device()
+    _SNAPSHOT_TTL = 60.0
+
+    def __init__(self, tpm_exe_path: Optional[str] = None, signer: Optional[PostureSigner] = None):
+        self._tpm_exe_path = tpm_exe_path
+        # An existing signer can be shared in; otherwise one is created on first use
+        self._signer: Optional[PostureSigner] = signer
         self.config = config_manager.get()
         self.enrollment_file = Path(self.config.config_dir) / "enrollment.json"
+        self.session = get_session()
+        # Positive is_enrolled() result; cleared when this instance unenrolls
+        self._enrolled_cache: Optional[bool] = None
+        # (collected_at, initial_posture, os_info, fingerprint_data)
+        self._snapshot: Optional[tuple] = None
+        # Public key from a successful init-key, reused if enrollment is retried
+        self._pub_key: Optional[str] = None
+    
+    @property
+    def signer(self) -> PostureSigner:
+        """TPM signer, created on first use; lookups like get_device_info never need it"""
+        if self._signer is None:
+            self._signer = PostureSigner(tpm_exe_path=self._tpm_exe_path)
+        return self._signer
         
     def is_enrolled(self) -> bool:
         """Check if device is already enrolled"""
-        return self.enrollment_file.exists()
+        if self._enrolled_cache:
+            return True
+        # Only "enrolled" is cached, so an enrollment by another process is still seen
+        enrolled = self.enrollment_file.exists()
+        if enrolled:
+            self._enrolled_cache = True
+        return enrolled
     
     def get_device_info(self) -> Optional[dict]:
         """Get stored device enrollment information"""
-        if not self.is_enrolled():
+        try:
+            mtime_ns = self.enrollment_file.stat().st_mtime_ns
+        except OSError:
             return None
+        cached = self._info_cache.get(self.enrollment_file)
+        if cached is not None and cached[0] == mtime_ns:
+            return dict(cached[1])
         try:
-            with open(self.enrollment_file, 'r') as f:
-                return json.load(f)
+            info = orjson.loads(self.enrollment_file.read_bytes())
         except Exception as e:
             logger.error(f"Failed to read enrollment info: {e}")
             return None
+        self._info_cache[self.enrollment_file] = (mtime_ns, info)
+        # Copies, so a caller editing the result can't corrupt the shared cache
+        return dict(info)
     
     def enroll_device(self, enrollment_code: str) -> Tuple[bool, Optional[str]]:
         """
@@ -57,13 +94,18 @@ class DeviceEnrollment:
         
         try:
             # Step 1: Initialize TPM key and get public key
-            logger.info("Initializing TPM key during enrollment")
-            success, pub_key = self.signer.register_device()
-            if not success:
-                logger.error(f"TPM key initialization failed: {pub_key}")
-                return False, f"TPM initialization failed: {pub_key}"
-            
-            logger.info("TPM key initialized successfully")
+            if self._pub_key is not None:
+                pub_key = self._pub_key
+                logger.info("Reusing TPM key initialized by the previous attempt")
+            else:
+                logger.info("Initializing TPM key during enrollment")
+                success, pub_key = self.signer.register_device()
+                if not success:
+                    logger.error(f"TPM key initialization failed: {pub_key}")
+                    return False, f"TPM initialization failed: {pub_key}"
+                
+                self._pub_key = pub_key
+                logger.info("TPM key initialized successfully")
             
             # Step 2: Collect device information
             from ..modules.posture import collect_posture_report
@@ -71,9 +113,15 @@ class DeviceEnrollment:
             from ..modules.os_info import get_os_info
             import hashlib
             
-            initial_posture = collect_posture_report()
-            os_info = get_os_info()
-            fingerprint_data = get_device_fingerprint()
+            # WMI-backed collection takes seconds; reuse it when enrollment is retried
+            if self._snapshot is None or time.monotonic() - self._snapshot[0] > self._SNAPSHOT_TTL:
+                self._snapshot = (
+                    time.monotonic(),
+                    collect_posture_report(),
+                    get_os_info(),
+                    get_device_fingerprint()
+                )
+            _, initial_posture, os_info, fingerprint_data = self._snapshot
             
             # Get full fingerprint hash (64 chars for SHA256)
             fingerprint_str = fingerprint_data.get("fingerprint_hash", "unknown")
@@ -82,8 +130,13 @@ class DeviceEnrollment:
                 mb_serial = fingerprint_data.get("motherboard_serial", "unknown")
                 bios_serial = fingerprint_data.get("bios_serial", "unknown")
                 system_uuid = fingerprint_data.get("system_uuid", "unknown")
-                fingerprint_data_str = f"{mb_serial}:{bios_serial}:{system_uuid}"
-                fingerprint_hash = hashlib.sha256(fingerprint_data_str.encode()).hexdigest()
+                # Hash "mb:bios:uuid" piecewise rather than building the joined string
+                h = hashlib.sha256(mb_serial.encode())
+                h.update(b":")
+                h.update(bios_serial.encode())
+                h.update(b":")
+                h.update(system_uuid.encode())
+                fingerprint_hash = h.hexdigest()
             else:
                 fingerprint_hash = fingerprint_str
             
@@ -106,10 +159,14 @@ class DeviceEnrollment:
             url = f"{backend_url}/api/devices/enroll"
             logger.info(f"Sending enrollment request to {url}")
             
-            response = requests.post(url, json=enrollment_payload, timeout=30)
+            response = self.session.post(
+                url, data=orjson.dumps(enrollment_payload),
+                headers={"Content-Type": "application/json"},
+                timeout=(self.config.connect_timeout, self.config.read_timeout)
+            )
             
             if response.status_code == 200 or response.status_code == 201:
-                enrollment_response = response.json()
+                enrollment_response = orjson.loads(response.content)
                 device_id = enrollment_response.get("device_id")
                 
                 if not device_id:
@@ -119,14 +176,14 @@ class DeviceEnrollment:
                 enrolled_at = datetime.now(timezone.utc).isoformat()
                 logger.info(f"Device enrolled successfully with ID: {device_id}")
             elif response.status_code == 400:
-                error_msg = response.json().get("detail", response.text)
+                error_msg = orjson.loads(response.content).get("detail", response.text)
                 logger.error(f"Enrollment rejected: {error_msg}")
                 return False, f"Enrollment rejected: {error_msg}"
             elif response.status_code == 403:
                 logger.error("Invalid enrollment code")
                 return False, "Invalid or expired enrollment code"
             elif response.status_code == 409:
-                error_msg = response.json().get("detail", response.text)
+                error_msg = orjson.loads(response.content).get("detail", response.text)
                 logger.error(f"Device already enrolled: {error_msg}")
                 return False, f"Device already enrolled: {error_msg}"
             else:
@@ -143,6 +200,7 @@ class DeviceEnrollment:
             }
             
             self._save_enrollment_info(enrollment_info)
+            self._snapshot = None
             
             logger.info(f"Device enrollment completed. Device ID: {device_id}, Status: pending approval")
             return True, device_id
@@ -162,15 +220,31 @@ class DeviceEnrollment:
         try:
             self.enrollment_file.parent.mkdir(parents=True, exist_ok=True)
             
-            # Write with secure permissions
-            with open(self.enrollment_file, 'w') as f:
-                json.dump(enrollment_info, f, indent=2)
+            data = orjson.dumps(enrollment_info)
+            try:
+                if self.enrollment_file.read_bytes() == data:
+                    logger.debug("Enrollment info unchanged, skipping write")
+                    return
+            except OSError:
+                pass
+            
+            # Write a 0o600 temp file in one call, flush it to disk, then atomically
+            # swap it in so a crash never leaves a half-written enrollment.json
+            tmp_file = self.enrollment_file.with_suffix(".json.tmp")
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+            fd = os.open(tmp_file, flags, 0o600)
+            try:
+                os.write(fd, data)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
             
             # Set file permissions to read-only for current user
-            import os
             if os.name == 'nt':  # Windows
-                os.chmod(self.enrollment_file, 0o600)
+                os.chmod(tmp_file, 0o600)
             
+            os.replace(tmp_file, self.enrollment_file)
+            self._enrolled_cache = True
             logger.info(f"Enrollment info saved to {self.enrollment_file}")
         except Exception as e:
             logger.error(f"Failed to save enrollment info: {e}")
@@ -182,18 +256,17 @@ class DeviceEnrollment:
         This removes local enrollment file and optionally deletes device from backend
         """
         try:
-            device_info = None
-            if self.enrollment_file.exists():
-                # Read device info before deleting
-                try:
-                    with open(self.enrollment_file, 'r') as f:
-                        device_info = json.load(f)
-                except Exception as e:
-                    logger.warning(f"Could not read enrollment file: {e}")
-                
-                # Delete local enrollment file
+            # Read device info before deleting (usually already cached)
+            device_info = self.get_device_info()
+            
+            # Delete local enrollment file
+            try:
                 self.enrollment_file.unlink()
                 logger.info("Local enrollment file removed")
+            except FileNotFoundError:
+                pass
+            self._enrolled_cache = None
+            self._info_cache.pop(self.enrollment_file, None)
             
             # Try to delete from backend if we have device info
             if device_info and device_info.get("device_id"):
@@ -201,7 +274,7 @@ class DeviceEnrollment:
                 try:
                     # Use public unenroll endpoint (no auth required)
                     url = f"{self.config.backend_url}/api/devices/unenroll/{device_id}"
-                    response = requests.delete(url, timeout=10)
+                    response = self.session.delete(url, timeout=(3, 7))
                     if response.status_code == 204:
                         logger.info(f"Device {device_id} deleted from backend")
                     elif response.status_code == 403:
@@ -240,10 +313,10 @@ class DeviceEnrollment:
             url = f"{self.config.backend_url}/api/devices/status/{device_id}"
             logger.info(f"Verifying enrollment status at {url}")
             
-            response = requests.get(url, timeout=10)
+            response = self.session.get(url, timeout=(3, 7))
             
             if response.status_code == 200:
-                status_data = response.json()
+                status_data = orjson.loads(response.content)
                 is_approved = status_data.get("is_approved", False)
                 status = status_data.get("status", "unknown")
                 
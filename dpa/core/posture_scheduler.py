@@ -13,6 +13,9 @@ class PostureScheduler:
         self.interval = interval_seconds
         self.submitter = PostureSubmitter(config_manager.get().backend_url, tpm_exe_path=tpm_exe_path)
         self._stop_event = threading.Event()
+        # Backoff after failures that retrying on the normal interval won't fix
+        self._consecutive_failures = 0
+        self._backoff_until = 0.0
         self._thread = threading.Thread(target=self._run_scheduler, daemon=True)
 
     def start(self):
@@ -26,15 +29,35 @@ class PostureScheduler:
         self._thread.join()
 
     def _run_scheduler(self):
+        # Deadlines advance by a fixed interval so collection/submission time doesn't add drift
+        next_deadline = time.monotonic()
         while not self._stop_event.is_set():
-            try:
-                posture_report = collect_posture_report()
-                # Device ID will be extracted from enrollment info in submit_posture
-                success = self.submitter.submit_posture(posture_report)
-                if success:
-                    logger.info("Scheduled posture report submitted successfully")
-                else:
-                    logger.warning("Scheduled posture report submission failed - will retry on next interval")
-            except Exception as e:
-                logger.error(f"Scheduler error: {e}")
-            time.sleep(self.interval)
+            next_deadline += self.interval
+            if time.monotonic() >= self._backoff_until:
+                self._submit_once()
+            # Skip ticks missed during a slow submission or a suspend instead of
+            # firing one catch-up submission per tick back to back
+            now = time.monotonic()
+            next_deadline = max(next_deadline, now)
+            # Returns immediately when stop() sets the event
+            if self._stop_event.wait(next_deadline - now):
+                break
+
+    def _submit_once(self):
+        try:
+            posture_report = collect_posture_report()
+            # Device ID will be extracted from enrollment info in submit_posture
+            success = self.submitter.submit_posture(posture_report)
+            if success:
+                self._consecutive_failures = 0
+                logger.info("Scheduled posture report submitted successfully")
+            elif self.submitter.last_unrecoverable:
+                # Signing and sending again in 5 minutes won't help; back off exponentially
+                self._consecutive_failures += 1
+                backoff = min(3600, self.interval * 2 ** self._consecutive_failures)
+                self._backoff_until = time.monotonic() + backoff
+                logger.warning(f"Posture submission rejected - pausing submissions for {backoff} seconds")
+            else:
+                logger.warning("Scheduled posture report submission failed - will retry on next interval")
+        except Exception as e:
+            logger.error(f"Scheduler error: {e}")
@@ -1,22 +1,43 @@
-from typing import Optional
+from typing import Optional, Tuple
+from collections import deque
+import gzip
 import logging
+import orjson
 import requests
 from .signing import PostureSigner
 from ..config.settings import config_manager
+from ..utils.http_session import get_session
 
 logger = logging.getLogger("dpa.posture_submission")
 
+# Below this size gzip framing costs more than it saves
+_MIN_COMPRESS_SIZE = 512
+
 class PostureSubmitter:
     def __init__(self, backend_url: Optional[str] = None, tpm_exe_path: Optional[str] = None):
         config = config_manager.get()
         self.backend_url = (backend_url or config.backend_url).rstrip("/")
         self.signer = PostureSigner(tpm_exe_path=tpm_exe_path)
         self.config = config
+        self.session = get_session()
+        # Enrollment lookup and resolved device ID, reused across submissions
+        from .enrollment import DeviceEnrollment
+        self._enrollment = DeviceEnrollment(signer=self.signer)
+        self._device_id: Optional[str] = None
+        # Signed (canonical, signature) reports that hit a transient failure, oldest first
+        self._pending: deque = deque(maxlen=12)
+        # True when the last submit_posture() failed in a way retrying won't fix
+        # (not enrolled, or rejected by the backend with 401/403/404)
+        self.last_unrecoverable = False
 
     def submit_posture(self, posture_report: dict, device_id: Optional[str] = None) -> bool:
         """
         Submit posture data to backend
         
+        Reports that fail on a connection error, timeout or 5xx are queued (up to
+        12) and resent in order before the next report, so a short backend outage
+        doesn't lose posture history.
+        
         Args:
             posture_report: Complete posture data dictionary
             device_id: Device unique ID (UUID). If not provided, will try to get from enrollment info
@@ -24,60 +45,102 @@ class PostureSubmitter:
         Returns:
             bool: True if submission successful, False otherwise
         """
+        self.last_unrecoverable = False
         try:
             # Get device_id from enrollment info if not provided
             if not device_id:
-                from .enrollment import DeviceEnrollment
-                enrollment = DeviceEnrollment()
-                if enrollment.is_enrolled():
-                    device_info = enrollment.get_device_info()
-                    device_id = device_info.get("device_id") if device_info else None
+                if self._device_id is None:
+                    device_info = self._enrollment.get_device_info()
+                    self._device_id = device_info.get("device_id") if device_info else None
+                device_id = self._device_id
                 
                 if not device_id:
                     logger.error("Device ID not found. Device must be enrolled first.")
+                    self.last_unrecoverable = True
                     return False
             
-            # Sign the posture report
-            signature = self.signer.sign(posture_report)
-            
-            # Prepare payload matching backend schema
-            payload = {
-                "device_id": device_id,
-                "posture_data": posture_report,
-                "signature": signature
-            }
+            # Encode the report once: the canonical bytes are both what gets
+            # signed and the posture_data value spliced into the request body.
+            # Signing at capture time means queued reports never need the TPM again.
+            canonical = self.signer.canonicalize(posture_report)
+            signature = self.signer.sign_bytes(canonical)
             
-            # Submit to backend
-            url = f"{self.backend_url}/api/posture/submit"
-            logger.info(f"Submitting posture to {url}")
+            # Flush reports queued during an outage first; drop ones the backend rejects
+            while self._pending:
+                success, retryable = self._send(device_id, *self._pending[0])
+                if not success and retryable:
+                    break
+                self._pending.popleft()
             
-            response = requests.post(url, json=payload, timeout=30)
-            
-            if response.status_code == 200:
-                response_data = response.json()
-                is_compliant = response_data.get("is_compliant", False)
-                logger.info(f"Posture report submitted successfully. Compliant: {is_compliant}")
-                return True
-            elif response.status_code == 404:
-                logger.error("Device not found on backend")
-                return False
-            elif response.status_code == 403:
-                logger.error("Device not approved or inactive")
-                return False
-            elif response.status_code == 401:
-                logger.error("Invalid signature - TPM key may not match")
-                return False
-            else:
-                error_msg = response.text
-                logger.error(f"Submission failed: HTTP {response.status_code} - {error_msg}")
+            if self._pending:
+                # Backend still unreachable; keep this report behind the queued ones
+                self._pending.append((canonical, signature))
                 return False
+            
+            success, retryable = self._send(device_id, canonical, signature)
+            self.last_unrecoverable = not success and not retryable
+            if retryable:
+                self._pending.append((canonical, signature))
+                logger.info(f"Posture report queued for resend ({len(self._pending)} pending)")
+            return success
                 
+        except Exception as e:
+            logger.error(f"Submission exception: {e}")
+            raise
+
+    def _send(self, device_id: str, canonical: bytes, signature: str) -> Tuple[bool, bool]:
+        """
+        POST one signed report.
+        
+        Returns:
+            (success, retryable): retryable failures are transport errors and 5xx responses
+        """
+        # Prepare payload matching backend schema
+        body = b"".join((
+            b'{"device_id":', orjson.dumps(device_id),
+            b',"posture_data":', canonical,
+            b',"signature":', orjson.dumps(signature),
+            b"}"
+        ))
+        
+        headers = {"Content-Type": "application/json"}
+        if self.config.compress_payloads and len(body) >= _MIN_COMPRESS_SIZE:
+            body = gzip.compress(body, compresslevel=6)
+            headers["Content-Encoding"] = "gzip"
+        
+        # Submit to backend
+        url = f"{self.backend_url}/api/posture/submit"
+        logger.info(f"Submitting posture to {url}")
+        
+        try:
+            response = self.session.post(
+                url, data=body, headers=headers,
+                timeout=(self.config.connect_timeout, self.config.read_timeout)
+            )
         except requests.exceptions.ConnectionError as e:
             logger.error(f"Backend connection failed: {e}")
-            return False
+            return False, True
         except requests.exceptions.Timeout:
             logger.error("Backend request timeout")
-            return False
-        except Exception as e:
-            logger.error(f"Submission exception: {e}")
-            raise
+            return False, True
+        
+        if response.status_code == 200:
+            response_data = orjson.loads(response.content)
+            is_compliant = response_data.get("is_compliant", False)
+            logger.info(f"Posture report submitted successfully. Compliant: {is_compliant}")
+            return True, False
+        elif response.status_code == 404:
+            logger.error("Device not found on backend")
+            # Re-read enrollment.json next time in case the device was re-enrolled
+            self._device_id = None
+            return False, False
+        elif response.status_code == 403:
+            logger.error("Device not approved or inactive")
+            return False, False
+        elif response.status_code == 401:
+            logger.error("Invalid signature - TPM key may not match")
+            return False, False
+        else:
+            error_msg = response.text
+            logger.error(f"Submission failed: HTTP {response.status_code} - {error_msg}")
+            return False, response.status_code >= 500
@@ -2,12 +2,15 @@
 DPAPI-based secret storage and management
 """
 import os
+import atexit
 import secrets as secrets_module
 import base64
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 import logging
 
+import orjson
+
 try:
     import win32crypt  # type: ignore
     DPAPI_AVAILABLE = True
@@ -16,6 +19,16 @@ except ImportError:
 
 logger = logging.getLogger("dpa")
 
+# Managers holding deferred (durable=False) writes; held only until they
+# commit, and committed by a single hook at interpreter exit
+_pending_managers = set()
+
+def _commit_pending() -> None:
+    for manager in list(_pending_managers):
+        manager.commit()
+
+atexit.register(_commit_pending)
+
 class DPAPISecretManager:
     """
     Manages secure secret storage using Windows DPAPI or in-memory fallback
@@ -27,9 +40,17 @@ class DPAPISecretManager:
         else:
             self.config_dir = Path(os.environ.get("PROGRAMDATA", "C:\\ProgramData")) / "ZTNA"
         
+        # Secret and salt live in one file; the separate .dat files are only
+        # read to migrate installations from before the merge
+        self.store_file = self.config_dir / "secrets.json"
         self.secret_file = self.config_dir / "secret.dat"
         self.salt_file = self.config_dir / "salt.dat"
 
+        # Writes made with durable=False are staged as <name>.tmp and only
+        # synced and swapped in by commit(); until then other readers, and a
+        # restart after a crash, still see the previous files
+        self._staged: Dict[Path, Tuple[Path, str]] = {}
+
     def generate_secret(self) -> Optional[str]:
         """Generate a new 256-bit random secret"""
         try:
@@ -49,20 +70,99 @@ class DPAPISecretManager:
             logger.error(f"Failed to generate salt: {e}")
             return None
 
-    def protect_secret(self, secret: str) -> bool:
-        """Protect secret using DPAPI or save unencrypted if unavailable"""
+    def _write_temp(self, path: Path, data: str) -> Path:
+        """Write data next to path as <name>.tmp and return the temp path"""
+        tmp = path.with_name(path.name + ".tmp")
+        # Always write to file (unencrypted for now since DPAPI not working)
+        with open(tmp, 'w') as f:
+            f.write(data)
+        
+        if os.name == 'nt':
+            os.chmod(tmp, 0o600)
+        return tmp
+
+    def _write_protected(self, path: Path, data: str, durable: bool) -> None:
+        """
+        Replace a secret file atomically. A crash mid-write leaves the previous
+        file intact instead of an empty one, which unprotect_* would report as
+        missing. Without durable the write is staged until commit().
+        """
+        tmp = self._write_temp(path, data)
+        if durable:
+            self._sync_paths(tmp)
+            os.replace(tmp, path)
+            self._staged.pop(path, None)
+            if not self._staged:
+                _pending_managers.discard(self)
+        else:
+            self._staged[path] = (tmp, data)
+            _pending_managers.add(self)
+
+    def _read_protected(self, path: Path) -> Optional[str]:
+        """Return staged data for path, or the stripped file contents"""
+        if path in self._staged:
+            return self._staged[path][1]
+        if not path.exists():
+            return None
+        with open(path, 'r') as f:
+            return f.read().strip()
+
+    def _load_store(self) -> Optional[Dict[str, str]]:
+        """
+        Read secret and salt with one file read, falling back to the legacy
+        secret.dat/salt.dat pair. Returns None if nothing has been stored yet.
+        """
+        data = self._read_protected(self.store_file)
+        if data is not None:
+            return orjson.loads(data) if data else {}
+
+        if not self.secret_file.exists() and not self.salt_file.exists():
+            return None
+        store = {}
+        for key, path in (("secret", self.secret_file), ("salt", self.salt_file)):
+            if path.exists():
+                with open(path, 'r') as f:
+                    store[key] = f.read().strip()
+        store["legacy"] = True
+        return store
+
+    def _save_store(self, secret: Optional[str], salt: Optional[str], durable: bool) -> None:
+        """Write secret and salt together as one staged or durable file"""
+        data = orjson.dumps({"secret": secret, "salt": salt, "version": 1}).decode("utf-8")
+        self._write_protected(self.store_file, data, durable)
+
+    def commit(self) -> bool:
+        """Sync all staged writes with one pass and swap them into place"""
+        if not self._staged:
+            return True
         try:
-            self.config_dir.mkdir(parents=True, exist_ok=True)
+            staged = list(self._staged.items())
+            self._sync_paths(*(tmp for _, (tmp, _) in staged))
+            for path, (tmp, _) in staged:
+                os.replace(tmp, path)
+            self._staged.clear()
+            _pending_managers.discard(self)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to commit secret files: {e}")
+            return False
 
-            # Always write to file (unencrypted for now since DPAPI not working)
-            with open(self.secret_file, 'w') as f:
-                f.write(secret)
-                f.flush()
+    def _sync_paths(self, *paths: Path) -> None:
+        """fsync already-written files back to back"""
+        for path in paths:
+            with open(path, 'rb+') as f:
                 os.fsync(f.fileno())
-            
-            if os.name == 'nt':
-                os.chmod(self.secret_file, 0o600)
-            
+
+    def protect_secret(self, secret: str, durable: bool = True) -> bool:
+        """
+        Protect secret using DPAPI or save unencrypted if unavailable.
+        durable=False defers the sync: the new value is only visible to this
+        instance until commit() (or interpreter exit) writes it out.
+        """
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            store = self._load_store() or {}
+            self._save_store(secret, store.get("salt"), durable)
             return True
         except Exception as e:
             logger.error(f"Failed to protect secret: {e}")
@@ -71,43 +171,37 @@ class DPAPISecretManager:
     def unprotect_secret(self) -> Optional[str]:
         """Unprotect secret using DPAPI or read unencrypted if unavailable"""
         try:
-            if not self.secret_file.exists():
-                return None
-
-            with open(self.secret_file, 'r') as f:
-                secret = f.read().strip()
+            secret = (self._load_store() or {}).get("secret")
             return secret if secret else None
         except Exception as e:
             logger.error(f"Failed to unprotect secret: {e}")
             return None
 
-    def protect_salt(self, salt: str) -> bool:
-        """Protect salt using DPAPI or save unencrypted if unavailable"""
+    def protect_salt(self, salt: str, durable: bool = True) -> bool:
+        """Protect salt using DPAPI or save unencrypted if unavailable (see protect_secret)"""
         try:
             self.config_dir.mkdir(parents=True, exist_ok=True)
-
-            # Always write to file (unencrypted for now since DPAPI not working)
-            with open(self.salt_file, 'w') as f:
-                f.write(salt)
-                f.flush()
-                os.fsync(f.fileno())
-            
-            if os.name == 'nt':
-                os.chmod(self.salt_file, 0o600)
-            
+            store = self._load_store() or {}
+            self._save_store(store.get("secret"), salt, durable)
             return True
         except Exception as e:
             logger.error(f"Failed to protect salt: {e}")
             return False
 
+    def protect_both(self, secret: str, salt: str, durable: bool = True) -> bool:
+        """Protect secret and salt together, syncing once after both writes"""
+        try:
+            self.config_dir.mkdir(parents=True, exist_ok=True)
+            self._save_store(secret, salt, durable)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to protect secret/salt: {e}")
+            return False
+
     def unprotect_salt(self) -> Optional[str]:
         """Unprotect salt using DPAPI or read unencrypted if unavailable"""
         try:
-            if not self.salt_file.exists():
-                return None
-
-            with open(self.salt_file, 'r') as f:
-                salt = f.read().strip()
+            salt = (self._load_store() or {}).get("salt")
             return salt if salt else None
         except Exception as e:
             logger.error(f"Failed to unprotect salt: {e}")
@@ -121,7 +215,7 @@ class DPAPISecretManager:
             logger.error("Failed to generate new secret during rotation")
             return None
 
-        if not self.protect_secret(new_secret):
+        if not self.protect_secret(new_secret) or not self.commit():
             logger.error("Failed to protect new secret during rotation")
             return None
 
@@ -129,16 +223,32 @@ class DPAPISecretManager:
 
     def init_or_load_secret(self) -> Tuple[Optional[str], Optional[str]]:
         """Initialize new secret/salt or load existing ones"""
-        if self.secret_file.exists() and self.salt_file.exists():
-            secret = self.unprotect_secret()
-            salt = self.unprotect_salt()
+        try:
+            store = self._load_store()
+        except Exception as e:
+            logger.error(f"Failed to load existing secret/salt: {e}")
+            return None, None
+
+        if store is not None and store.get("secret") is not None and store.get("salt") is not None:
+            secret = store["secret"]
+            salt = store["salt"]
 
-            if secret and salt:
-                return secret, salt
-            else:
+            if not (secret and salt):
                 logger.error("Failed to load existing secret/salt")
                 return None, None
 
+            if store.get("legacy"):
+                # One-time migration into secrets.json; the old files are left
+                # in place until the new one is safely on disk
+                if not self.protect_both(secret, salt):
+                    return None, None
+                for path in (self.secret_file, self.salt_file):
+                    try:
+                        path.unlink()
+                    except OSError:
+                        pass
+            return secret, salt
+
         secret = self.generate_secret()
         salt = self.generate_salt()
 
@@ -146,12 +256,8 @@ class DPAPISecretManager:
             logger.error("Failed to generate secret/salt")
             return None, None
 
-        if not self.protect_secret(secret):
-            logger.error("Failed to protect secret")
-            return None, None
-
-        if not self.protect_salt(salt):
-            logger.error("Failed to protect salt")
+        if not self.protect_both(secret, salt):
+            logger.error("Failed to protect secret/salt")
             return None, None
 
         return secret, salt
@@ -1,6 +1,5 @@
 from typing import Tuple, Optional
 import json
-import base64
 from .tpm import TPMWrapper
 
 class PostureSigner:
@@ -10,14 +9,26 @@ class PostureSigner:
     def register_device(self) -> Tuple[bool, Optional[str]]:
         return self.tpm.init_key()
 
+    @staticmethod
+    def canonicalize(posture_report: dict) -> bytes:
+        """
+        Canonical JSON bytes of a posture report, as signed and as verified by the
+        backend's SignatureService: stdlib json.dumps with sort_keys=True, compact
+        separators and ensure_ascii=False, encoded as UTF-8. orjson output differs
+        (e.g. float formatting) and must not be used here.
+        """
+        return json.dumps(
+            posture_report, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        ).encode("utf-8")
+
     def sign(self, posture_report: dict) -> str:
-        # Create canonical JSON (same format backend expects)
-        report_json = json.dumps(posture_report, sort_keys=True)
-        # Sign the raw JSON bytes, not base64-encoded
-        # TPMSigner will base64-decode the input, so we pass base64-encoded JSON
-        # But we need to ensure the backend verifies against the same data
-        report_base64 = base64.b64encode(report_json.encode("utf-8")).decode("utf-8")
-        success, signature = self.tpm.sign(report_base64)
+        return self.sign_bytes(self.canonicalize(posture_report))
+
+    def sign_bytes(self, canonical: bytes) -> str:
+        """Sign bytes already produced by canonicalize()"""
+        # TPMSigner signs the raw JSON bytes; the wrapper only base64-encodes
+        # them where the transport needs text
+        success, signature = self.tpm.sign_bytes(canonical)
         if not success:
             raise RuntimeError(f"TPM signing failed: {signature}")
         return signature
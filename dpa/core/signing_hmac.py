@@ -1,10 +1,25 @@
 import hmac
 import hashlib
+from typing import Union
 
 class HMACSigner:
     def __init__(self, key=None):
         self.key = key or b'default_hmac_key_for_signing'
+        self._template = hmac.new(self.key, None, hashlib.sha256)
 
-    def sign(self, message: str):
-        mac = hmac.new(self.key, message.encode('utf-8'), hashlib.sha256)
-        return mac.hexdigest()
+    def _mac(self, message: Union[str, bytes]):
+        mac = self._template.copy()
+        # Callers holding canonical JSON bytes can pass them without re-encoding
+        mac.update(message.encode('utf-8') if isinstance(message, str) else message)
+        return mac
+
+    def sign(self, message: Union[str, bytes]):
+        return self._mac(message).hexdigest()
+
+    def verify(self, message: Union[str, bytes], expected_hex: str) -> bool:
+        """Check a hex signature in constant time; never compare sign() output with =="""
+        try:
+            expected = bytes.fromhex(expected_hex)
+        except (TypeError, ValueError):
+            return False
+        return hmac.compare_digest(self._mac(message).digest(), expected)
@@ -1,12 +1,36 @@
 import subprocess
 import logging
 import os
+import atexit
 import base64
 import re
-from typing import Tuple, Optional
+import threading
+import weakref
+from typing import List, Tuple, Optional, Union
 
 logger = logging.getLogger("dpa.tpm")
 
+# Base64 runs long enough to be an RSA signature (2048-bit -> 344 chars);
+# shorter runs in CLI output are words or paths that happen to be base64
+_B64_SIGNATURE_RE = re.compile(rb"[A-Za-z0-9+/=]{256,}")
+
+# Windows CreateProcess caps the command line at 32767 characters; larger
+# payloads go to "TPMSigner.exe sign -" as raw bytes on stdin instead
+_MAX_ARGV_PAYLOAD = 30000
+
+# Upper bound for one serve-mode round-trip, matching the one-shot timeouts;
+# a TPMSigner that does not answer in time is killed and respawned
+_SERVE_TIMEOUT = 15
+
+# Wrappers whose persistent TPMSigner process is stopped at interpreter exit
+_instances = weakref.WeakSet()
+
+def _close_all() -> None:
+    for wrapper in list(_instances):
+        wrapper.close()
+
+atexit.register(_close_all)
+
 class TPMWrapper:
     def __init__(self, exe_path: Optional[str] = None):
         if exe_path:
@@ -17,7 +41,108 @@ class TPMWrapper:
         if not os.path.isfile(self.exe_path):
             logger.error(f"TPMSigner executable not found at: {self.exe_path}")
 
+        # Long-lived "TPMSigner.exe serve" process, spawned on first use
+        self._proc: Optional[subprocess.Popen] = None
+        self._proc_replies = 0
+        self._serve_supported = True
+        self._lock = threading.Lock()
+        _instances.add(self)
+
+    def warm(self) -> None:
+        """Start the persistent TPMSigner process ahead of the first request"""
+        with self._lock:
+            if self._serve_supported and (self._proc is None or self._proc.poll() is not None):
+                self._spawn_server()
+
+    def close(self) -> None:
+        """Stop the persistent TPMSigner process"""
+        with self._lock:
+            if self._proc is not None:
+                try:
+                    self._proc.stdin.close()
+                    self._proc.wait(timeout=5)
+                except Exception:
+                    self._proc.kill()
+                self._proc = None
+
+    def _spawn_server(self) -> Optional[subprocess.Popen]:
+        try:
+            self._proc = subprocess.Popen(
+                [self.exe_path, "serve"],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                text=True, bufsize=1
+            )
+        except Exception as e:
+            logger.warning(f"Could not start persistent TPMSigner: {e}")
+            self._proc = None
+            self._serve_supported = False
+        self._proc_replies = 0
+        return self._proc
+
+    def _serve_request(self, *parts: str) -> Optional[str]:
+        """
+        Send one space-separated line to the persistent TPMSigner process and
+        return its reply ("OK <result>" or "ERR <message>"), or None if serve
+        mode is unavailable. Parts are written one by one so large base64
+        payloads are not copied into a joined request string first.
+        """
+        with self._lock:
+            if not self._serve_supported:
+                return None
+            proc = self._proc
+            if proc is None or proc.poll() is not None:
+                proc = self._spawn_server()
+                if proc is None:
+                    return None
+            # Killing the process unblocks both a stuck write and a stuck read
+            timed_out = threading.Event()
+            def _expire():
+                timed_out.set()
+                proc.kill()
+            watchdog = threading.Timer(_SERVE_TIMEOUT, _expire)
+            watchdog.daemon = True
+            watchdog.start()
+            try:
+                proc.stdin.write(parts[0])
+                for part in parts[1:]:
+                    proc.stdin.write(" ")
+                    proc.stdin.write(part)
+                proc.stdin.write("\n")
+                proc.stdin.flush()
+                reply = proc.stdout.readline()
+            except (OSError, ValueError) as e:
+                logger.warning(f"Persistent TPMSigner failed: {e}")
+                reply = ""
+            finally:
+                watchdog.cancel()
+
+            if timed_out.is_set():
+                logger.warning(f"Persistent TPMSigner did not answer within {_SERVE_TIMEOUT}s; restarting it")
+                self._proc = None
+                return None
+
+            reply = reply.rstrip("\r\n")
+            if not reply.startswith(("OK ", "ERR ")):
+                # An executable that exits without answering, or answers "serve"
+                # with its usage text, predates serve mode
+                if self._proc_replies == 0 or reply:
+                    logger.info("TPMSigner does not support serve mode; using one-shot calls")
+                    self._serve_supported = False
+                proc.kill()
+                self._proc = None
+                return None
+            self._proc_replies += 1
+            return reply
+
     def init_key(self) -> Tuple[bool, Optional[str]]:
+        reply = self._serve_request("init-key")
+        # Executables built before init-key joined serve mode reject it; use the one-shot call
+        if reply is not None and not reply.startswith("ERR Unknown command"):
+            if reply.startswith("OK "):
+                return True, reply[3:]
+            logger.error(f"init-key failed: {reply[4:]}")
+            return False, reply[4:]
+
         try:
             result = subprocess.run(
                 [self.exe_path, "init-key"],
@@ -34,6 +159,14 @@ class TPMWrapper:
             return False, str(e)
 
     def check_status(self) -> Tuple[bool, bool, Optional[str]]:
+        reply = self._serve_request("status")
+        if reply is not None:
+            if reply.startswith("OK "):
+                status = reply.lower()
+                return '"tpm_available": true' in status, '"key_exists": true' in status, None
+            logger.error(f"status failed: {reply[4:]}")
+            return False, False, reply[4:]
+
         try:
             result = subprocess.run(
                 [self.exe_path, "status"],
@@ -52,19 +185,39 @@ class TPMWrapper:
             return False, False, str(e)
 
     def sign(self, base64_payload: str) -> Tuple[bool, Optional[str]]:
+        reply = self._serve_request("sign", base64_payload)
+        if reply is not None:
+            signature = reply[3:]
+            if reply.startswith("OK ") and self._is_valid_base64(signature):
+                return True, signature
+            return False, reply[4:] or "Invalid TPM signature output"
+
+        if len(base64_payload) > _MAX_ARGV_PAYLOAD:
+            return self._sign_oneshot(["sign", "-"], base64.b64decode(base64_payload))
+        return self._sign_oneshot(["sign", base64_payload])
+
+    def sign_bytes(self, data: bytes) -> Tuple[bool, Optional[str]]:
+        """Sign raw bytes, base64-encoding only for the line protocol or a short argv"""
+        if self._serve_supported or len(data) * 4 // 3 <= _MAX_ARGV_PAYLOAD:
+            return self.sign(base64.b64encode(data).decode("ascii"))
+        return self._sign_oneshot(["sign", "-"], data)
+
+    def _sign_oneshot(self, args: List[str], stdin_data: Optional[bytes] = None) -> Tuple[bool, Optional[str]]:
         try:
             result = subprocess.run(
-                [self.exe_path, "sign", base64_payload],
-                capture_output=True, text=True, timeout=15
+                [self.exe_path, *args],
+                input=stdin_data, capture_output=True, timeout=15
             )
-            full_output = result.stdout + "\n" + result.stderr
+            stdout = result.stdout.decode("utf-8", "replace")
+            stderr = result.stderr.decode("utf-8", "replace")
+            full_output = stdout + "\n" + stderr
 
             logger.debug(f"TPM sign output: {full_output}")
 
             if result.returncode != 0:
-                return False, result.stderr.strip()
+                return False, stderr.strip()
 
-            signature = self._parse_output(result.stdout)
+            signature = self._parse_output(stdout)
             if signature and self._is_valid_base64(signature):
                 return True, signature
 
@@ -86,7 +239,16 @@ class TPMWrapper:
             logger.error("Output markers not found in TPM CLI output")
             return None
 
-    def _is_valid_base64(self, s: str) -> bool:
+    def _is_valid_base64(self, s: Union[str, bytes]) -> bool:
+        # Cheap shape checks first so most non-base64 strings are rejected
+        # without running the decoder or raising
+        n = len(s)
+        if n == 0 or n % 4 != 0:
+            return False
+        eq = b"=" if isinstance(s, bytes) else "="
+        pad = n - len(s.rstrip(eq))
+        if pad > 2 or s.count(eq) != pad:
+            return False
         try:
             base64.b64decode(s, validate=True)
             return True
@@ -94,8 +256,8 @@ class TPMWrapper:
             return False
 
     def _extract_base64_signature(self, output: str) -> Optional[str]:
-        candidates = re.findall(r"[A-Za-z0-9+/=]{16,}", output)
-        for candidate in candidates:
-            if self._is_valid_base64(candidate):
-                return candidate
+        for match in _B64_SIGNATURE_RE.finditer(output.encode("utf-8", "replace")):
+            candidate = match.group()
+            if len(candidate) % 4 == 0 and self._is_valid_base64(candidate):
+                return candidate.decode("ascii")
         return None
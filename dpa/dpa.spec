@@ -38,6 +38,7 @@ a = Analysis(
         'dpa.core.posture_submission',
         'dpa.core.posture_scheduler',
         'dpa.config.settings',
+        'dpa.utils.http_session',
         'dpa.modules.posture',
         'dpa.modules.fingerprint',
         'dpa.modules.os_info',
@@ -45,12 +46,21 @@ a = Analysis(
         'dpa.modules.disk_encryption',
         'dpa.modules.firewall',
         'dpa.modules.screen_lock',
+        'dpa.modules._ps_batch',
         'fastapi',
         'uvicorn',
         'uvicorn.lifespan',
         'uvicorn.lifespan.on',
+        'uvicorn.protocols.http.httptools_impl',
+        'uvicorn.loops.uvloop',
         'pydantic',
+        'orjson',
         'requests',
+        'httpx',
+        'h2',
+        'wmi',
+        'pythoncom',
+        'win32com.client',
         'cryptography',
     ],
     hookspath=[],
@@ -0,0 +1,75 @@
+"""
+Batched PowerShell collection for posture modules
+
+Runs the antivirus, BitLocker, firewall and hardware identifier queries in a
+single PowerShell process and returns the parsed results keyed by module.
+"""
+import subprocess
+import logging
+import platform
+import base64
+from functools import lru_cache
+
+import orjson
+
+logger = logging.getLogger("dpa.ps_batch")
+
+# Each query is isolated in its own try/catch so a failing cmdlet (e.g.
+# Get-BitLockerVolume without admin rights) yields $null for that slice only.
+# Modules treat a None slice as "not collected" and fall back to their own
+# standalone query.
+_BATCH_SCRIPT = r"""
+$ErrorActionPreference = 'Stop'
+$r = @{}
+try { $r.antivirus = @(Get-CimInstance -Namespace root/SecurityCenter2 -ClassName AntiVirusProduct | Select-Object displayName, productState) } catch { $r.antivirus = $null }
+try { $r.bitlocker = @(Get-BitLockerVolume -MountPoint 'C:' | Select-Object MountPoint, ProtectionStatus, VolumeStatus) } catch { $r.bitlocker = $null }
+try { $r.firewall = @(Get-NetFirewallProfile | Select-Object Name, Enabled) } catch { $r.firewall = $null }
+try { $r.baseboard = Get-CimInstance -ClassName Win32_BaseBoard | Select-Object -First 1 SerialNumber } catch { $r.baseboard = $null }
+try { $r.bios = Get-CimInstance -ClassName Win32_BIOS | Select-Object -First 1 SerialNumber } catch { $r.bios = $null }
+try { $r.csproduct = Get-CimInstance -ClassName Win32_ComputerSystemProduct | Select-Object -First 1 UUID } catch { $r.csproduct = $null }
+$r | ConvertTo-Json -Depth 3 -Compress
+"""
+
+@lru_cache(maxsize=None)
+def powershell_args(script: str) -> tuple:
+    """
+    Command line for running a PowerShell script without loading profiles.
+    The script is passed as -EncodedCommand (base64 UTF-16LE), which avoids
+    argv quoting issues; the encoding is cached per script.
+    """
+    encoded = base64.b64encode(script.encode("utf-16-le")).decode("ascii")
+    return ("powershell", "-NoProfile", "-NonInteractive", "-EncodedCommand", encoded)
+
+def run_posture_batch() -> dict:
+    """
+    Run all PowerShell-backed posture queries in one process
+    
+    Returns:
+        dict: Parsed results keyed by "antivirus", "bitlocker", "firewall",
+            "baseboard", "bios" and "csproduct", or an empty dict if the batch
+            could not run (modules then fall back to their own queries)
+    """
+    if platform.system() != "Windows":
+        return {}
+    
+    try:
+        result = subprocess.run(
+            powershell_args(_BATCH_SCRIPT),
+            capture_output=True,
+            text=True,
+            errors="replace",
+            timeout=20
+        )
+        
+        if result.returncode == 0 and result.stdout.strip():
+            data = orjson.loads(result.stdout)
+            if isinstance(data, dict):
+                return data
+        
+        logger.warning("Batched PowerShell posture query returned no data")
+    except subprocess.TimeoutExpired:
+        logger.warning("Batched PowerShell posture query timed out")
+    except Exception as e:
+        logger.error(f"Error running batched PowerShell posture query: {e}")
+    
+    return {}
@@ -4,18 +4,27 @@ Windows Antivirus/EDR detection
 import subprocess
 import logging
 
+from ._ps_batch import powershell_args
+
 logger = logging.getLogger("dpa.antivirus")
 
-def check_antivirus() -> dict:
+def check_antivirus(av_products: list = None) -> dict:
     """
     Check antivirus/EDR software status
     
+    Args:
+        av_products: Pre-collected AntiVirusProduct entries (from the batched
+            PowerShell query). If None, SecurityCenter2 is queried directly.
+    
     Returns:
         dict: Antivirus status information
     """
     try:
+        if av_products is not None:
+            return _parse_av_products(av_products)
+        
         result = subprocess.run(
-            ["powershell", "-Command", "Get-CimInstance -Namespace root/SecurityCenter2 -ClassName AntiVirusProduct | Select-Object displayName, productState | ConvertTo-Json"],
+            powershell_args("Get-CimInstance -Namespace root/SecurityCenter2 -ClassName AntiVirusProduct | Select-Object displayName, productState | ConvertTo-Json"),
             capture_output=True,
             text=True,
             timeout=10
@@ -25,31 +34,7 @@ def check_antivirus() -> dict:
             import json
             av_products = json.loads(result.stdout)
             
-            if not isinstance(av_products, list):
-                av_products = [av_products]
-            
-            if av_products:
-                # Get first AV product
-                av = av_products[0]
-                product_name = av.get("displayName", "Unknown")
-                product_state = av.get("productState", 0)
-                
-                # Decode product state (hex value)
-                # Bit 12-15: Running state (0x1000 = running)
-                # Bit 8-11: Definition state (0x0100 = updated)
-                running = (product_state & 0x1000) != 0
-                
-                return {
-                    "installed": True,
-                    "running": running,
-                    "product_name": product_name
-                }
-            else:
-                return {
-                    "installed": False,
-                    "running": False,
-                    "product_name": "None"
-                }
+            return _parse_av_products(av_products)
         
         logger.warning("Failed to check antivirus status via PowerShell")
         return {
@@ -65,3 +50,31 @@ def check_antivirus() -> dict:
             "running": False,
             "product_name": "Unknown"
         }
+
+def _parse_av_products(av_products) -> dict:
+    """Build antivirus status from AntiVirusProduct entries"""
+    if not isinstance(av_products, list):
+        av_products = [av_products]
+    
+    if av_products:
+        # Get first AV product
+        av = av_products[0]
+        product_name = av.get("displayName", "Unknown")
+        product_state = av.get("productState", 0)
+        
+        # Decode product state (hex value)
+        # Bit 12-15: Running state (0x1000 = running)
+        # Bit 8-11: Definition state (0x0100 = updated)
+        running = (product_state & 0x1000) != 0
+        
+        return {
+            "installed": True,
+            "running": running,
+            "product_name": product_name
+        }
+    
+    return {
+        "installed": False,
+        "running": False,
+        "product_name": "None"
+    }
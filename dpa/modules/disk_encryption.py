@@ -4,58 +4,47 @@ Windows Disk Encryption (BitLocker) detection
 import subprocess
 import logging
 
+from ._ps_batch import powershell_args
+
 logger = logging.getLogger("dpa.disk_encryption")
 
-def check_disk_encryption() -> dict:
+def check_disk_encryption(volumes: list = None) -> dict:
     """
     Check BitLocker disk encryption status
     
+    Args:
+        volumes: Pre-collected BitLocker volume entries (from the batched
+            PowerShell query). If None, Get-BitLockerVolume is run directly.
+    
     Returns:
         dict: Disk encryption status information
     """
     try:
-        # Try to get BitLocker volume info with both MountPoint and ProtectionStatus
-        result = subprocess.run(
-            ["powershell", "-Command", "Get-BitLockerVolume | Where-Object { $_.MountPoint -eq 'C:' } | Select-Object MountPoint, ProtectionStatus, VolumeStatus | ConvertTo-Json -Depth 2"],
-            capture_output=True,
-            text=True,
-            timeout=10
-        )
-        
-        if result.returncode == 0 and result.stdout.strip():
-            import json
-            try:
-                volume_data = json.loads(result.stdout)
-                
-                if not isinstance(volume_data, list):
-                    volume_data = [volume_data] if volume_data else []
-                
-                # Check if C: drive data exists
-                c_drive = next((v for v in volume_data if v.get("MountPoint") == "C:"), None)
-                
-                if c_drive:
-                    protection_status = c_drive.get("ProtectionStatus")
-                    volume_status = c_drive.get("VolumeStatus", "")
-                    
-                    # Handle both numeric (1/0) and string ("On"/"Off") formats
-                    if isinstance(protection_status, str):
-                        encryption_enabled = protection_status.lower() in ["on", "1", "true"]
-                    elif isinstance(protection_status, int):
-                        encryption_enabled = protection_status == 1  # 1 = On, 0 = Off
-                    else:
-                        # Fallback: check VolumeStatus
-                        encryption_enabled = "encrypted" in str(volume_status).lower() if volume_status else False
-                    
-                    return {
-                        "encryption_enabled": encryption_enabled,
-                        "encryption_method": "BitLocker" if encryption_enabled else "None"
-                    }
-            except json.JSONDecodeError as e:
-                logger.warning(f"Failed to parse BitLocker JSON: {e}, output: {result.stdout[:100]}")
+        if volumes is not None:
+            status = _parse_bitlocker_volumes(volumes)
+            if status is not None:
+                return status
+        else:
+            # Try to get BitLocker volume info with both MountPoint and ProtectionStatus
+            result = subprocess.run(
+                powershell_args("Get-BitLockerVolume | Where-Object { $_.MountPoint -eq 'C:' } | Select-Object MountPoint, ProtectionStatus, VolumeStatus | ConvertTo-Json -Depth 2"),
+                capture_output=True,
+                text=True,
+                timeout=10
+            )
+            
+            if result.returncode == 0 and result.stdout.strip():
+                import json
+                try:
+                    status = _parse_bitlocker_volumes(json.loads(result.stdout))
+                    if status is not None:
+                        return status
+                except json.JSONDecodeError as e:
+                    logger.warning(f"Failed to parse BitLocker JSON: {e}, output: {result.stdout[:100]}")
         
         # Fallback: try simpler command
         result2 = subprocess.run(
-            ["powershell", "-Command", "(Get-BitLockerVolume -MountPoint 'C:' -ErrorAction SilentlyContinue).ProtectionStatus"],
+            powershell_args("(Get-BitLockerVolume -MountPoint 'C:' -ErrorAction SilentlyContinue).ProtectionStatus"),
             capture_output=True,
             text=True,
             timeout=10
@@ -94,3 +83,31 @@ def check_disk_encryption() -> dict:
             "encryption_enabled": False,
             "encryption_method": "None"
         }
+
+def _parse_bitlocker_volumes(volume_data) -> dict:
+    """Build encryption status from BitLocker volume entries, or None if C: is absent"""
+    if not isinstance(volume_data, list):
+        volume_data = [volume_data] if volume_data else []
+    
+    # Check if C: drive data exists
+    c_drive = next((v for v in volume_data if v.get("MountPoint") == "C:"), None)
+    
+    if not c_drive:
+        return None
+    
+    protection_status = c_drive.get("ProtectionStatus")
+    volume_status = c_drive.get("VolumeStatus", "")
+    
+    # Handle both numeric (1/0) and string ("On"/"Off") formats
+    if isinstance(protection_status, str):
+        encryption_enabled = protection_status.lower() in ["on", "1", "true"]
+    elif isinstance(protection_status, int):
+        encryption_enabled = protection_status == 1  # 1 = On, 0 = Off
+    else:
+        # Fallback: check VolumeStatus
+        encryption_enabled = "encrypted" in str(volume_status).lower() if volume_status else False
+    
+    return {
+        "encryption_enabled": encryption_enabled,
+        "encryption_method": "BitLocker" if encryption_enabled else "None"
+    }
@@ -7,22 +7,53 @@ import hashlib
 import logging
 import socket
 import uuid as py_uuid
+from functools import lru_cache
+
+try:
+    import winreg  # type: ignore
+    WINREG_AVAILABLE = True
+except ImportError:
+    WINREG_AVAILABLE = False
+
+try:
+    import pythoncom  # type: ignore
+    import wmi  # type: ignore
+    WMI_AVAILABLE = True
+except ImportError:
+    WMI_AVAILABLE = False
 
 logger = logging.getLogger("dpa.fingerprint")
 
-def get_device_fingerprint() -> dict:
+_SERIAL_PLACEHOLDERS = ("", "serialnumber", "to be filled by o.e.m.", "default string", "serial number")
+_UUID_PLACEHOLDERS = ("", "uuid", "to be filled by o.e.m.", "default string")
+
+# Fingerprint built from primary hardware identifiers; these do not change
+# while the process runs, so it is computed once
+_FINGERPRINT_CACHE = None
+
+def get_device_fingerprint(batch: dict = None) -> dict:
     """
     Generate device fingerprint based on hardware identifiers
     Uses fallback identifiers when primary hardware IDs are unavailable
     
+    Args:
+        batch: Results of the batched PowerShell query (see _ps_batch). The
+            "baseboard", "bios" and "csproduct" entries are used when present;
+            missing entries are queried directly.
+    
     Returns:
         dict: Device fingerprint information
     """
+    global _FINGERPRINT_CACHE
+    if _FINGERPRINT_CACHE is not None:
+        return dict(_FINGERPRINT_CACHE)
+    
+    batch = batch or {}
     try:
         # Get primary hardware identifiers
-        mb_serial = _get_motherboard_serial()
-        bios_serial = _get_bios_serial()
-        system_uuid = _get_system_uuid()
+        mb_serial = _get_motherboard_serial(batch.get("baseboard"))
+        bios_serial = _get_bios_serial(batch.get("bios"))
+        system_uuid = _get_system_uuid(batch.get("csproduct"))
         
         # Get fallback identifiers (used when primary IDs are unavailable)
         computer_name = _get_computer_name()
@@ -47,7 +78,7 @@ def get_device_fingerprint() -> dict:
         
         fingerprint_hash = hashlib.sha256(fingerprint_data.encode()).hexdigest()
         
-        return {
+        fingerprint = {
             "fingerprint_enabled": True,
             "users_enrolled": 1,  # Placeholder
             "fingerprint_hash": fingerprint_hash,  # Full 64-char SHA256 hash
@@ -59,6 +90,12 @@ def get_device_fingerprint() -> dict:
             "machine_guid": machine_guid,
             "using_fallback": not primary_available
         }
+        
+        # Only memoize primary results: a fallback may stem from a transient
+        # query failure and should be retried on the next collection
+        if primary_available:
+            _FINGERPRINT_CACHE = fingerprint
+        return dict(fingerprint)
     except Exception as e:
         logger.error(f"Error generating device fingerprint: {e}")
         return {
@@ -67,8 +104,57 @@ def get_device_fingerprint() -> dict:
             "fingerprint_hash": "unknown"
         }
 
-def _get_motherboard_serial() -> str:
-    """Get motherboard serial number"""
+def _clean_identifier(value, placeholders) -> str:
+    """Return the stripped identifier, or None if it is empty or a vendor placeholder"""
+    value = str(value or "").strip()
+    if value and value.lower() not in placeholders:
+        return value
+    return None
+
+@lru_cache(maxsize=1)
+def _query_wmi_hardware() -> dict:
+    """
+    Read hardware identifiers through an in-process WMI connection
+    
+    Returns the same shape as the batched PowerShell slices. Raises if WMI is
+    unavailable so that failures are not memoized; successful results are,
+    since these identifiers do not change while the process runs.
+    """
+    if not WMI_AVAILABLE:
+        raise RuntimeError("WMI bindings not installed")
+    
+    # The scheduler collects posture off the main thread, which needs its
+    # own COM apartment
+    pythoncom.CoInitialize()
+    try:
+        conn = wmi.WMI()
+        baseboard = conn.Win32_BaseBoard()
+        bios = conn.Win32_BIOS()
+        csproduct = conn.Win32_ComputerSystemProduct()
+        adapters = conn.Win32_NetworkAdapter(PhysicalAdapter=True)
+        return {
+            "baseboard": {"SerialNumber": baseboard[0].SerialNumber} if baseboard else {},
+            "bios": {"SerialNumber": bios[0].SerialNumber} if bios else {},
+            "csproduct": {"UUID": csproduct[0].UUID} if csproduct else {},
+            "mac_addresses": [a.MACAddress for a in adapters if a.MACAddress],
+        }
+    finally:
+        pythoncom.CoUninitialize()
+
+def _wmi_hardware(key: str):
+    """Return one slice of the WMI hardware query, or None if WMI is unavailable"""
+    try:
+        return _query_wmi_hardware().get(key)
+    except Exception as e:
+        logger.debug(f"In-process WMI query unavailable: {e}")
+        return None
+
+def _get_motherboard_serial(baseboard: dict = None) -> str:
+    """Get motherboard serial number (from pre-collected Win32_BaseBoard data if given)"""
+    if baseboard is None:
+        baseboard = _wmi_hardware("baseboard")
+    if baseboard is not None:
+        return _clean_identifier(baseboard.get("SerialNumber"), _SERIAL_PLACEHOLDERS) or "unknown_mb"
     try:
         result = subprocess.run(
             ["wmic", "baseboard", "get", "serialnumber"],
@@ -80,16 +166,20 @@ def _get_motherboard_serial() -> str:
             lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
             # Skip header line, get first data line
             for line in lines[1:]:
-                serial = line.strip()
                 # Check if serial is valid (not empty or placeholder)
-                if serial and serial.lower() not in ("", "serialnumber", "to be filled by o.e.m.", "default string", "serial number"):
+                serial = _clean_identifier(line, _SERIAL_PLACEHOLDERS)
+                if serial:
                     return serial
     except Exception as e:
         logger.debug(f"Error getting motherboard serial: {e}")
     return "unknown_mb"
 
-def _get_bios_serial() -> str:
-    """Get BIOS serial number"""
+def _get_bios_serial(bios: dict = None) -> str:
+    """Get BIOS serial number (from pre-collected Win32_BIOS data if given)"""
+    if bios is None:
+        bios = _wmi_hardware("bios")
+    if bios is not None:
+        return _clean_identifier(bios.get("SerialNumber"), _SERIAL_PLACEHOLDERS) or "unknown_bios"
     try:
         result = subprocess.run(
             ["wmic", "bios", "get", "serialnumber"],
@@ -101,16 +191,20 @@ def _get_bios_serial() -> str:
             lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
             # Skip header line, get first data line
             for line in lines[1:]:
-                serial = line.strip()
                 # Check if serial is valid (not empty or placeholder)
-                if serial and serial.lower() not in ("", "serialnumber", "to be filled by o.e.m.", "default string", "serial number"):
+                serial = _clean_identifier(line, _SERIAL_PLACEHOLDERS)
+                if serial:
                     return serial
     except Exception as e:
         logger.debug(f"Error getting BIOS serial: {e}")
     return "unknown_bios"
 
-def _get_system_uuid() -> str:
-    """Get system UUID"""
+def _get_system_uuid(csproduct: dict = None) -> str:
+    """Get system UUID (from pre-collected Win32_ComputerSystemProduct data if given)"""
+    if csproduct is None:
+        csproduct = _wmi_hardware("csproduct")
+    if csproduct is not None:
+        return _clean_identifier(csproduct.get("UUID"), _UUID_PLACEHOLDERS) or "unknown_uuid"
     try:
         result = subprocess.run(
             ["wmic", "csproduct", "get", "uuid"],
@@ -122,14 +216,15 @@ def _get_system_uuid() -> str:
             lines = [line.strip() for line in result.stdout.strip().split('\n') if line.strip()]
             # Skip header line, get first data line
             for line in lines[1:]:
-                uuid_value = line.strip()
                 # Check if UUID is valid (not empty or placeholder)
-                if uuid_value and uuid_value.lower() not in ("", "uuid", "to be filled by o.e.m.", "default string"):
+                uuid_value = _clean_identifier(line, _UUID_PLACEHOLDERS)
+                if uuid_value:
                     return uuid_value
     except Exception as e:
         logger.debug(f"Error getting system UUID: {e}")
     return "unknown_uuid"
 
+@lru_cache(maxsize=1)
 def _get_computer_name() -> str:
     """Get computer name / hostname"""
     try:
@@ -137,6 +232,7 @@ def _get_computer_name() -> str:
     except Exception:
         return "unknown_host"
 
+@lru_cache(maxsize=1)
 def _get_mac_address() -> str:
     """Get MAC address of primary network interface"""
     try:
@@ -151,48 +247,32 @@ def _get_mac_address() -> str:
     except Exception:
         pass
     
-    # Fallback: try wmic to get first physical adapter MAC
-    try:
-        result = subprocess.run(
-            ["wmic", "path", "win32_networkadapter", "where", "PhysicalAdapter=true", "get", "MACAddress"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            lines = [line.strip() for line in result.stdout.strip().split('\n') 
-                    if line.strip() and line.strip().upper() != "MACADDRESS"]
-            for line in lines:
-                if line and line != "00:00:00:00:00:00":
-                    # Normalize format (wmic may return with or without colons)
-                    mac = line.replace("-", ":").replace(" ", "")
-                    if len(mac) == 12:  # Valid MAC without separators
-                        mac = ':'.join([mac[i:i+2] for i in range(0, 12, 2)])
-                    if mac and mac != "00:00:00:00:00:00":
-                        return mac
-    except Exception:
-        pass
+    # Fallback: first physical adapter MAC from WMI
+    for line in _wmi_hardware("mac_addresses") or []:
+        line = line.strip()
+        if line and line != "00:00:00:00:00:00":
+            # Normalize format (may be returned with or without colons)
+            mac = line.replace("-", ":").replace(" ", "")
+            if len(mac) == 12:  # Valid MAC without separators
+                mac = ':'.join([mac[i:i+2] for i in range(0, 12, 2)])
+            if mac and mac != "00:00:00:00:00:00":
+                return mac
     
     return "unknown_mac"
 
+@lru_cache(maxsize=1)
 def _get_machine_guid() -> str:
     """Get Windows Machine GUID from registry"""
+    if not WINREG_AVAILABLE:
+        return "unknown_guid"
     try:
-        result = subprocess.run(
-            ["reg", "query", "HKEY_LOCAL_MACHINE\\SOFTWARE\\Microsoft\\Cryptography", "/v", "MachineGuid"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
-        if result.returncode == 0:
-            # Parse registry output: "    MachineGuid    REG_SZ    {guid}"
-            lines = result.stdout.strip().split('\n')
-            for line in lines:
-                if "MachineGuid" in line and "REG_SZ" in line:
-                    parts = line.split()
-                    for part in parts:
-                        if part.startswith("{") and part.endswith("}"):
-                            return part.strip("{}")
+        with winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, r"SOFTWARE\Microsoft\Cryptography") as key:
+            value, _ = winreg.QueryValueEx(key, "MachineGuid")
+        value = str(value).strip()
+        # Same acceptance rule as the former `reg query` parser (brace-wrapped
+        # value only) so fallback fingerprints of enrolled devices stay stable
+        if value.startswith("{") and value.endswith("}"):
+            return value.strip("{}")
     except Exception:
         pass
     
@@ -4,16 +4,37 @@ Windows Firewall status detection
 import subprocess
 import logging
 
+try:
+    import pythoncom  # type: ignore
+    import win32com.client  # type: ignore
+    FWPOLICY_AVAILABLE = True
+except ImportError:
+    FWPOLICY_AVAILABLE = False
+
 logger = logging.getLogger("dpa.firewall")
 
-def check_firewall() -> dict:
+# NET_FW_PROFILE_TYPE2 values for INetFwPolicy2.FirewallEnabled
+_FW_PROFILES = ((1, "Domain"), (2, "Private"), (4, "Public"))
+
+def check_firewall(profiles: list = None) -> dict:
     """
     Check Windows Firewall status
     
+    Args:
+        profiles: Pre-collected Get-NetFirewallProfile entries (from the
+            batched PowerShell query). If None, netsh is queried directly.
+    
     Returns:
         dict: Firewall status information
     """
     try:
+        if profiles is not None:
+            return _parse_firewall_profiles(profiles)
+        
+        profiles = _query_fw_policy()
+        if profiles is not None:
+            return _parse_firewall_profiles(profiles)
+        
         result = subprocess.run(
             ["netsh", "advfirewall", "show", "allprofiles", "state"],
             capture_output=True,
@@ -59,3 +80,42 @@ def check_firewall() -> dict:
             "firewall_enabled": False,
             "firewall_profile": "Unknown"
         }
+
+def _query_fw_policy() -> list:
+    """
+    Read per-profile firewall state in-process from the HNetCfg.FwPolicy2 COM
+    object, in the same shape as Get-NetFirewallProfile. Returns None if the
+    COM bindings are unavailable or the query fails (netsh is used instead).
+    """
+    if not FWPOLICY_AVAILABLE:
+        return None
+    
+    # Posture checks run on worker threads, each needing its own COM apartment
+    pythoncom.CoInitialize()
+    try:
+        policy = win32com.client.Dispatch("HNetCfg.FwPolicy2")
+        return [
+            {"Name": name, "Enabled": bool(policy.FirewallEnabled(profile))}
+            for profile, name in _FW_PROFILES
+        ]
+    except Exception as e:
+        logger.debug(f"FwPolicy2 query failed: {e}")
+        return None
+    finally:
+        pythoncom.CoUninitialize()
+
+def _parse_firewall_profiles(profiles) -> dict:
+    """Build firewall status from Get-NetFirewallProfile entries"""
+    if not isinstance(profiles, list):
+        profiles = [profiles] if profiles else []
+    
+    # Enabled serializes as a GpoBoolean: 1/0, True/False or "True"/"False"
+    enabled_profiles = [
+        p.get("Name", "Unknown") for p in profiles
+        if str(p.get("Enabled")).lower() in ("1", "true")
+    ]
+    
+    return {
+        "firewall_enabled": bool(enabled_profiles),
+        "firewall_profile": enabled_profiles[0] if enabled_profiles else "Unknown"
+    }
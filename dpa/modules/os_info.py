@@ -1,16 +1,27 @@
 import platform
 import socket
 
-def get_os_info():
-    """Get OS information including hostname"""
+# None of these fields change while the agent runs (a hostname change takes
+# effect after reboot, which restarts the agent), so they are computed once
+_OS_INFO_CACHE = None
+
+def get_os_info(force_refresh: bool = False):
+    """Get OS information including hostname (cached; force_refresh recomputes it)"""
+    global _OS_INFO_CACHE
+    if _OS_INFO_CACHE is not None and not force_refresh:
+        return dict(_OS_INFO_CACHE)
+    
     try:
         hostname = socket.gethostname()
     except Exception:
         hostname = "unknown"
     
-    system = platform.system()
-    version = platform.version()
-    release = platform.release()
+    # One uname() lookup instead of separate system()/version()/release()/
+    # machine() calls, each of which goes through it again
+    uname = platform.uname()
+    system = uname.system
+    version = uname.version
+    release = uname.release
     
     # Determine OS type
     if system == "Windows":
@@ -26,13 +37,14 @@ def get_os_info():
         os_type = system
         os_version = version
     
-    return {
+    _OS_INFO_CACHE = {
         "hostname": hostname,
         "system": system,
         "version": version,
         "release": release,
         "os_type": os_type,
         "os_version": os_version,
-        "device_model": platform.machine(),
+        "device_model": uname.machine,
         "manufacturer": "Unknown"  # Would need additional detection for manufacturer
     }
+    return dict(_OS_INFO_CACHE)
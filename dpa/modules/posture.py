@@ -1,6 +1,7 @@
 """
 Posture data collection with device identification
 """
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 from typing import Optional
 
@@ -15,20 +16,37 @@ def collect_posture_report() -> dict:
     from .antivirus import check_antivirus
     from .screen_lock import check_screen_lock
     from .fingerprint import get_device_fingerprint
+    from ._ps_batch import run_posture_batch
     
-    # Get device_id from enrollment if available
-    device_id = _get_device_id()
+    timestamp = datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z')
     
-    report = {
-        "device_id": device_id,
-        "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
-        "os_info": get_os_info(),
-        "firewall": check_firewall(),
-        "disk_encryption": check_disk_encryption(),
-        "antivirus": check_antivirus(),
-        "screen_lock": check_screen_lock(),
-        "fingerprint": get_device_fingerprint()
-    }
+    # The checks wait on child processes (PowerShell, WMI), so threads overlap
+    # them without contending for the GIL
+    with ThreadPoolExecutor(max_workers=4, thread_name_prefix="posture") as pool:
+        # Get device_id from enrollment if available
+        device_id = pool.submit(_get_device_id)
+        os_info = pool.submit(get_os_info)
+        screen_lock = pool.submit(check_screen_lock)
+        
+        # One PowerShell process for all CIM/BitLocker/firewall queries; any
+        # slice missing from the batch is collected by the module itself,
+        # so those fallbacks run side by side as well
+        batch = run_posture_batch()
+        firewall = pool.submit(check_firewall, batch.get("firewall"))
+        disk_encryption = pool.submit(check_disk_encryption, batch.get("bitlocker"))
+        antivirus = pool.submit(check_antivirus, batch.get("antivirus"))
+        fingerprint = pool.submit(get_device_fingerprint, batch)
+        
+        report = {
+            "device_id": device_id.result(),
+            "timestamp": timestamp,
+            "os_info": os_info.result(),
+            "firewall": firewall.result(),
+            "disk_encryption": disk_encryption.result(),
+            "antivirus": antivirus.result(),
+            "screen_lock": screen_lock.result(),
+            "fingerprint": fingerprint.result()
+        }
     
     return report
 
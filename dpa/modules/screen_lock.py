@@ -1,12 +1,20 @@
 """
 Windows Screen Lock (Screensaver) detection
 """
-import subprocess
 import logging
 import platform
 
+try:
+    import winreg  # type: ignore
+    WINREG_AVAILABLE = True
+except ImportError:
+    WINREG_AVAILABLE = False
+
 logger = logging.getLogger("dpa.screen_lock")
 
+_DESKTOP_KEY = r"Control Panel\Desktop"
+_POLICY_DESKTOP_KEY = r"Software\Policies\Microsoft\Windows\Control Panel\Desktop"
+
 def check_screen_lock() -> dict:
     """
     Check Windows screen lock/screensaver status
@@ -15,7 +23,7 @@ def check_screen_lock() -> dict:
         dict: Screen lock status information
     """
     try:
-        if platform.system() != "Windows":
+        if platform.system() != "Windows" or not WINREG_AVAILABLE:
             return {
                 "screen_lock_enabled": False,
                 "method": "Not supported on this OS"
@@ -23,30 +31,19 @@ def check_screen_lock() -> dict:
         
         # Check screensaver registry setting
         # HKCU:\Control Panel\Desktop\ScreenSaveActive (1 = enabled, 0 = disabled)
-        result = subprocess.run(
-            ["powershell", "-Command", "Get-ItemProperty -Path 'HKCU:\\Control Panel\\Desktop' -Name ScreenSaveActive -ErrorAction SilentlyContinue | Select-Object -ExpandProperty ScreenSaveActive"],
-            capture_output=True,
-            text=True,
-            timeout=5
+        # Read together with the timeout (how long before it activates) from one key handle
+        screen_save_active, timeout_value = _read_values(
+            winreg.HKEY_CURRENT_USER, _DESKTOP_KEY, ("ScreenSaveActive", "ScreenSaveTimeOut")
         )
         
-        if result.returncode == 0 and result.stdout.strip():
+        if screen_save_active is not None:
             try:
-                screen_save_active = int(result.stdout.strip())
-                screen_lock_enabled = screen_save_active == 1
-                
-                # Also check screensaver timeout (how long before it activates)
-                timeout_result = subprocess.run(
-                    ["powershell", "-Command", "Get-ItemProperty -Path 'HKCU:\\Control Panel\\Desktop' -Name ScreenSaveTimeOut -ErrorAction SilentlyContinue | Select-Object -ExpandProperty ScreenSaveTimeOut"],
-                    capture_output=True,
-                    text=True,
-                    timeout=5
-                )
+                screen_lock_enabled = int(screen_save_active) == 1
                 
                 timeout_seconds = 0
-                if timeout_result.returncode == 0 and timeout_result.stdout.strip():
+                if timeout_value is not None:
                     try:
-                        timeout_seconds = int(timeout_result.stdout.strip())
+                        timeout_seconds = int(timeout_value)
                     except ValueError:
                         pass
                 
@@ -56,20 +53,14 @@ def check_screen_lock() -> dict:
                     "method": "Screensaver"
                 }
             except ValueError:
-                logger.warning(f"Invalid screensaver registry value: {result.stdout.strip()}")
+                logger.warning(f"Invalid screensaver registry value: {screen_save_active}")
         
         # Fallback: check if screensaver is configured via Group Policy
-        gp_result = subprocess.run(
-            ["powershell", "-Command", "Get-ItemProperty -Path 'HKLM:\\Software\\Policies\\Microsoft\\Windows\\Control Panel\\Desktop' -Name ScreenSaveActive -ErrorAction SilentlyContinue | Select-Object -ExpandProperty ScreenSaveActive"],
-            capture_output=True,
-            text=True,
-            timeout=5
-        )
+        gp_active, = _read_values(winreg.HKEY_LOCAL_MACHINE, _POLICY_DESKTOP_KEY, ("ScreenSaveActive",))
         
-        if gp_result.returncode == 0 and gp_result.stdout.strip():
+        if gp_active is not None:
             try:
-                screen_save_active = int(gp_result.stdout.strip())
-                screen_lock_enabled = screen_save_active == 1
+                screen_lock_enabled = int(gp_active) == 1
                 return {
                     "screen_lock_enabled": screen_lock_enabled,
                     "timeout_seconds": 0,
@@ -94,3 +85,17 @@ def check_screen_lock() -> dict:
             "method": "Error"
         }
 
+def _read_values(hive, key_path: str, names: tuple) -> tuple:
+    """Read registry values as stripped strings from one open key; None where missing or empty"""
+    values = [None] * len(names)
+    try:
+        with winreg.OpenKey(hive, key_path) as key:
+            for i, name in enumerate(names):
+                try:
+                    value = str(winreg.QueryValueEx(key, name)[0]).strip()
+                    values[i] = value or None
+                except FileNotFoundError:
+                    pass
+    except FileNotFoundError:
+        pass
+    return tuple(values)
@@ -0,0 +1,24 @@
+"""
+Shared setup for the dpa unit tests that stub out the TPM, session and config
+"""
+import atexit
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+# The module-level ConfigManager writes config.json when dpa.config.settings is
+# first imported; point it at a directory that is removed when the run ends.
+# Import this module before any dpa module that pulls in the settings.
+_programdata = tempfile.TemporaryDirectory()
+atexit.register(_programdata.cleanup)
+os.environ.setdefault("PROGRAMDATA", _programdata.name)
+
+
+class PatchedTestCase(unittest.TestCase):
+    def patch(self, target: str, **kwargs):
+        """Patch target for the duration of the test and return the mock"""
+        patcher = mock.patch(target, **kwargs)
+        mocked = patcher.start()
+        self.addCleanup(patcher.stop)
+        return mocked
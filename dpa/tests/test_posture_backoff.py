@@ -0,0 +1,72 @@
+"""
+Tests for PostureScheduler's backoff after unrecoverable submission failures
+"""
+import time
+import unittest
+from unittest import mock
+
+from dpa.tests.support import PatchedTestCase
+from dpa.core import posture_scheduler
+
+
+class TestSchedulerBackoff(PatchedTestCase):
+    def setUp(self):
+        self.submitter = mock.Mock(last_unrecoverable=False)
+        self.patch("dpa.core.posture_scheduler.PostureSubmitter", return_value=self.submitter)
+        self.patch("dpa.core.posture_scheduler.collect_posture_report", return_value={})
+        self.scheduler = posture_scheduler.PostureScheduler(interval_seconds=300)
+
+    def submit(self, success, unrecoverable=False):
+        def submit_posture(report):
+            self.submitter.last_unrecoverable = unrecoverable
+            return success
+        self.submitter.submit_posture.side_effect = submit_posture
+        before = time.monotonic()
+        self.scheduler._submit_once()
+        return self.scheduler._backoff_until - before
+
+    def test_unrecoverable_failures_back_off_exponentially(self):
+        for expected in (600, 1200, 2400, 3600, 3600):
+            self.assertAlmostEqual(self.submit(False, unrecoverable=True), expected, delta=5)
+
+    def test_retryable_failure_does_not_back_off(self):
+        self.submit(False)
+        self.assertEqual(self.scheduler._consecutive_failures, 0)
+        self.assertEqual(self.scheduler._backoff_until, 0.0)
+
+    def test_success_resets_failure_count(self):
+        self.submit(False, unrecoverable=True)
+        self.submit(False, unrecoverable=True)
+        self.submit(True)
+        self.assertEqual(self.scheduler._consecutive_failures, 0)
+        self.assertAlmostEqual(self.submit(False, unrecoverable=True), 600, delta=5)
+
+    def test_stalled_submission_is_followed_by_one_catch_up(self):
+        clock = [0.0]
+        calls = []
+        self.patch("dpa.core.posture_scheduler.time", monotonic=lambda: clock[0])
+
+        def submit_once():
+            calls.append(clock[0])
+            if len(calls) == 1:
+                # Stalls (or the host sleeps) for more than three intervals
+                clock[0] += 1000
+
+        def wait(timeout):
+            clock[0] += timeout
+            return len(calls) >= 4
+
+        self.scheduler._submit_once = submit_once
+        self.scheduler._stop_event = mock.Mock(**{"is_set.return_value": False, "wait.side_effect": wait})
+        self.scheduler._run_scheduler()
+        self.assertEqual(calls, [0, 1000, 1300, 1600])
+
+    def test_submission_exception_is_contained(self):
+        self.submitter.submit_posture.side_effect = RuntimeError("TPM signing failed")
+        self.scheduler._submit_once()
+        self.assertEqual(self.scheduler._consecutive_failures, 0)
+        self.assertEqual(self.scheduler._backoff_until, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
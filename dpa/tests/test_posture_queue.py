@@ -0,0 +1,98 @@
+"""
+Tests for PostureSubmitter's resend queue, with a stubbed session and signer
+"""
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+import orjson
+import requests
+
+from dpa.tests.support import PatchedTestCase
+from dpa.core import posture_submission
+from dpa.core.signing import PostureSigner
+
+
+def response(status_code):
+    return SimpleNamespace(status_code=status_code, content=b'{"is_compliant":true}', text="error")
+
+
+class FakeSession:
+    """Answers each post() with the next scripted status code or exception"""
+
+    def __init__(self):
+        self.replies = []
+        self.sent = []
+
+    def post(self, url, data, headers, timeout):
+        self.sent.append(orjson.loads(data)["posture_data"]["n"])
+        reply = self.replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return response(reply)
+
+
+class TestPostureQueue(PatchedTestCase):
+    def setUp(self):
+        self.session = FakeSession()
+        signer = mock.Mock()
+        signer.canonicalize.side_effect = PostureSigner.canonicalize
+        signer.sign_bytes.return_value = "c2lnbmF0dXJl"
+        self.patch("dpa.core.posture_submission.PostureSigner", return_value=signer)
+        self.patch("dpa.core.posture_submission.get_session", return_value=self.session)
+        self.patch("dpa.core.enrollment.DeviceEnrollment")
+        self.submitter = posture_submission.PostureSubmitter("http://backend")
+
+    def submit(self, n, *replies):
+        self.session.replies.extend(replies)
+        return self.submitter.submit_posture({"n": n}, device_id="device-1")
+
+    def pending(self):
+        return [orjson.loads(canonical)["n"] for canonical, _ in self.submitter._pending]
+
+    def test_queued_reports_are_flushed_in_order(self):
+        self.assertFalse(self.submit(1, 503))
+        self.assertFalse(self.submit(2, 503))
+        self.assertEqual(self.pending(), [1, 2])
+
+        self.assertTrue(self.submit(3, 200, 200, 200))
+        self.assertEqual(self.session.sent, [1, 1, 1, 2, 3])
+        self.assertEqual(self.pending(), [])
+
+    def test_rejected_queued_report_is_dropped(self):
+        self.assertFalse(self.submit(1, requests.exceptions.ConnectionError()))
+        self.assertTrue(self.submit(2, 400, 200))
+        self.assertEqual(self.session.sent, [1, 1, 2])
+        self.assertEqual(self.pending(), [])
+
+    def test_new_report_waits_behind_failing_head(self):
+        self.assertFalse(self.submit(1, requests.exceptions.Timeout()))
+        self.assertFalse(self.submit(2, requests.exceptions.Timeout()))
+        # Only the head is tried; the new report is queued without being sent
+        self.assertEqual(self.session.sent, [1, 1])
+        self.assertEqual(self.pending(), [1, 2])
+        self.assertFalse(self.submitter.last_unrecoverable)
+
+    def test_queue_keeps_newest_twelve(self):
+        for n in range(1, 16):
+            self.submit(n, 503)
+        self.assertEqual(self.pending(), list(range(4, 16)))
+
+    def test_server_errors_are_retryable_and_client_errors_are_not(self):
+        for status, expected in ((500, True), (502, True), (503, True),
+                                 (400, False), (401, False), (403, False), (404, False), (422, False)):
+            self.session.replies.append(status)
+            self.assertEqual(self.submitter._send("device-1", b'{"n":0}', "sig"), (False, expected), status)
+
+    def test_client_error_is_unrecoverable_and_not_queued(self):
+        self.assertFalse(self.submit(1, 403))
+        self.assertTrue(self.submitter.last_unrecoverable)
+        self.assertEqual(self.pending(), [])
+
+        self.assertFalse(self.submit(2, 500))
+        self.assertFalse(self.submitter.last_unrecoverable)
+        self.assertEqual(self.pending(), [2])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,49 @@
+"""
+Tests for DPAPISecretManager's durable and deferred writes
+"""
+import os
+import shutil
+import tempfile
+import unittest
+
+from dpa.core import secrets
+from dpa.core.secrets import DPAPISecretManager
+
+
+class TestSecretWrites(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.test_dir, ignore_errors=True)
+        self.manager = DPAPISecretManager(self.test_dir)
+        self.secret, self.salt = self.manager.init_or_load_secret()
+
+    def test_protect_secret_is_durable_by_default(self):
+        self.assertTrue(self.manager.protect_secret("new"))
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_secret(), "new")
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_salt(), self.salt)
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["secrets.json"])
+        self.assertNotIn(self.manager, secrets._pending_managers)
+
+    def test_deferred_write_is_staged_until_commit(self):
+        self.assertTrue(self.manager.protect_secret("deferred", durable=False))
+        self.assertEqual(self.manager.unprotect_secret(), "deferred")
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_secret(), self.secret)
+        self.assertIn(self.manager, secrets._pending_managers)
+
+        self.assertTrue(self.manager.commit())
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_secret(), "deferred")
+        self.assertEqual(sorted(os.listdir(self.test_dir)), ["secrets.json"])
+        self.assertNotIn(self.manager, secrets._pending_managers)
+
+    def test_exit_hook_commits_pending_writes(self):
+        self.manager.protect_salt("deferred-salt", durable=False)
+        secrets._commit_pending()
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_salt(), "deferred-salt")
+
+    def test_rotate_secret_persists(self):
+        rotated = self.manager.rotate_secret()
+        self.assertEqual(DPAPISecretManager(self.test_dir).unprotect_secret(), rotated)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Tests for TPMWrapper's persistent "TPMSigner.exe serve" process, using small
+Python scripts in place of the real executable
+"""
+import os
+import sys
+import base64
+import stat
+import tempfile
+import shutil
+import textwrap
+import time
+import unittest
+from unittest import mock
+
+from dpa.core import tpm
+from dpa.core.tpm import TPMWrapper
+
+SIGNATURE = base64.b64encode(b"s" * 256).decode()
+
+# Baseline TPMSigner: no serve mode, so "serve" prints usage to stdout and exits 1
+OLD_SIGNER = f"""
+import sys
+if sys.argv[1] == "sign":
+    print("[OUTPUT_START]")
+    print("{SIGNATURE}")
+    print("[OUTPUT_END]")
+    sys.exit(0)
+print("TPM Signer - Hardware-bound cryptographic operations")
+print()
+print("Usage:")
+sys.exit(1)
+"""
+
+SERVE_SIGNER = f"""
+import sys
+if sys.argv[1] == "serve":
+    for line in sys.stdin:
+        print("OK {SIGNATURE}" if line.startswith("sign ") else "ERR Unknown command", flush=True)
+"""
+
+HANGING_SIGNER = f"""
+import sys, time
+if sys.argv[1] == "serve":
+    sys.stdin.readline()
+    time.sleep(60)
+else:
+    print("[OUTPUT_START]")
+    print("{SIGNATURE}")
+    print("[OUTPUT_END]")
+"""
+
+
+@unittest.skipIf(os.name == "nt", "fake signers are POSIX scripts")
+class TestTPMServeMode(unittest.TestCase):
+    def setUp(self):
+        self.test_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.test_dir, ignore_errors=True)
+
+    def _fake_signer(self, source: str) -> TPMWrapper:
+        path = os.path.join(self.test_dir, "TPMSigner")
+        with open(path, "w") as f:
+            f.write(f"#!{sys.executable}\n" + textwrap.dedent(source))
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        wrapper = TPMWrapper(exe_path=path)
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def test_sign_uses_serve_process(self):
+        wrapper = self._fake_signer(SERVE_SIGNER)
+        self.assertEqual(wrapper.sign("aGVsbG8="), (True, SIGNATURE))
+        self.assertEqual(wrapper.sign("aGVsbG8="), (True, SIGNATURE))
+        self.assertTrue(wrapper._serve_supported)
+        self.assertIsNotNone(wrapper._proc)
+
+    def test_usage_output_disables_serve_mode(self):
+        wrapper = self._fake_signer(OLD_SIGNER)
+        self.assertEqual(wrapper.sign("aGVsbG8="), (True, SIGNATURE))
+        self.assertFalse(wrapper._serve_supported)
+        # Later calls go straight to the one-shot command
+        self.assertEqual(wrapper.sign("aGVsbG8="), (True, SIGNATURE))
+        self.assertIsNone(wrapper._proc)
+
+    def test_unanswered_request_times_out_and_falls_back(self):
+        wrapper = self._fake_signer(HANGING_SIGNER)
+        with mock.patch.object(tpm, "_SERVE_TIMEOUT", 0.5):
+            started = time.monotonic()
+            self.assertEqual(wrapper.sign("aGVsbG8="), (True, SIGNATURE))
+        self.assertLess(time.monotonic() - started, 10)
+        # A timeout is not proof the executable lacks serve mode
+        self.assertTrue(wrapper._serve_supported)
+        self.assertIsNone(wrapper._proc)
+
+
+if __name__ == "__main__":
+    unittest.main()
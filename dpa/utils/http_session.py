@@ -0,0 +1,50 @@
+"""
+Shared HTTP session for backend calls
+"""
+import atexit
+import socket
+import threading
+from typing import Optional
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util.retry import Retry
+
+_SESSION: Optional[requests.Session] = None
+_LOCK = threading.Lock()
+
+
+class _KeepAliveAdapter(HTTPAdapter):
+    """HTTPAdapter whose sockets keep urllib3's TCP_NODELAY and add SO_KEEPALIVE"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        # The connection idles between scheduler ticks; TCP keepalive stops
+        # middleboxes from silently dropping it
+        kwargs["socket_options"] = HTTPConnection.default_socket_options + [
+            (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        ]
+        super().init_poolmanager(*args, **kwargs)
+
+
+def get_session() -> requests.Session:
+    """
+    Get the process-wide requests.Session used for backend calls
+
+    Posture submission and enrollment share it, so the scheduler's periodic
+    submissions reuse one keep-alive connection instead of reconnecting each time.
+    """
+    global _SESSION
+    if _SESSION is None:
+        with _LOCK:
+            if _SESSION is None:
+                session = requests.Session()
+                adapter = _KeepAliveAdapter(
+                    pool_connections=4,
+                    pool_maxsize=4,
+                    max_retries=Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                atexit.register(session.close)
+                _SESSION = session
+    return _SESSION